@@ -1,12 +1,54 @@
+import functools
 import hashlib
 import hmac
 import os
+import re
 import tomllib
+from functools import cached_property
 
 from dotenv import load_dotenv
 
 
-class BotConfig:
+@functools.lru_cache(maxsize=None)
+def _read_toml(path: str) -> dict:
+    """
+    Читает и разбирает TOML-файл один раз за время жизни процесса.
+    Args:
+        path (str): Путь к файлу.
+    Returns:
+        dict: Содержимое файла.
+    Raises:
+        FileNotFoundError: Если файл не найден.
+    """
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_env() -> None:
+    """
+    Загружает переменные окружения из .env один раз за время жизни процесса.
+    """
+    load_dotenv()
+
+
+class _FrozenConfig:
+    """
+    Базовый класс конфигурации, запрещающий изменение атрибутов после загрузки.
+    """
+
+    _frozen = False
+
+    def _freeze(self) -> None:
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if self._frozen:
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        super().__setattr__(name, value)
+
+
+class BotConfig(_FrozenConfig):
     """
     Класс для загрузки конфигурации бота.
     Args:
@@ -16,7 +58,7 @@ class BotConfig:
     """
 
     def __init__(self):
-        load_dotenv()
+        _load_env()
         self.bot_token = self._load_bot_token()
         self.webhook_path = self._load_bot_config("webhook_path")
         self.webhook_base_url = self._load_bot_config("webhook_url")
@@ -24,6 +66,46 @@ class BotConfig:
         self.secret_key = (
             self._generate_secret_key()
         )  # Добавляем генерацию секретного ключа
+        self.webhook_secret = self._load_webhook_secret()
+        self.update_dedup_window: int = self._load_bot_config_int("update_dedup_window")
+        self.webhook_mode = self._load_bot_config("webhook_mode")
+        if self.webhook_mode not in ("queue", "inline"):
+            raise ValueError("webhook_mode must be 'queue' or 'inline'")
+        self.update_source = self._load_bot_config("update_source")
+        if self.update_source not in ("webhook", "polling"):
+            raise ValueError("update_source must be 'webhook' or 'polling'")
+        self.polling_limit: int = self._load_bot_config_int("polling_limit")
+        self.polling_timeout: int = self._load_bot_config_int("polling_timeout")
+        self.polling_drain_timeout: int = self._load_bot_config_int(
+            "polling_drain_timeout"
+        )
+        self.update_workers: int = self._load_bot_config_int("update_workers")
+        self.update_queue_size: int = self._load_bot_config_int("update_queue_size")
+        self.update_enqueue_timeout: int = self._load_bot_config_int(
+            "update_enqueue_timeout"
+        )
+        self.render_cache_size: int = self._load_bot_config_int("render_cache_size")
+        self.render_cache_ttl: int = self._load_bot_config_int("render_cache_ttl")
+        self.send_global_rate: int = self._load_bot_config_int("send_global_rate")
+        self.send_chat_rate: int = self._load_bot_config_int("send_chat_rate")
+        self.send_chat_burst: int = self._load_bot_config_int("send_chat_burst")
+        self.send_group_rate: int = self._load_bot_config_int("send_group_rate")
+        self.send_max_retries: int = self._load_bot_config_int("send_max_retries")
+        self.api_connections_limit: int = self._load_bot_config_int(
+            "api_connections_limit"
+        )
+        self.api_connections_per_host: int = self._load_bot_config_int(
+            "api_connections_per_host"
+        )
+        self.api_keepalive_timeout: int = self._load_bot_config_int(
+            "api_keepalive_timeout"
+        )
+        self.api_dns_cache_ttl: int = self._load_bot_config_int("api_dns_cache_ttl")
+        self.api_request_timeout: int = self._load_bot_config_int("api_request_timeout")
+        # Адрес локального Bot API сервера (по умолчанию api.telegram.org)
+        self.bot_api_server: str | None = os.getenv("BOT_API_SERVER") or None
+        self.admin_ids: frozenset[int] = self._load_admin_ids()
+        self._freeze()
 
     def _load_bot_config(self, key: str) -> str:
         """
@@ -36,8 +118,7 @@ class BotConfig:
             ValueError: Если параметр конфигурации не найден.
         """
         try:
-            with open("config/bot_config.toml", "rb") as f:
-                config = tomllib.load(f)
+            config = _read_toml("config/bot_config.toml")
             value = config["bot"].get(key)
         except FileNotFoundError:
             raise ValueError("config/bot_config.toml not found")
@@ -48,6 +129,30 @@ class BotConfig:
             raise ValueError(f"{key} not found in config/bot_config.toml")
         return value
 
+    def _load_bot_config_int(self, key: str) -> int:
+        """
+        Загружает числовой параметр конфигурации бота из файла bot_config.toml.
+        Args:
+            key (str): Ключ параметра конфигурации.
+        Returns:
+            int: Значение параметра конфигурации.
+        Raises:
+            ValueError: Если параметр конфигурации не найден или имеет неправильный тип.
+        """
+        try:
+            config = _read_toml("config/bot_config.toml")
+            value = config["bot"].get(key)
+        except FileNotFoundError:
+            raise ValueError("config/bot_config.toml not found")
+        except KeyError:
+            raise ValueError("Section 'bot' not found in config/bot_config.toml")
+
+        if value is None:
+            raise ValueError(f"{key} not found in config/bot_config.toml")
+        if not isinstance(value, int):
+            raise ValueError(f"{key} must be an integer")
+        return value
+
     def _load_bot_token(self) -> str:
         """
         Загружает токен бота из переменных окружения.
@@ -64,6 +169,42 @@ class BotConfig:
             raise ValueError("BOT_TOKEN not found in environment variables")
         return bot_token
 
+    def _load_webhook_secret(self) -> str:
+        """
+        Загружает секрет вебхука из переменной окружения WEBHOOK_SECRET.
+        Если переменная не задана, секрет выводится из токена бота.
+        Telegram передает его в заголовке X-Telegram-Bot-Api-Secret-Token.
+        Args:
+            None
+        Returns:
+            str: Секрет вебхука (допустимые символы: A-Z, a-z, 0-9, _ и -).
+        Raises:
+            ValueError: Если секрет содержит недопустимые символы.
+        """
+        secret = os.getenv("WEBHOOK_SECRET")
+        if not secret:
+            return hashlib.sha256(f"webhook:{self.bot_token}".encode()).hexdigest()
+        if not re.fullmatch(r"[A-Za-z0-9_-]{1,256}", secret):
+            raise ValueError("WEBHOOK_SECRET contains invalid characters")
+        return secret
+
+    def _load_admin_ids(self) -> frozenset[int]:
+        """
+        Загружает ID администраторов из переменной окружения ADMIN_IDS
+        (через запятую). Администраторам доступны служебные эндпоинты API.
+        Args:
+            None
+        Returns:
+            frozenset[int]: ID пользователей Telegram.
+        Raises:
+            ValueError: Если ID не является целым числом.
+        """
+        value = os.getenv("ADMIN_IDS", "")
+        try:
+            return frozenset(int(item) for item in value.split(",") if item.strip())
+        except ValueError:
+            raise ValueError("ADMIN_IDS must be a comma-separated list of integers")
+
     def _generate_secret_key(self) -> bytes:
         """
         Генерирует секретный ключ для валидации tgWebAppData.
@@ -77,7 +218,7 @@ class BotConfig:
         ).digest()
 
 
-class AppConfig:
+class AppConfig(_FrozenConfig):
     """
     Класс для загрузки конфигурации веб-приложения.
     Args:
@@ -99,6 +240,36 @@ class AppConfig:
         self.index_template: str = self._load_app_config_str("index_template")
         self.server_host: str = self._load_app_config_str("server_host")
         self.server_port: int = self._load_app_config_int("server_port")
+        self.prompt_templates_directory: str = self._load_app_config_str(
+            "prompt_templates_directory"
+        )
+        self.default_template_version: str = self._load_app_config_str(
+            "default_template_version"
+        )
+        self.templates_reload_interval: int = self._load_app_config_int(
+            "templates_reload_interval"
+        )
+        self.user_flush_interval_ms: int = self._load_app_config_int(
+            "user_flush_interval_ms"
+        )
+        self.user_flush_batch_size: int = self._load_app_config_int(
+            "user_flush_batch_size"
+        )
+        self.user_flush_max_retries: int = self._load_app_config_int(
+            "user_flush_max_retries"
+        )
+        self.user_flush_max_pending: int = self._load_app_config_int(
+            "user_flush_max_pending"
+        )
+        self.lazy_init: bool = self._load_app_config_bool("lazy_init")
+        self.static_cache_max_bytes: int = self._load_app_config_int(
+            "static_cache_max_bytes"
+        )
+        self.static_cache_max_file_size: int = self._load_app_config_int(
+            "static_cache_max_file_size"
+        )
+        self.export_batch_size: int = self._load_app_config_int("export_batch_size")
+        self._freeze()
 
     def _load_app_config_str(self, key: str) -> str:
         """
@@ -111,8 +282,7 @@ class AppConfig:
             ValueError: Если параметр конфигурации не найден или имеет неправильный тип.
         """
         try:
-            with open("config/app_config.toml", "rb") as f:
-                config = tomllib.load(f)
+            config = _read_toml("config/app_config.toml")
             value = config["app"].get(key)
         except FileNotFoundError:
             raise ValueError("config/app_config.toml not found")
@@ -136,8 +306,7 @@ class AppConfig:
             ValueError: Если параметр конфигурации не найден или имеет неправильный тип.
         """
         try:
-            with open("config/app_config.toml", "rb") as f:
-                config = tomllib.load(f)
+            config = _read_toml("config/app_config.toml")
             value = config["app"].get(key)
         except FileNotFoundError:
             raise ValueError("config/app_config.toml not found")
@@ -150,14 +319,52 @@ class AppConfig:
             raise ValueError(f"{key} must be an integer")
         return value
 
+    def _load_app_config_bool(self, key: str) -> bool:
+        """
+        Загружает логический параметр конфигурации веб-приложения из файла
+        app_config.toml. Значение можно переопределить переменной окружения
+        с именем ключа в верхнем регистре (например, LAZY_INIT=true).
+        Args:
+            key (str): Ключ параметра конфигурации.
+        Returns:
+            bool: Значение параметра конфигурации.
+        Raises:
+            ValueError: Если параметр конфигурации не найден или имеет неправильный тип.
+        """
+        env_value = os.getenv(key.upper())
+        if env_value is not None:
+            if env_value.lower() in ("1", "true", "yes", "on"):
+                return True
+            if env_value.lower() in ("0", "false", "no", "off"):
+                return False
+            raise ValueError(f"{key.upper()} must be a boolean")
+
+        try:
+            config = _read_toml("config/app_config.toml")
+            value = config["app"].get(key)
+        except FileNotFoundError:
+            raise ValueError("config/app_config.toml not found")
+        except KeyError:
+            raise ValueError("Section 'app' not found in config/app_config.toml")
 
-class DBConfig:
+        if value is None:
+            raise ValueError(f"{key} not found in config/app_config.toml")
+        if not isinstance(value, bool):
+            raise ValueError(f"{key} must be a boolean")
+        return value
+
+
+class DBConfig(_FrozenConfig):
     """
     Класс для загрузки конфигурации базы данных.
+    Параметры пула соединений задаются необязательными переменными окружения
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING, DB_STATEMENT_TIMEOUT_MS, DB_PREPARED_STATEMENT_CACHE_SIZE
+    и DB_ECHO.
     """
 
     def __init__(self):
-        load_dotenv()
+        _load_env()
         self.driver = "postgresql+asyncpg"
         self.user = os.getenv("POSTGRES_USER")
         self.password = os.getenv("POSTGRES_PASSWORD")
@@ -167,3 +374,106 @@ class DBConfig:
 
         if not all([self.user, self.password, self.name, self.host, self.port]):
             raise ValueError("Не все переменные окружения для базы данных определены.")
+
+        self.pool_size: int = self._load_env_int("DB_POOL_SIZE", 10)
+        self.max_overflow: int = self._load_env_int("DB_MAX_OVERFLOW", 10)
+        self.pool_timeout: int = self._load_env_int("DB_POOL_TIMEOUT", 30)
+        self.pool_recycle: int = self._load_env_int("DB_POOL_RECYCLE", 1800)
+        self.pool_pre_ping: bool = self._load_env_bool("DB_POOL_PRE_PING", True)
+        self.statement_timeout_ms: int = self._load_env_int(
+            "DB_STATEMENT_TIMEOUT_MS", 30000
+        )
+        self.prepared_statement_cache_size: int = self._load_env_int(
+            "DB_PREPARED_STATEMENT_CACHE_SIZE", 100
+        )
+        self.echo: bool = self._load_env_bool("DB_ECHO", False)
+        self._freeze()
+
+    @staticmethod
+    def _load_env_int(key: str, default: int) -> int:
+        """
+        Загружает числовой параметр из переменных окружения.
+        Args:
+            key (str): Имя переменной окружения.
+            default (int): Значение по умолчанию.
+        Returns:
+            int: Значение параметра.
+        Raises:
+            ValueError: Если значение не является целым числом.
+        """
+        value = os.getenv(key)
+        if value is None or value == "":
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"{key} must be an integer")
+
+    @staticmethod
+    def _load_env_bool(key: str, default: bool) -> bool:
+        """
+        Загружает логический параметр из переменных окружения.
+        Args:
+            key (str): Имя переменной окружения.
+            default (bool): Значение по умолчанию.
+        Returns:
+            bool: Значение параметра.
+        Raises:
+            ValueError: Если значение не является логическим.
+        """
+        value = os.getenv(key)
+        if value is None or value == "":
+            return default
+        if value.lower() in ("1", "true", "yes", "on"):
+            return True
+        if value.lower() in ("0", "false", "no", "off"):
+            return False
+        raise ValueError(f"{key} must be a boolean")
+
+
+class Settings(_FrozenConfig):
+    """
+    Единый объект настроек приложения.
+    Разделы создаются при первом обращении, поэтому, например, утилитам
+    для работы с БД не требуется токен бота. Файлы конфигурации
+    разбираются один раз за время жизни процесса.
+    """
+
+    def __init__(self):
+        self._freeze()
+
+    @cached_property
+    def app(self) -> AppConfig:
+        """
+        Конфигурация веб-приложения.
+        """
+        return AppConfig()
+
+    @cached_property
+    def bot(self) -> BotConfig:
+        """
+        Конфигурация бота.
+        """
+        return BotConfig()
+
+    @cached_property
+    def db(self) -> DBConfig:
+        """
+        Конфигурация базы данных.
+        """
+        return DBConfig()
+
+
+_settings: Settings | None = None
+
+
+def get_settings() -> Settings:
+    """
+    Возвращает общий для процесса объект настроек.
+    Returns:
+        Settings: Настройки приложения.
+    """
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
@@ -1,15 +1,20 @@
+import time
 from collections.abc import AsyncGenerator
 
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from config.config import DBConfig
+from config.config import get_settings
+from core import metrics
 
 # Загрузка конфигурации из переменных окружения
-config = DBConfig()
+config = get_settings().db
 
 # Формирование URL для подключения к базе данных
 DB_URL = (
@@ -17,13 +22,151 @@ DB_URL = (
     f"{config.host}:{config.port}/{config.name}"
 )
 
-# Создание асинхронного движка
-async_engine = create_async_engine(DB_URL, echo=True)
 
-# Создание фабрики асинхронных сессий
-async_session_factory = async_sessionmaker(
-    async_engine, class_=AsyncSession, expire_on_commit=False
-)
+class PoolMetrics:
+    """
+    Метрики пула соединений: задержка выдачи соединения, ожидание
+    при исчерпанном пуле и время удержания соединения, а также число
+    превышений времени ожидания и прочих ошибок получения соединения.
+    """
+
+    def __init__(self):
+        self.checkout_latency = metrics.LatencyHistogram()
+        self.wait_time = metrics.LatencyHistogram()
+        self.hold_time = metrics.LatencyHistogram()
+        self.timeouts = 0
+        self.errors = 0
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, измеряющий время получения соединения.
+    """
+
+    def _do_get(self):
+        # Пул исчерпан: запрос будет ждать возврата соединения
+        saturated = self.checkedin() == 0 and self._overflow >= self._max_overflow
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        except Exception:
+            # Ошибка подключения к БД, а не ожидание свободного соединения
+            pool_metrics.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            pool_metrics.checkout_latency.observe(elapsed)
+            if saturated:
+                pool_metrics.wait_time.observe(elapsed)
+
+
+_engine: AsyncEngine | None = None
+_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info["checkout_at"] = time.perf_counter()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    checkout_at = connection_record.info.pop("checkout_at", None)
+    if checkout_at is not None:
+        pool_metrics.hold_time.observe(time.perf_counter() - checkout_at)
+
+
+def get_engine() -> AsyncEngine:
+    """
+    Возвращает асинхронный движок БД, создавая его при первом обращении.
+    Returns:
+        AsyncEngine: Движок БД.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            f"{DB_URL}?prepared_statement_cache_size="
+            f"{config.prepared_statement_cache_size}",
+            echo=config.echo,
+            poolclass=InstrumentedQueuePool,
+            pool_size=config.pool_size,
+            max_overflow=config.max_overflow,
+            pool_timeout=config.pool_timeout,
+            pool_recycle=config.pool_recycle,
+            pool_pre_ping=config.pool_pre_ping,
+            connect_args={
+                "server_settings": {
+                    "statement_timeout": str(config.statement_timeout_ms)
+                }
+            },
+        )
+        event.listen(_engine.sync_engine, "checkout", _on_checkout)
+        event.listen(_engine.sync_engine, "checkin", _on_checkin)
+    return _engine
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    Возвращает фабрику асинхронных сессий, создавая ее при первом обращении.
+    Returns:
+        async_sessionmaker[AsyncSession]: Фабрика сессий.
+    """
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = async_sessionmaker(
+            get_engine(), class_=AsyncSession, expire_on_commit=False
+        )
+    return _session_factory
+
+
+def async_session_factory() -> AsyncSession:
+    """
+    Создает асинхронную сессию БД.
+    Returns:
+        AsyncSession: Новая сессия.
+    """
+    return get_session_factory()()
+
+
+def __getattr__(name: str):
+    # Движок доступен как атрибут модуля и в ленивом режиме
+    if name == "async_engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def pool_status() -> dict:
+    """
+    Возвращает текущее состояние и метрики пула соединений.
+    Returns:
+        dict: Размер пула, занятые соединения и гистограммы задержек.
+    """
+    if _engine is None:
+        return {"initialized": False}
+    pool = _engine.pool
+    return {
+        "initialized": True,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "in_use": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "timeouts": pool_metrics.timeouts,
+        "errors": pool_metrics.errors,
+        "checkout_latency": pool_metrics.checkout_latency.snapshot(),
+        "wait_time": pool_metrics.wait_time.snapshot(),
+        "hold_time": pool_metrics.hold_time.snapshot(),
+    }
+
+
+metrics.register("db_pool", pool_status)
+
+# В ленивом режиме движок создается при первом запросе к БД
+if not get_settings().app.lazy_init:
+    get_session_factory()
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -0,0 +1,129 @@
+import hashlib
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from core.database import get_engine
+
+logger = logging.getLogger(__name__)
+
+LOCK_SHARED = "SELECT pg_advisory_lock_shared(:key)"
+UNLOCK_SHARED = "SELECT pg_advisory_unlock_shared(:key)"
+TRY_LOCK = "SELECT pg_try_advisory_lock(:key)"
+
+
+def advisory_key(name: str) -> int:
+    """
+    Преобразует имя блокировки в ключ advisory-блокировки PostgreSQL.
+    Args:
+        name (str): Имя блокировки.
+    Returns:
+        int: Ключ (знаковое 64-битное число).
+    """
+    digest = hashlib.sha256(name.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+class LeaderElection:
+    """
+    Выбор ведущего среди процессов приложения (воркеров gunicorn,
+    контейнеров) через advisory-блокировки PostgreSQL.
+    Каждый процесс держит отдельное соединение с разделяемой блокировкой
+    "участника". Ведущим становится процесс, получивший исключительную
+    блокировку "ведущего"; она освобождается, когда процесс завершается
+    или теряет соединение. При выходе процесс отпускает блокировку
+    участника и проверяет, остался ли кто-то еще: последний вышедший
+    выполняет действия остановки, пока держит исключительную блокировку
+    участников, поэтому запускающиеся процессы ждут их окончания.
+    Если БД недоступна, процесс считается ведущим (как при запуске без
+    воркеров), но при выходе не считается последним: другие процессы
+    могли продолжить работу, поэтому действия остановки не выполняются.
+    Args:
+        name (str): Имя группы процессов.
+        connect (Callable[[], AsyncConnection]): Открывает соединение с БД.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], AsyncConnection] | None = None,
+    ):
+        self.name = name
+        self.leader_key = advisory_key(f"{name}:leader")
+        self.members_key = advisory_key(f"{name}:members")
+        self._connect = connect or (lambda: get_engine().connect())
+        self._connection: AsyncConnection | None = None
+        self.is_leader = False
+
+    async def _scalar(self, sql: str, key: int):
+        return await self._connection.scalar(text(sql), {"key": key})
+
+    async def join(self) -> bool:
+        """
+        Регистрирует процесс в группе и пытается стать ведущим.
+        Returns:
+            bool: True, если процесс стал ведущим.
+        """
+        try:
+            self._connection = await self._connect()
+            # Ждет, если последний процесс группы сейчас завершается
+            await self._scalar(LOCK_SHARED, self.members_key)
+            self.is_leader = bool(await self._scalar(TRY_LOCK, self.leader_key))
+            # Блокировки уровня сессии, транзакцию держать не нужно
+            await self._connection.commit()
+        except Exception as e:
+            logger.warning(
+                "Выбор ведущего %s недоступен (%s), процесс считается ведущим",
+                self.name,
+                e,
+            )
+            await self._close()
+            self.is_leader = True
+        role = "ведущий" if self.is_leader else "ведомый"
+        logger.info("Процесс %s в группе %s", role, self.name)
+        return self.is_leader
+
+    @asynccontextmanager
+    async def leave(self) -> AsyncIterator[bool]:
+        """
+        Выводит процесс из группы.
+        Внутри блока последний процесс держит исключительную блокировку
+        участников, поэтому новые процессы не стартуют до его окончания.
+        Yields:
+            bool: True, если в группе не осталось других процессов.
+                Если процесс работал без БД, это неизвестно - False.
+        """
+        if self._connection is None:
+            self.is_leader = False
+            yield False
+            return
+        last = False
+        try:
+            await self._scalar(UNLOCK_SHARED, self.members_key)
+            last = bool(await self._scalar(TRY_LOCK, self.members_key))
+            await self._connection.commit()
+        except Exception as e:
+            # Без проверки процесс не считается последним, чтобы не помешать другим
+            logger.warning("Не удалось выйти из группы %s: %s", self.name, e)
+        try:
+            yield last
+        finally:
+            await self._close()
+            self.is_leader = False
+
+    async def _close(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            # Соединение возвращается в пул: блокировки сессии снимаются явно
+            await self._connection.execute(text("SELECT pg_advisory_unlock_all()"))
+            await self._connection.commit()
+        except Exception as e:
+            logger.warning("Не удалось снять блокировки %s: %s", self.name, e)
+            await self._connection.invalidate()
+        finally:
+            await self._connection.close()
+            self._connection = None
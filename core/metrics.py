@@ -0,0 +1,73 @@
+import bisect
+from collections.abc import Callable
+
+# Границы корзин гистограмм задержек в миллисекундах
+DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_providers: dict[str, Callable[[], dict]] = {}
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек с фиксированными корзинами.
+    Args:
+        buckets_ms (tuple[float, ...]): Верхние границы корзин в миллисекундах.
+    """
+
+    def __init__(self, buckets_ms: tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """
+        Добавляет измерение.
+        Args:
+            seconds (float): Задержка в секундах.
+        """
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def snapshot(self) -> dict:
+        """
+        Возвращает текущее состояние гистограммы.
+        Returns:
+            dict: Число измерений, среднее, максимум и накопленные корзины.
+        """
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(self.buckets_ms, self.counts):
+            cumulative += count
+            buckets[f"le_{bound}ms"] = cumulative
+        buckets["le_inf"] = self.count
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": buckets,
+        }
+
+
+def register(name: str, provider: Callable[[], dict]) -> None:
+    """
+    Регистрирует источник метрик.
+    Args:
+        name (str): Имя раздела метрик.
+        provider (Callable[[], dict]): Функция, возвращающая текущие значения.
+    """
+    _providers[name] = provider
+
+
+def collect() -> dict:
+    """
+    Собирает метрики всех зарегистрированных источников.
+    Returns:
+        dict: Имя раздела -> значения метрик.
+    """
+    return {name: provider() for name, provider in sorted(_providers.items())}
@@ -3,8 +3,11 @@ import datetime
 from sqlalchemy import (
     BigInteger,
     Boolean,
+    Computed,
     DateTime,
     ForeignKey,
+    Index,
+    Numeric,
     String,
     func,
 )
@@ -13,6 +16,18 @@ from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
+# Выражения хранимых генерируемых колонок: часто используемые поля промпта
+# (см. шаблоны в static/templates) извлекаются из JSONB при записи строки
+TITLE_SQL = "message ->> 'title'"
+VERSION_SQL = "message ->> 'version'"
+VISUAL_STYLE_SQL = "message #>> '{main,visual_style}'"
+# Длительность приводится к числу, только если это число (иначе NULL)
+GENERAL_DURATION_SQL = (
+    "CASE WHEN message #>> '{main,general_duration}' ~ '^-?[0-9]+(\\.[0-9]+)?$' "
+    "THEN (message #>> '{main,general_duration}')::numeric END"
+)
+
+
 class Base(AsyncAttrs, DeclarativeBase):
     """
     Базовая модель для всех таблиц.
@@ -21,6 +36,27 @@ class Base(AsyncAttrs, DeclarativeBase):
     pass
 
 
+class PromptFieldsMixin:
+    """
+    Хранимые генерируемые колонки с часто используемыми полями промпта.
+    Заполняются PostgreSQL при записи message, поэтому фильтры и сортировка
+    по ним не разбирают JSONB каждой строки и могут использовать индексы.
+    """
+
+    title: Mapped[str | None] = mapped_column(
+        String, Computed(TITLE_SQL, persisted=True)
+    )
+    version: Mapped[str | None] = mapped_column(
+        String, Computed(VERSION_SQL, persisted=True)
+    )
+    visual_style: Mapped[str | None] = mapped_column(
+        String, Computed(VISUAL_STYLE_SQL, persisted=True)
+    )
+    general_duration: Mapped[float | None] = mapped_column(
+        Numeric(asdecimal=False), Computed(GENERAL_DURATION_SQL, persisted=True)
+    )
+
+
 class User(Base):
     """
     Модель пользователя.
@@ -28,9 +64,7 @@ class User(Base):
 
     __tablename__ = "users"
 
-    user_id: Mapped[int] = mapped_column(
-        BigInteger, primary_key=True, index=True
-    )
+    user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     username: Mapped[str] = mapped_column(String, nullable=True)
     first_name: Mapped[str] = mapped_column(String)
     last_name: Mapped[str] = mapped_column(String, nullable=True)
@@ -58,16 +92,14 @@ class User(Base):
     )
 
 
-class PromptChat(Base):
+class PromptChat(PromptFieldsMixin, Base):
     """
     Модель составного сообщения (промпта) в чате.
     """
 
     __tablename__ = "prompt_chat"
 
-    prompt_id: Mapped[int] = mapped_column(
-        BigInteger, primary_key=True, index=True
-    )
+    prompt_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     user_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("users.user_id")
     )
@@ -76,17 +108,57 @@ class PromptChat(Base):
 
     user: Mapped["User"] = relationship("User", back_populates="prompts")
 
+    __table_args__ = (
+        # Личная лента пользователя (см. core.repositories.PromptRepository)
+        Index("ix_prompt_chat_user_id_prompt_id", "user_id", prompt_id.desc()),
+        # Поиск промптов, опубликованных в группе
+        Index(
+            "ix_prompt_chat_prompt_group",
+            "prompt_group",
+            postgresql_where=prompt_group.isnot(None),
+        ),
+    )
+
 
-class PromptGroup(Base):
+class PromptGroup(PromptFieldsMixin, Base):
     """
      Модель составного сообщения (промпта) в группе.
     """
 
     __tablename__ = "prompt_group"
 
-    prompt_id: Mapped[int] = mapped_column(
-        BigInteger, primary_key=True, index=True
-    )
+    prompt_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     chat_id: Mapped[int] = mapped_column(BigInteger)
     message_thread_id: Mapped[int] = mapped_column(BigInteger)
     message: Mapped[dict] = mapped_column(JSONB)
+
+    __table_args__ = (
+        # Промпты темы группы
+        Index(
+            "ix_prompt_group_chat_id_thread_id_prompt_id",
+            "chat_id",
+            "message_thread_id",
+            "prompt_id",
+        ),
+        # Поиск по содержимому промпта: message @> '{...}'
+        Index(
+            "ix_prompt_group_message",
+            "message",
+            postgresql_using="gin",
+            postgresql_ops={"message": "jsonb_path_ops"},
+        ),
+        # Поиск по подстроке названия (ILIKE), требует расширения pg_trgm
+        Index(
+            "ix_prompt_group_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        # Витрина с фильтром по стилю, от новых к старым
+        Index(
+            "ix_prompt_group_visual_style_prompt_id",
+            "visual_style",
+            prompt_id.desc(),
+        ),
+        Index("ix_prompt_group_general_duration", "general_duration"),
+    )
@@ -0,0 +1,239 @@
+import copy
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# Ключ-признак сжатого документа и версия формата
+CODEC_KEY = "_codec"
+CODEC_VERSION = 1
+
+# Поля, которые хранятся всегда, даже если равны значению по умолчанию:
+# по ним построены генерируемые колонки и индексы поиска (см. core.models),
+# а по version выбирается шаблон для восстановления
+HOT_PATHS = frozenset(
+    {
+        ("version",),
+        ("title",),
+        ("main", "visual_style"),
+        ("main", "general_duration"),
+    }
+)
+
+# Типы узлов шаблона, содержащие вложенные поля
+CONTAINER_TYPES = frozenset({"box", "object"})
+ARRAY_TYPE = "array"
+
+
+@dataclass
+class _Field:
+    default: object = None
+    hot: bool = False
+    children: "_Node | None" = None
+    # Для массива: имя элемента (scene -> scene_1, scene_2, ...)
+    item_key: str | None = None
+
+
+@dataclass
+class _Node:
+    fields: dict[str, _Field] = field(default_factory=dict)
+    # Поля со значением по умолчанию, которое восстанавливается при чтении
+    defaulted: list[str] = field(default_factory=list)
+
+
+def stored_default(node: dict) -> object:
+    """
+    Возвращает значение, которое форма отправляет для нетронутого поля.
+    Пустые строки, пустые списки и "none" у выпадающих списков форма
+    не отправляет (см. getValue в json_prompt.js), поэтому для них
+    значения по умолчанию нет.
+    Args:
+        node (dict): Узел шаблона.
+    Returns:
+        object: Значение по умолчанию или None.
+    """
+    default = node.get("_default")
+    if default in ("", []):
+        return None
+    if node.get("_type") == "select" and default == "none":
+        return None
+    return default
+
+
+def compile_template(template: dict, path: tuple[str, ...] = ()) -> _Node:
+    """
+    Преобразует шаблон в дерево полей для быстрого кодирования.
+    Служебные ключи шаблона (_label, _options и т.д.) отбрасываются.
+    Args:
+        template (dict): Узел шаблона.
+        path (tuple[str, ...]): Путь к узлу от корня шаблона.
+    Returns:
+        _Node: Скомпилированный узел.
+    """
+    node = _Node()
+    for key, child in template.items():
+        if key.startswith("_") or not isinstance(child, dict):
+            continue
+        child_path = path + (key,)
+        spec = _Field(hot=child_path in HOT_PATHS)
+        child_type = child.get("_type")
+        if child_type in CONTAINER_TYPES:
+            spec.children = compile_template(child, child_path)
+        elif child_type == ARRAY_TYPE:
+            item_key = next((k for k in child if not k.startswith("_")), None)
+            if item_key is not None:
+                spec.item_key = item_key
+                spec.children = compile_template(child[item_key], child_path)
+        else:
+            spec.default = stored_default(child)
+            if spec.default is not None:
+                node.defaulted.append(key)
+        node.fields[key] = spec
+    return node
+
+
+def _encode_node(data: dict, node: _Node) -> dict:
+    result = {}
+    for key, value in data.items():
+        spec = node.fields.get(key)
+        if spec is None or spec.hot:
+            result[key] = value
+        elif spec.children is not None and isinstance(value, dict):
+            if spec.item_key is None:
+                result[key] = _encode_node(value, spec.children)
+            else:
+                result[key] = {
+                    item: (
+                        _encode_node(item_value, spec.children)
+                        if isinstance(item_value, dict)
+                        else item_value
+                    )
+                    for item, item_value in value.items()
+                }
+        elif value != spec.default:
+            result[key] = value
+    # Отсутствие поля с непустым значением по умолчанию отмечается null,
+    # иначе при чтении поле было бы восстановлено
+    for key in node.defaulted:
+        if key not in data:
+            result[key] = None
+    return result
+
+
+def _decode_node(data: dict, node: _Node) -> dict:
+    result = {}
+    for key, spec in node.fields.items():
+        if key not in data:
+            if spec.default is not None:
+                result[key] = copy.copy(spec.default)
+            continue
+        value = data[key]
+        if value is None:
+            continue
+        if spec.children is not None and isinstance(value, dict):
+            if spec.item_key is None:
+                value = _decode_node(value, spec.children)
+            else:
+                value = {
+                    item: (
+                        _decode_node(item_value, spec.children)
+                        if isinstance(item_value, dict)
+                        else item_value
+                    )
+                    for item, item_value in value.items()
+                }
+        result[key] = value
+    # Поля, которых нет в шаблоне, сохраняются как есть
+    for key, value in data.items():
+        if key not in node.fields and key != CODEC_KEY:
+            result[key] = value
+    return result
+
+
+class PromptCodec:
+    """
+    Компактное хранение промптов: в БД записываются только значения,
+    отличающиеся от значений по умолчанию шаблона, и версия шаблона.
+    При чтении значения по умолчанию восстанавливаются по шаблону из кеша.
+    Поля из HOT_PATHS хранятся всегда. Значения null в исходном промпте
+    не сохраняются (форма их не отправляет).
+    Сжатие подключается вызывающим кодом: промпты по умолчанию хранятся
+    целиком, чтобы поиск по фрагменту (message @> ...) находил и значения
+    по умолчанию. decode пропускает несжатые документы без изменений.
+    Args:
+        get_template (Callable[[str], dict]): Возвращает шаблон по версии
+            или вызывает KeyError.
+    """
+
+    def __init__(self, get_template: Callable[[str], dict]):
+        self.get_template = get_template
+        # Версия -> (шаблон, скомпилированное дерево); шаблон сравнивается
+        # по идентичности, чтобы перекомпилировать его после перезагрузки
+        self._compiled: dict[str, tuple[dict, _Node]] = {}
+
+    def _node(self, version: object) -> _Node | None:
+        if not isinstance(version, str):
+            return None
+        try:
+            template = self.get_template(version)
+        except KeyError:
+            return None
+        cached = self._compiled.get(version)
+        if cached is not None and cached[0] is template:
+            return cached[1]
+        node = compile_template(template)
+        self._compiled[version] = (template, node)
+        return node
+
+    @staticmethod
+    def is_encoded(message: dict) -> bool:
+        """
+        Проверяет, сжат ли документ этим кодеком.
+        Args:
+            message (dict): Содержимое промпта.
+        Returns:
+            bool: True для сжатого документа.
+        """
+        return isinstance(message, dict) and CODEC_KEY in message
+
+    def encode(self, message: dict) -> dict:
+        """
+        Сжимает промпт для записи в БД.
+        Промпт неизвестной версии шаблона и уже сжатый промпт
+        возвращаются без изменений.
+        Args:
+            message (dict): Промпт, собранный формой.
+        Returns:
+            dict: Документ для записи в message.
+        """
+        if not isinstance(message, dict) or self.is_encoded(message):
+            return message
+        node = self._node(message.get("version"))
+        if node is None:
+            return message
+        return {CODEC_KEY: CODEC_VERSION, **_encode_node(message, node)}
+
+    def decode(self, message: dict) -> dict:
+        """
+        Восстанавливает промпт, прочитанный из БД.
+        Несжатый документ возвращается без изменений.
+        Args:
+            message (dict): Содержимое колонки message.
+        Returns:
+            dict: Промпт со значениями по умолчанию.
+        """
+        if not self.is_encoded(message):
+            return message
+        node = self._node(message.get("version"))
+        if node is None:
+            logger.warning(
+                "Шаблон %s не найден, промпт возвращен без значений по умолчанию",
+                message.get("version"),
+            )
+            return {
+                key: value
+                for key, value in message.items()
+                if key != CODEC_KEY and value is not None
+            }
+        return _decode_node(message, node)
@@ -0,0 +1,229 @@
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models import PromptChat, PromptGroup
+
+# Максимальный размер страницы ленты
+MAX_PAGE_SIZE = 100
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Page(Generic[T]):
+    """
+    Страница ленты с курсором для получения следующей.
+    Args:
+        items (list[T]): Записи страницы.
+        next_cursor (int | None): prompt_id, после которого начинается следующая
+            страница, или None, если записей больше нет.
+    """
+
+    items: list[T]
+    next_cursor: int | None
+
+
+def _page_size(limit: int) -> int:
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def user_feed_query(user_id: int, limit: int, before: int | None = None) -> Select:
+    """
+    Строит запрос страницы личной ленты (новые промпты первыми).
+    Использует индекс ix_prompt_chat_user_id_prompt_id; пагинация по ключу
+    (prompt_id < курсор) не зависит от номера страницы, в отличие от OFFSET.
+    Args:
+        user_id (int): ID пользователя.
+        limit (int): Число записей (запрашивается на одну больше для курсора).
+        before (int | None): Курсор - prompt_id последней записи предыдущей страницы.
+    Returns:
+        Select: Запрос.
+    """
+    query = select(PromptChat).where(PromptChat.user_id == user_id)
+    if before is not None:
+        query = query.where(PromptChat.prompt_id < before)
+    return query.order_by(PromptChat.prompt_id.desc()).limit(limit + 1)
+
+
+def thread_query(
+    chat_id: int, message_thread_id: int, limit: int, after: int | None = None
+) -> Select:
+    """
+    Строит запрос страницы промптов темы группы (в порядке публикации).
+    Использует индекс ix_prompt_group_chat_id_thread_id_prompt_id.
+    Args:
+        chat_id (int): ID группы.
+        message_thread_id (int): ID темы.
+        limit (int): Число записей (запрашивается на одну больше для курсора).
+        after (int | None): Курсор - prompt_id последней записи предыдущей страницы.
+    Returns:
+        Select: Запрос.
+    """
+    query = select(PromptGroup).where(
+        PromptGroup.chat_id == chat_id,
+        PromptGroup.message_thread_id == message_thread_id,
+    )
+    if after is not None:
+        query = query.where(PromptGroup.prompt_id > after)
+    return query.order_by(PromptGroup.prompt_id).limit(limit + 1)
+
+
+def published_query(prompt_group: int) -> Select:
+    """
+    Строит запрос промптов личных чатов, опубликованных как prompt_group.
+    Использует частичный индекс ix_prompt_chat_prompt_group.
+    Args:
+        prompt_group (int): ID промпта в группе.
+    Returns:
+        Select: Запрос.
+    """
+    return select(PromptChat).where(PromptChat.prompt_group == prompt_group)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_query(
+    limit: int,
+    before: int | None = None,
+    *,
+    text: str | None = None,
+    visual_style: str | None = None,
+    version: str | None = None,
+    min_duration: float | None = None,
+    max_duration: float | None = None,
+    contains: dict | None = None,
+) -> Select:
+    """
+    Строит запрос поиска по витрине (промптам группы), от новых к старым.
+    Фильтры используют генерируемые колонки и индексы, а не разбор JSONB:
+    text - триграммный индекс ix_prompt_group_title_trgm (ILIKE по подстроке),
+    visual_style - ix_prompt_group_visual_style_prompt_id,
+    длительность - ix_prompt_group_general_duration,
+    contains - GIN-индекс ix_prompt_group_message (message @> contains).
+    Args:
+        limit (int): Число записей (запрашивается на одну больше для курсора).
+        before (int | None): Курсор - prompt_id последней записи предыдущей страницы.
+        text (str | None): Подстрока названия (без учета регистра).
+        visual_style (str | None): Визуальный стиль.
+        version (str | None): Версия шаблона.
+        min_duration (float | None): Минимальная общая длительность (секунды).
+        max_duration (float | None): Максимальная общая длительность (секунды).
+        contains (dict | None): Фрагмент промпта, который должен в нем содержаться.
+    Returns:
+        Select: Запрос.
+    """
+    query = select(PromptGroup)
+    if text:
+        query = query.where(
+            PromptGroup.title.ilike(f"%{_escape_like(text)}%", escape="\\")
+        )
+    if visual_style is not None:
+        query = query.where(PromptGroup.visual_style == visual_style)
+    if version is not None:
+        query = query.where(PromptGroup.version == version)
+    if min_duration is not None:
+        query = query.where(PromptGroup.general_duration >= min_duration)
+    if max_duration is not None:
+        query = query.where(PromptGroup.general_duration <= max_duration)
+    if contains:
+        query = query.where(PromptGroup.message.contains(contains))
+    if before is not None:
+        query = query.where(PromptGroup.prompt_id < before)
+    return query.order_by(PromptGroup.prompt_id.desc()).limit(limit + 1)
+
+
+def _to_page(rows: list[T], limit: int) -> Page[T]:
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return Page(items=rows, next_cursor=rows[-1].prompt_id)
+    return Page(items=rows, next_cursor=None)
+
+
+class PromptRepository:
+    """
+    Запросы к промптам личных чатов и группы.
+    Args:
+        session (AsyncSession): Сессия БД.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def user_feed(
+        self, user_id: int, limit: int = 20, before: int | None = None
+    ) -> Page[PromptChat]:
+        """
+        Возвращает страницу личной ленты пользователя.
+        Args:
+            user_id (int): ID пользователя.
+            limit (int): Размер страницы (не больше MAX_PAGE_SIZE).
+            before (int | None): Курсор из предыдущей страницы.
+        Returns:
+            Page[PromptChat]: Промпты, от новых к старым.
+        Raises:
+            ValueError: Если limit не положительный.
+        """
+        limit = _page_size(limit)
+        rows = await self.session.scalars(user_feed_query(user_id, limit, before))
+        return _to_page(list(rows), limit)
+
+    async def thread(
+        self,
+        chat_id: int,
+        message_thread_id: int,
+        limit: int = 20,
+        after: int | None = None,
+    ) -> Page[PromptGroup]:
+        """
+        Возвращает страницу промптов темы группы.
+        Args:
+            chat_id (int): ID группы.
+            message_thread_id (int): ID темы.
+            limit (int): Размер страницы (не больше MAX_PAGE_SIZE).
+            after (int | None): Курсор из предыдущей страницы.
+        Returns:
+            Page[PromptGroup]: Промпты в порядке публикации.
+        Raises:
+            ValueError: Если limit не положительный.
+        """
+        limit = _page_size(limit)
+        rows = await self.session.scalars(
+            thread_query(chat_id, message_thread_id, limit, after)
+        )
+        return _to_page(list(rows), limit)
+
+    async def search(
+        self, limit: int = 20, before: int | None = None, **filters
+    ) -> Page[PromptGroup]:
+        """
+        Возвращает страницу результатов поиска по витрине.
+        Args:
+            limit (int): Размер страницы (не больше MAX_PAGE_SIZE).
+            before (int | None): Курсор из предыдущей страницы.
+            **filters: Фильтры search_query (text, visual_style, version,
+                min_duration, max_duration, contains).
+        Returns:
+            Page[PromptGroup]: Промпты, от новых к старым.
+        Raises:
+            ValueError: Если limit не положительный.
+        """
+        limit = _page_size(limit)
+        rows = await self.session.scalars(search_query(limit, before, **filters))
+        return _to_page(list(rows), limit)
+
+    async def published(self, prompt_group: int) -> list[PromptChat]:
+        """
+        Возвращает промпты личных чатов, опубликованные в группе как prompt_group.
+        Args:
+            prompt_group (int): ID промпта в группе.
+        Returns:
+            list[PromptChat]: Промпты.
+        """
+        return list(await self.session.scalars(published_query(prompt_group)))
@@ -0,0 +1,313 @@
+import datetime
+import json
+import time
+import zlib
+from collections.abc import AsyncIterator, Callable, Iterable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from sqlalchemy import DateTime, Table, select, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from core.database import get_engine
+from core.models import PromptChat, PromptGroup, User
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен, без него используется json
+    orjson = None
+
+# Таблицы в порядке, допустимом для загрузки (сначала те, на которые ссылаются)
+EXPORT_TABLES: dict[str, Table] = {
+    "users": User.__table__,
+    "prompt_chat": PromptChat.__table__,
+    "prompt_group": PromptGroup.__table__,
+}
+
+
+def table_columns(name: str) -> list:
+    """
+    Возвращает колонки таблицы, которые выгружаются и загружаются.
+    Генерируемые колонки не переносятся: PostgreSQL вычисляет их сам.
+    Args:
+        name (str): Имя таблицы.
+    Returns:
+        list: Колонки таблицы.
+    Raises:
+        ValueError: Если таблица не поддерживается.
+    """
+    if name not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table: {name}")
+    return [column for column in EXPORT_TABLES[name].columns if column.computed is None]
+
+
+def parse_tables(value: str | None) -> list[str]:
+    """
+    Разбирает список таблиц, перечисленных через запятую.
+    Args:
+        value (str | None): Список таблиц; пустое значение - все таблицы.
+    Returns:
+        list[str]: Имена таблиц в порядке EXPORT_TABLES.
+    Raises:
+        ValueError: Если таблица не поддерживается.
+    """
+    if not value:
+        return list(EXPORT_TABLES)
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = names - EXPORT_TABLES.keys()
+    if unknown:
+        raise ValueError(f"Unknown table: {', '.join(sorted(unknown))}")
+    return [name for name in EXPORT_TABLES if name in names]
+
+
+def _default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps_line(value) -> bytes:
+    """
+    Сериализует значение в строку NDJSON (orjson, если он установлен).
+    Args:
+        value: Значение (заголовок таблицы или строка данных).
+    Returns:
+        bytes: JSON и перевод строки.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_APPEND_NEWLINE)
+    return (
+        json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default)
+        + "\n"
+    ).encode("utf-8")
+
+
+def loads_line(line: bytes):
+    """
+    Разбирает строку NDJSON.
+    Args:
+        line (bytes): Строка.
+    Returns:
+        Разобранное значение.
+    Raises:
+        ValueError: Если строка не является корректным JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+@asynccontextmanager
+async def snapshot_connection() -> AsyncIterator[AsyncConnection]:
+    """
+    Соединение для выгрузки: все таблицы читаются из одного снимка БД
+    (REPEATABLE READ), ограничение времени запроса снято.
+    Yields:
+        AsyncConnection: Соединение в открытой транзакции.
+    """
+    async with get_engine().connect() as connection:
+        await connection.execution_options(
+            isolation_level="REPEATABLE READ", postgresql_readonly=True
+        )
+        await connection.execute(text("SET LOCAL statement_timeout = 0"))
+        yield connection
+
+
+async def export_ndjson(
+    connection: AsyncConnection, tables: Iterable[str], batch_size: int = 1000
+) -> AsyncIterator[bytes]:
+    """
+    Выгружает таблицы в NDJSON с постоянным расходом памяти.
+    Строки читаются серверным курсором пачками по batch_size.
+    Формат: для каждой таблицы строка-заголовок {"table": ..., "columns": [...]},
+    затем строки данных - массивы значений в порядке columns.
+    Args:
+        connection (AsyncConnection): Соединение (см. snapshot_connection).
+        tables (Iterable[str]): Имена таблиц.
+        batch_size (int): Число строк, читаемых за одно обращение к БД.
+    Yields:
+        bytes: Фрагменты NDJSON (заголовок или пачка строк).
+    """
+    for name in tables:
+        columns = table_columns(name)
+        yield dumps_line({"table": name, "columns": [c.name for c in columns]})
+        query = (
+            select(*columns)
+            .order_by(*EXPORT_TABLES[name].primary_key.columns)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await connection.stream(query)
+        async for rows in result.partitions():
+            yield b"".join(dumps_line(list(row)) for row in rows)
+
+
+async def gzip_stream(
+    chunks: AsyncIterator[bytes], level: int = 6
+) -> AsyncIterator[bytes]:
+    """
+    Сжимает поток фрагментов в формат gzip на лету.
+    Args:
+        chunks (AsyncIterator[bytes]): Исходные фрагменты.
+        level (int): Уровень сжатия.
+    Yields:
+        bytes: Фрагменты gzip.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _converter(column) -> Callable:
+    # Значения из JSON приводятся к типам, которые ждет COPY в asyncpg
+    if isinstance(column.type, DateTime):
+        return lambda value: (
+            None if value is None else datetime.datetime.fromisoformat(value)
+        )
+    if isinstance(column.type, JSONB):
+        # Кодек jsonb соединений SQLAlchemy принимает JSON-строку
+        return lambda value: (
+            None
+            if value is None
+            else json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        )
+    return lambda value: value
+
+
+@dataclass
+class ImportStats:
+    """
+    Результат загрузки таблицы.
+    Args:
+        table (str): Имя таблицы.
+        rows (int): Прочитано строк.
+        inserted (int): Вставлено строк (остальные уже были в таблице).
+        elapsed (float): Время загрузки в секундах.
+    """
+
+    table: str
+    rows: int = 0
+    inserted: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """
+        Скорость загрузки (строк в секунду).
+        """
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+class BulkImporter:
+    """
+    Загрузка NDJSON, выгруженного export_ndjson, через COPY.
+    Каждая пачка копируется во временную таблицу (COPY в бинарном формате),
+    а затем переносится в целевую через INSERT ... ON CONFLICT DO NOTHING,
+    поэтому повторная загрузка того же файла не создает дубликатов.
+    Пачка загружается в отдельной транзакции.
+    Args:
+        connection: Соединение asyncpg.
+        batch_size (int): Число строк в пачке.
+        on_progress (Callable[[ImportStats], None] | None): Вызывается после
+            каждой пачки.
+    """
+
+    def __init__(
+        self,
+        connection,
+        batch_size: int = 10000,
+        on_progress: Callable[[ImportStats], None] | None = None,
+    ):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+        self.stats: dict[str, ImportStats] = {}
+
+    async def run(self, lines: Iterable[bytes]) -> dict[str, ImportStats]:
+        """
+        Загружает данные.
+        Args:
+            lines (Iterable[bytes]): Строки NDJSON.
+        Returns:
+            dict[str, ImportStats]: Результаты по таблицам.
+        Raises:
+            ValueError: Если файл поврежден или содержит неизвестные таблицы
+                и колонки.
+        """
+        table = None
+        columns: list[str] = []
+        converters: list[Callable] = []
+        batch: list[tuple] = []
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            value = loads_line(line)
+            if isinstance(value, dict):
+                if table is not None:
+                    await self._flush(table, columns, batch, final=True)
+                table, columns, converters = self._start(value)
+                batch = []
+            elif isinstance(value, list) and table is not None:
+                if len(value) != len(columns):
+                    raise ValueError(f"Line {number}: expected {len(columns)} values")
+                batch.append(
+                    tuple(convert(item) for convert, item in zip(converters, value))
+                )
+                if len(batch) >= self.batch_size:
+                    await self._flush(table, columns, batch)
+                    batch = []
+            else:
+                raise ValueError(f"Line {number}: unexpected data")
+        if table is not None:
+            await self._flush(table, columns, batch, final=True)
+        return self.stats
+
+    def _start(self, header: dict) -> tuple[str, list[str], list[Callable]]:
+        table = header.get("table")
+        columns = header.get("columns") or []
+        known = {column.name: column for column in table_columns(table)}
+        unknown = [name for name in columns if name not in known]
+        if unknown:
+            raise ValueError(f"{table}: unknown columns {', '.join(unknown)}")
+        self.stats[table] = ImportStats(table)
+        return table, columns, [_converter(known[name]) for name in columns]
+
+    async def _flush(
+        self, table: str, columns: list[str], batch: list[tuple], final: bool = False
+    ) -> None:
+        stats = self.stats[table]
+        start = time.perf_counter()
+        if batch:
+            staging = f"import_{table}"
+            column_list = ", ".join(columns)
+            async with self.connection.transaction():
+                await self.connection.execute(
+                    f"CREATE TEMP TABLE IF NOT EXISTS {staging} "
+                    f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+                )
+                await self.connection.copy_records_to_table(
+                    staging, records=batch, columns=columns
+                )
+                status = await self.connection.execute(
+                    f"INSERT INTO {table} ({column_list}) "
+                    f"SELECT {column_list} FROM {staging} ON CONFLICT DO NOTHING"
+                )
+            stats.rows += len(batch)
+            stats.inserted += int(status.split()[-1])
+        if final:
+            await self._reset_sequence(table)
+        stats.elapsed += time.perf_counter() - start
+        if self.on_progress is not None:
+            self.on_progress(stats)
+
+    async def _reset_sequence(self, table: str) -> None:
+        # Явно заданные ключи не сдвигают последовательность BIGSERIAL
+        for column in EXPORT_TABLES[table].primary_key.columns:
+            name = column.name
+            await self.connection.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', '{name}'), "
+                f"max({name})) FROM {table} HAVING max({name}) IS NOT NULL"
+            )
@@ -0,0 +1,303 @@
+import asyncio
+import logging
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.config import get_settings
+from core import metrics
+from core.database import async_session_factory
+from core.models import User
+from core.utils import TTLCache
+
+logger = logging.getLogger(__name__)
+
+app_config = get_settings().app
+
+# Сколько профилей помнить для отсечения повторной записи без изменений
+SEEN_PROFILES_CACHE_SIZE = 100_000
+# Время, через которое профиль записывается повторно даже без изменений (секунды)
+SEEN_PROFILES_TTL = 24 * 60 * 60
+# Ошибки, вызванные данными отдельных строк: повтор такой пачки не поможет
+ROW_ERRORS = (DataError, IntegrityError)
+
+
+@dataclass(frozen=True)
+class UserProfile:
+    """
+    Профиль пользователя Telegram, сохраняемый в таблицу users.
+    """
+
+    user_id: int
+    first_name: str
+    username: str | None = None
+    last_name: str | None = None
+    language_code: str | None = None
+    is_bot: bool = False
+
+    @classmethod
+    def from_telegram(cls, user) -> "UserProfile":
+        """
+        Создает профиль из объекта пользователя aiogram.
+        Args:
+            user (aiogram.types.User): Пользователь Telegram.
+        Returns:
+            UserProfile: Профиль пользователя.
+        """
+        return cls(
+            user_id=user.id,
+            first_name=user.first_name,
+            username=user.username,
+            last_name=user.last_name,
+            language_code=user.language_code,
+            is_bot=user.is_bot,
+        )
+
+    @classmethod
+    def from_init_data(cls, user: dict) -> "UserProfile":
+        """
+        Создает профиль из поля user проверенных initData Mini App.
+        Args:
+            user (dict): Данные пользователя из initData.
+        Returns:
+            UserProfile: Профиль пользователя.
+        """
+        return cls(
+            user_id=user["id"],
+            first_name=user.get("first_name", ""),
+            username=user.get("username"),
+            last_name=user.get("last_name"),
+            language_code=user.get("language_code"),
+            is_bot=user.get("is_bot", False),
+        )
+
+
+def build_upsert(profiles: list[UserProfile]):
+    """
+    Строит один запрос INSERT ... ON CONFLICT (user_id) DO UPDATE для пачки профилей.
+    Args:
+        profiles (list[UserProfile]): Профили пользователей.
+    Returns:
+        Insert: Запрос SQLAlchemy.
+    """
+    stmt = insert(User).values([asdict(profile) for profile in profiles])
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[User.user_id],
+        set_={
+            "username": excluded.username,
+            "first_name": excluded.first_name,
+            "last_name": excluded.last_name,
+            "language_code": excluded.language_code,
+            "is_bot": excluded.is_bot,
+            "updated_at": func.now(),
+        },
+    )
+
+
+class UserWriteBehind:
+    """
+    Отложенная пакетная запись профилей пользователей.
+    Профили накапливаются в памяти (повторные изменения одного пользователя
+    схлопываются) и записываются одним запросом каждые flush_interval
+    секунд или при накоплении batch_size профилей. Профили, которые
+    не изменились с последней записи, не порождают запросов к БД.
+    Очередь ограничена max_pending профилями. Пачка, отвергнутая из-за
+    данных, делится пополам, пока не найдутся некорректные профили;
+    они отбрасываются. При прочих ошибках (БД недоступна) профили
+    возвращаются в очередь, но не более max_retries раз.
+    Args:
+        session_factory (Callable[[], AsyncSession]): Фабрика сессий БД.
+        flush_interval (float): Период записи в секундах.
+        batch_size (int): Число профилей для досрочной записи.
+        max_retries (int): Число неудачных попыток записи профиля.
+        max_pending (int): Максимум профилей в очереди.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        flush_interval: float,
+        batch_size: int,
+        max_retries: int = 5,
+        max_pending: int = 50_000,
+    ):
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.max_pending = max_pending
+        self._pending: dict[int, UserProfile] = {}
+        # Число неудачных попыток записи профилей, ожидающих повтора
+        self._attempts: dict[int, int] = {}
+        self._seen = TTLCache(maxsize=SEEN_PROFILES_CACHE_SIZE, ttl=SEEN_PROFILES_TTL)
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self._overflow = 0
+        self.stats = {
+            "submitted": 0,
+            "unchanged": 0,
+            "written": 0,
+            "flushes": 0,
+            "dropped": 0,
+        }
+
+    def submit(self, profile: UserProfile) -> None:
+        """
+        Ставит профиль в очередь на запись, если он изменился.
+        Если очередь заполнена, профиль нового пользователя отбрасывается.
+        Args:
+            profile (UserProfile): Профиль пользователя.
+        """
+        self.stats["submitted"] += 1
+        pending = profile.user_id in self._pending
+        if not pending and self._seen.get(profile.user_id) == profile:
+            self.stats["unchanged"] += 1
+            return
+        if not pending and len(self._pending) >= self.max_pending:
+            self.stats["dropped"] += 1
+            self._overflow += 1
+            return
+        self._pending[profile.user_id] = profile
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _upsert(self, profiles: list[UserProfile]) -> None:
+        async with self._session_factory() as session:
+            # Делим на части, чтобы не превысить лимит параметров запроса
+            for start in range(0, len(profiles), self.batch_size):
+                chunk = profiles[start : start + self.batch_size]
+                await session.execute(build_upsert(chunk))
+            await session.commit()
+
+    async def _write(self, profiles: list[UserProfile]) -> list[UserProfile]:
+        """
+        Записывает профили, отбрасывая те, которые БД отвергает из-за данных.
+        Args:
+            profiles (list[UserProfile]): Профили пользователей.
+        Returns:
+            list[UserProfile]: Записанные профили.
+        Raises:
+            Exception: Ошибки, не связанные с данными профилей.
+        """
+        try:
+            await self._upsert(profiles)
+            return profiles
+        except ROW_ERRORS:
+            if len(profiles) == 1:
+                logger.exception(
+                    "Профиль пользователя %d отвергнут БД и отброшен",
+                    profiles[0].user_id,
+                )
+                self.stats["dropped"] += 1
+                return []
+        middle = len(profiles) // 2
+        return await self._write(profiles[:middle]) + await self._write(
+            profiles[middle:]
+        )
+
+    def _requeue(self, batch: dict[int, UserProfile]) -> None:
+        dropped = 0
+        for user_id, profile in batch.items():
+            if user_id in self._pending:
+                # Более новый профиль записывается со своим числом попыток
+                self._attempts.pop(user_id, None)
+                continue
+            attempts = self._attempts.get(user_id, 0) + 1
+            if attempts >= self.max_retries:
+                self._attempts.pop(user_id, None)
+                dropped += 1
+                continue
+            self._attempts[user_id] = attempts
+            self._pending[user_id] = profile
+        if dropped:
+            self.stats["dropped"] += dropped
+            logger.error(
+                "Отброшено %d профилей после %d попыток записи",
+                dropped,
+                self.max_retries,
+            )
+
+    async def flush(self) -> None:
+        """
+        Записывает накопленные профили одним запросом.
+        При ошибке профили возвращаются в очередь (если их не обновили).
+        """
+        async with self._flush_lock:
+            if self._overflow:
+                logger.warning(
+                    "Очередь записи профилей заполнена, отброшено %d профилей",
+                    self._overflow,
+                )
+                self._overflow = 0
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            try:
+                written = await self._write(list(batch.values()))
+            except Exception:
+                logger.exception("Не удалось записать %d профилей", len(batch))
+                self._requeue(batch)
+                return
+            for user_id in batch:
+                self._attempts.pop(user_id, None)
+            for profile in written:
+                self._seen.set(profile.user_id, profile)
+            self.stats["written"] += len(written)
+            self.stats["flushes"] += 1
+
+    async def ensure_written(self, user_id: int) -> None:
+        """
+        Записывает профиль пользователя, если он ожидает записи
+        или записывается прямо сейчас.
+        Args:
+            user_id (int): ID пользователя.
+        """
+        if user_id in self._pending or self._flush_lock.locked():
+            await self.flush()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """
+        Запускает фоновую запись профилей.
+        """
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновую запись и записывает оставшиеся профили.
+        """
+        if self._task is not None:
+            # Не отменяем задачу, чтобы не прервать запись пачки на середине
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+
+user_writer = UserWriteBehind(
+    async_session_factory,
+    flush_interval=app_config.user_flush_interval_ms / 1000,
+    batch_size=app_config.user_flush_batch_size,
+    max_retries=app_config.user_flush_max_retries,
+    max_pending=app_config.user_flush_max_pending,
+)
+
+metrics.register("user_writer", lambda: dict(user_writer.stats))
@@ -0,0 +1,250 @@
+import asyncio
+import gzip
+import logging
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from pathlib import Path
+from typing import Any
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен, без него отдаем только gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Тела меньше этого размера не сжимаются: выигрыш меньше накладных расходов
+MIN_COMPRESS_SIZE = 512
+
+
+class TTLCache:
+    """
+    Ограниченный LRU-кеш, записи которого живут заданное время.
+    Args:
+        maxsize (int): Максимальное число записей.
+        ttl (float): Время жизни записи по умолчанию в секундах.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Возвращает значение по ключу, если запись существует и не истекла.
+        Args:
+            key (Hashable): Ключ.
+            default (Any): Значение, если записи нет.
+        Returns:
+            Any: Значение из кеша или default.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if time.monotonic() > expires_at:
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """
+        Сохраняет значение, вытесняя самые старые записи при переполнении.
+        Args:
+            key (Hashable): Ключ.
+            value (Any): Значение.
+            ttl (float | None): Время жизни записи, по умолчанию - self.ttl.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Удаляет запись и возвращает ее значение.
+        Args:
+            key (Hashable): Ключ.
+            default (Any): Значение, если записи нет.
+        Returns:
+            Any: Значение удаленной записи или default.
+        """
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        """
+        Очищает кеш.
+        """
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FileWatcher:
+    """
+    Следит за изменением файлов по времени модификации (mtime).
+    Опрашивает файловую систему в фоновой задаче и вызывает колбэк,
+    если набор файлов или время их изменения поменялись.
+    Args:
+        paths (Callable[[], Iterable[Path]]): Функция, возвращающая список отслеживаемых файлов.
+        on_change (Callable[[], Awaitable[None] | None]): Колбэк, вызываемый при изменении.
+        interval (float): Период опроса в секундах.
+    """
+
+    def __init__(
+        self,
+        paths: Callable[[], Iterable[Path]],
+        on_change: Callable[[], Awaitable[None] | None],
+        interval: float = 2.0,
+    ):
+        self._paths = paths
+        self._on_change = on_change
+        self._interval = interval
+        self._snapshot: dict[Path, int] = {}
+        self._task: asyncio.Task | None = None
+
+    def snapshot(self) -> dict[Path, int]:
+        """
+        Снимает текущее состояние отслеживаемых файлов.
+        Returns:
+            dict[Path, int]: Путь файла -> mtime в наносекундах.
+        """
+        result = {}
+        for path in self._paths():
+            try:
+                result[path] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+        return result
+
+    def mark_clean(self) -> None:
+        """
+        Запоминает текущее состояние файлов как актуальное.
+        """
+        self._snapshot = self.snapshot()
+
+    async def check(self) -> bool:
+        """
+        Проверяет файлы и вызывает колбэк, если они изменились.
+        Returns:
+            bool: True, если изменения были обнаружены.
+        """
+        current = await asyncio.to_thread(self.snapshot)
+        if current == self._snapshot:
+            return False
+        self._snapshot = current
+        if asyncio.iscoroutinefunction(self._on_change):
+            await self._on_change()
+        else:
+            # Синхронный колбэк читает файлы, поэтому выполняем его вне event loop
+            await asyncio.to_thread(self._on_change)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("Ошибка при перезагрузке отслеживаемых файлов")
+
+    def start(self) -> None:
+        """
+        Запускает фоновый опрос файлов.
+        """
+        if self._task is None and self._interval > 0:
+            self.mark_clean()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновый опрос файлов.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def compress_variants(body: bytes) -> dict[str, bytes]:
+    """
+    Готовит сжатые варианты тела ответа.
+    Args:
+        body (bytes): Исходное тело.
+    Returns:
+        dict[str, bytes]: Кодировка (identity, gzip, br) -> тело.
+            Сжатый вариант включается, только если он меньше исходного.
+    """
+    variants = {"identity": body}
+    if len(body) < MIN_COMPRESS_SIZE:
+        return variants
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(compressed) < len(body):
+        variants["gzip"] = compressed
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=11)
+        if len(compressed) < len(body):
+            variants["br"] = compressed
+    return variants
+
+
+def choose_encoding(accept_encoding: str | None, available: Iterable[str]) -> str:
+    """
+    Выбирает кодировку ответа по заголовку Accept-Encoding.
+    Args:
+        accept_encoding (str | None): Значение заголовка Accept-Encoding.
+        available (Iterable[str]): Доступные кодировки.
+    Returns:
+        str: Выбранная кодировка, identity если подходящей нет.
+    """
+    if not accept_encoding:
+        return "identity"
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = "identity", 0.0
+    # Порядок предпочтения при равных весах: br, gzip
+    for encoding in ("br", "gzip"):
+        if encoding not in available:
+            continue
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def etag_matches(if_none_match: str | None, etags: Iterable[str]) -> bool:
+    """
+    Проверяет заголовок If-None-Match (слабое сравнение, RFC 9110).
+    Args:
+        if_none_match (str | None): Значение заголовка If-None-Match.
+        etags (Iterable[str]): ETag'и текущего представления.
+    Returns:
+        bool: True, если клиент уже имеет актуальную версию.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = {tag.removeprefix("W/") for tag in etags}
+    return any(
+        tag.strip().removeprefix("W/") in current for tag in if_none_match.split(",")
+    )
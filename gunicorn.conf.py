@@ -0,0 +1,35 @@
+"""
+Конфигурация gunicorn для запуска приложения в несколько процессов.
+Каждый воркер - отдельный процесс uvicorn со своим lifespan; вебхук
+Telegram устанавливает только ведущий воркер (см. core.leader).
+
+Запуск:
+    gunicorn -c gunicorn.conf.py main:app
+
+Переменные окружения:
+    WEB_CONCURRENCY - число воркеров (по умолчанию - число ядер);
+    GUNICORN_BIND - адрес (по умолчанию 0.0.0.0:8000).
+
+Каждый воркер открывает свой пул соединений с БД (DB_POOL_SIZE
+и DB_MAX_OVERFLOW), в сумме они не должны превышать max_connections
+PostgreSQL.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Время на обработку принятых обновлений и отправку ответов при остановке
+graceful_timeout = 30
+timeout = 60
+keepalive = 5
+
+# Приложение импортируется в каждом воркере: пул соединений с БД,
+# сессия Bot API и фоновые задачи не должны создаваться до fork
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
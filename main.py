@@ -1,6 +1,7 @@
 """
 Основной файл приложения, настраивающий FastAPI и Telegram-бота.
 Использует lifespan события для установки и удаления вебхуков Telegram.
+Запуск в несколько процессов: gunicorn -c gunicorn.conf.py main:app
 """
 
 import logging
@@ -8,24 +9,35 @@ import sys
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 
-from config.config import AppConfig, BotConfig
+from config.config import get_settings
+from core import metrics
+from core.leader import LeaderElection
+from core.users import user_writer
+from services.api.endpoints.admin import router as admin_router
 from services.api.endpoints.app import router as app_router
-from services.api.endpoints.bot import bot, bot_webhook_endpoint
+from services.api.endpoints.bot import bot_webhook_endpoint, dp, update_queue
 from services.api.endpoints.health import router as health_router
+from services.api.endpoints.metrics import router as metrics_router
+from services.api.endpoints.prompts import router as prompts_router
+from services.bot.client import close_bot, get_bot
+from services.bot.send_scheduler import outbound_scheduler
+from services.web_app.index_page import index_page
+from services.web_app.prompt_templates import template_registry
+from services.web_app.static_files import CachedStaticFiles
 
 # Настройка логирования для вывода информации в стандартный вывод
 logging.basicConfig(level=logging.INFO, stream=sys.stdout)
 
 # Инициализация конфигурации бота
-bot_config = BotConfig()
+bot_config = get_settings().bot
 # Инициализация конфигурации веб-приложения
-app_config = AppConfig()
+app_config = get_settings().app
 
-# Настройка шаблонов Jinja2
-templates = Jinja2Templates(directory=app_config.templates_directory)
+
+# Процессы приложения (воркеры gunicorn), обслуживающие вебхук: вебхук
+# устанавливает ведущий, а удаляет последний остановившийся процесс
+webhook_workers = LeaderElection("telegram_webhook")
 
 
 # Инициализация FastAPI приложения с lifespan событиями
@@ -39,32 +51,65 @@ async def lifespan(app: FastAPI):
     Returns:
         None
     """
-    # Получение информации о текущем вебхуке
-    webhook_info = await bot.get_webhook_info()
-    # Если URL вебхука изменился, устанавливаем новый
-    if webhook_info.url != bot_config.webhook_url:
-        await bot.set_webhook(url=bot_config.webhook_url)
+    # Загрузка шаблонов промптов в память и запуск отслеживания их изменений
+    await template_registry.start()
+    # Рендеринг главной страницы и запуск отслеживания изменений ее шаблонов
+    await index_page.start()
+    # Запуск отложенной пакетной записи профилей пользователей
+    user_writer.start()
+    # Запуск планировщика исходящих запросов к Bot API
+    outbound_scheduler.start()
+    # Запуск обработчиков очереди входящих обновлений
+    update_queue.start()
+    # Установка вебхука с секретом и списком обрабатываемых типов обновлений.
+    # Секрет нельзя получить через get_webhook_info, поэтому вебхук
+    # переустанавливается при каждом запуске ведущего процесса. В режиме
+    # polling обновления получает отдельный процесс (services.bot.polling).
+    use_webhook = bot_config.update_source == "webhook"
+    if use_webhook and await webhook_workers.join():
+        await get_bot().set_webhook(
+            url=bot_config.webhook_url,
+            secret_token=bot_config.webhook_secret,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
     yield
-    # Удаление вебхука при завершении работы приложения
-    await bot.delete_webhook()
+    # Удаление вебхука, только если остановились все процессы приложения
+    if use_webhook:
+        async with webhook_workers.leave() as last:
+            if last:
+                await get_bot().delete_webhook()
+    # Обработка уже принятых обновлений перед остановкой
+    await update_queue.stop()
+    # Отправка ответов, поставленных в очередь при обработке обновлений
+    await outbound_scheduler.stop()
+    # Закрытие соединений с Bot API
+    await close_bot()
+    await template_registry.stop()
+    await index_page.stop()
+    await user_writer.stop()
 
 
 # Создание экземпляра FastAPI приложения с настроенным lifespan
 app = FastAPI(lifespan=lifespan)
 
 # Настройка статических файлов
-app.mount(
-    app_config.static_mount_path,
-    StaticFiles(directory=app_config.static_directory),
-    name="static",
+static_files = CachedStaticFiles(
+    directory=app_config.static_directory,
+    max_cache_bytes=app_config.static_cache_max_bytes,
+    max_file_size=app_config.static_cache_max_file_size,
 )
+metrics.register("static_files", static_files.snapshot)
+app.mount(app_config.static_mount_path, static_files, name="static")
 
 # Добавление маршрута для обработки входящих вебхуков от Telegram
 app.add_api_route(bot_config.webhook_path, bot_webhook_endpoint, methods=["POST"])
 
 # Добавление маршрутов для API веб-приложения
 app.include_router(health_router, prefix=app_config.api_path)
+app.include_router(metrics_router, prefix=app_config.api_path)
 app.include_router(app_router, prefix=app_config.api_path)
+app.include_router(prompts_router, prefix=app_config.api_path)
+app.include_router(admin_router, prefix=app_config.api_path)
 
 
 # Маршрут для отображения основной страницы веб-приложения
@@ -72,12 +117,14 @@ app.include_router(app_router, prefix=app_config.api_path)
 async def web_app_root(request: Request):
     """
     Эндпоинт для отображения основной страницы веб-приложения.
+    Страница рендерится заранее (см. IndexPage), обработчик отдает
+    готовое представление с ETag.
     Args:
         request (Request): Объект запроса FastAPI.
     Returns:
-        TemplateResponse: Шаблон Jinja2 для главной страницы.
+        Response: Главная страница или 304 Not Modified.
     """
-    return templates.TemplateResponse(app_config.index_template, {"request": request})
+    return index_page.response(request)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,88 @@
+"""Prompt search: generated columns, GIN and trigram indexes
+
+Revision ID: 3b9e4c7d1a25
+Revises: 8f532dfde258
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e4c7d1a25'
+down_revision: Union[str, Sequence[str], None] = '8f532dfde258'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Выражения зафиксированы здесь, а не импортируются из core.models,
+# чтобы миграция не менялась вместе с моделями
+GENERATED_COLUMNS = [
+    ('title', sa.String(), "message ->> 'title'"),
+    ('version', sa.String(), "message ->> 'version'"),
+    ('visual_style', sa.String(), "message #>> '{main,visual_style}'"),
+    (
+        'general_duration',
+        sa.Numeric(),
+        "CASE WHEN message #>> '{main,general_duration}' ~ '^-?[0-9]+(\\.[0-9]+)?$' "
+        "THEN (message #>> '{main,general_duration}')::numeric END",
+    ),
+]
+TABLES = ['prompt_chat', 'prompt_group']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Хранимые колонки заполняются для существующих строк при добавлении
+    # (таблица перезаписывается один раз)
+    for table in TABLES:
+        for name, type_, expression in GENERATED_COLUMNS:
+            op.add_column(
+                table,
+                sa.Column(name, type_, sa.Computed(expression, persisted=True)),
+            )
+    # Поиск по содержимому: message @> '{...}'
+    op.create_index(
+        'ix_prompt_group_message',
+        'prompt_group',
+        ['message'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'message': 'jsonb_path_ops'},
+    )
+    # Поиск по подстроке названия: title ILIKE '%...%'
+    op.create_index(
+        'ix_prompt_group_title_trgm',
+        'prompt_group',
+        ['title'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+    # Витрина: WHERE visual_style = ? ORDER BY prompt_id DESC
+    op.create_index(
+        'ix_prompt_group_visual_style_prompt_id',
+        'prompt_group',
+        ['visual_style', sa.text('prompt_id DESC')],
+        unique=False,
+    )
+    op.create_index(
+        'ix_prompt_group_general_duration',
+        'prompt_group',
+        ['general_duration'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_prompt_group_general_duration', table_name='prompt_group')
+    op.drop_index('ix_prompt_group_visual_style_prompt_id', table_name='prompt_group')
+    op.drop_index('ix_prompt_group_title_trgm', table_name='prompt_group')
+    op.drop_index('ix_prompt_group_message', table_name='prompt_group')
+    for table in TABLES:
+        for name, _, _ in reversed(GENERATED_COLUMNS):
+            op.drop_column(table, name)
+    # Расширение pg_trgm не удаляется: его могут использовать другие объекты
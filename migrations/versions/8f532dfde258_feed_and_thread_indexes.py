@@ -0,0 +1,57 @@
+"""Feed and thread indexes
+
+Revision ID: 8f532dfde258
+Revises: 5eb12e1d4d17
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8f532dfde258'
+down_revision: Union[str, Sequence[str], None] = '5eb12e1d4d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Личная лента: WHERE user_id = ? ORDER BY prompt_id DESC
+    op.create_index(
+        'ix_prompt_chat_user_id_prompt_id',
+        'prompt_chat',
+        ['user_id', sa.text('prompt_id DESC')],
+        unique=False,
+    )
+    # Кнопка "Комментарии": поиск промптов, опубликованных в группе
+    op.create_index(
+        'ix_prompt_chat_prompt_group',
+        'prompt_chat',
+        ['prompt_group'],
+        unique=False,
+        postgresql_where=sa.text('prompt_group IS NOT NULL'),
+    )
+    # Темы группы: WHERE chat_id = ? AND message_thread_id = ? ORDER BY prompt_id
+    op.create_index(
+        'ix_prompt_group_chat_id_thread_id_prompt_id',
+        'prompt_group',
+        ['chat_id', 'message_thread_id', 'prompt_id'],
+        unique=False,
+    )
+    # Индексы по первичным ключам дублируют индексы ограничений PRIMARY KEY
+    op.drop_index(op.f('ix_users_user_id'), table_name='users')
+    op.drop_index(op.f('ix_prompt_chat_prompt_id'), table_name='prompt_chat')
+    op.drop_index(op.f('ix_prompt_group_prompt_id'), table_name='prompt_group')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_prompt_group_prompt_id'), 'prompt_group', ['prompt_id'], unique=False)
+    op.create_index(op.f('ix_prompt_chat_prompt_id'), 'prompt_chat', ['prompt_id'], unique=False)
+    op.create_index(op.f('ix_users_user_id'), 'users', ['user_id'], unique=False)
+    op.drop_index('ix_prompt_group_chat_id_thread_id_prompt_id', table_name='prompt_group')
+    op.drop_index('ix_prompt_chat_prompt_group', table_name='prompt_chat')
+    op.drop_index('ix_prompt_chat_user_id_prompt_id', table_name='prompt_chat')
@@ -0,0 +1,80 @@
+"""
+Бенчмарк клиента Bot API под нагрузкой на локальной заглушке
+(FakeBotAPIServer): число открытых TCP-соединений, скорость запросов
+и задержки sendMessage. Сравниваются сессия без keep-alive (новое
+соединение на каждый запрос) и BotAPISession с пулом соединений.
+
+Запуск:
+    python -m scripts.benchmarks.bench_bot_session [--requests N] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiogram import Bot
+from aiogram.client.telegram import TelegramAPIServer
+
+from scripts.benchmarks.fake_bot_api import FakeBotAPIServer
+from services.bot.client import BotAPISession
+
+TOKEN = "123456:bench-token"
+
+
+async def run(session: BotAPISession, requests: int, concurrency: int) -> dict:
+    server = FakeBotAPIServer(delay=0.002)
+    await server.start()
+    session.api = TelegramAPIServer.from_base(server.base_url)
+    bot = Bot(token=TOKEN, session=session)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(index: int) -> None:
+        async with semaphore:
+            await bot.send_message(chat_id=index, text="bench")
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(send(index) for index in range(requests)))
+        elapsed = time.perf_counter() - start
+        latency = session.snapshot()["latency"]["sendMessage"]
+    finally:
+        await session.close()
+        await server.stop()
+    return {
+        "rps": requests / elapsed,
+        "connections": len(server.peers),
+        "avg_ms": latency["avg_ms"],
+        "max_ms": latency["max_ms"],
+    }
+
+
+async def main_async(args) -> None:
+    no_keepalive = BotAPISession(limit=args.pool)
+    no_keepalive._connector_init.pop("keepalive_timeout")
+    no_keepalive._connector_init["force_close"] = True
+    sessions = {
+        "без keep-alive": no_keepalive,
+        "пул соединений": BotAPISession(
+            limit=args.pool, limit_per_host=args.pool, keepalive_timeout=60
+        ),
+    }
+    print(f"запросов: {args.requests}, одновременно: {args.concurrency}")
+    for title, session in sessions.items():
+        result = await run(session, args.requests, args.concurrency)
+        print(
+            f"{title:16} {result['rps']:8,.0f} запросов/с, "
+            f"соединений: {result['connections']:5}, "
+            f"среднее: {result['avg_ms']:.2f} мс, максимум: {result['max_ms']:.1f} мс"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--pool", type=int, default=50)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
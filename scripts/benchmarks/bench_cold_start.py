@@ -0,0 +1,176 @@
+"""
+Бенчмарк холодного старта приложения без сети.
+
+1. Время импорта по модулям: python -X importtime -c "import main",
+   самые медленные модули и суммарное время по пакетам верхнего уровня.
+2. Время до первого ответа: от запуска uvicorn до первого успешного
+   запроса к /health. Запросы к Bot API (setWebhook, deleteWebhook)
+   уходят на локальную заглушку (fake_bot_api), к БД при старте
+   приложение не подключается.
+
+Оба замера выполняются в обычном и в ленивом режиме (LAZY_INIT=true),
+в котором клиент бота и движок БД создаются при первом обращении.
+
+Запуск:
+    python -m scripts.benchmarks.bench_cold_start [--runs N] [--top N]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tomllib
+from collections import defaultdict
+from pathlib import Path
+
+import aiohttp
+
+from scripts.benchmarks.bench_startup import ENV_DEFAULTS
+from scripts.benchmarks.fake_bot_api import FakeBotAPIServer
+
+ROOT = Path(__file__).resolve().parents[2]
+
+MODES = {"eager": "false", "lazy": "true"}
+
+with open(ROOT / "config" / "app_config.toml", "rb") as f:
+    HEALTH_PATH = tomllib.load(f)["app"]["web_app_api_path"] + "/health"
+
+# Время ожидания готовности сервера в секундах
+STARTUP_TIMEOUT = 60
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """
+    Разбирает вывод -X importtime.
+    Args:
+        stderr (str): Вывод интерпретатора в stderr.
+    Returns:
+        list[tuple[str, int, int]]: Модуль, собственное и накопленное время (мкс).
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:") :].split("|")
+            modules.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:  # строка заголовка
+            continue
+    return modules
+
+
+def measure_imports(env: dict) -> list[tuple[str, int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def report_imports(modules: list[tuple[str, int, int]], top: int) -> None:
+    total_us = sum(self_us for _, self_us, _ in modules)
+    print(f"  всего: {total_us / 1000:.1f} мс, модулей: {len(modules)}")
+
+    packages: defaultdict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        packages[name.split(".")[0]] += self_us
+    print("  пакеты (собственное время):")
+    for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"    {self_us / 1000:9.1f} мс  {name}")
+
+    print("  модули (накопленное время):")
+    for name, _, cumulative_us in sorted(modules, key=lambda item: -item[2])[:top]:
+        print(f"    {cumulative_us / 1000:9.1f} мс  {name}")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def time_to_first_request(env: dict) -> float:
+    """
+    Запускает uvicorn и ждет первого успешного ответа /health.
+    Args:
+        env (dict): Переменные окружения процесса сервера.
+    Returns:
+        float: Время от запуска процесса до ответа в миллисекундах.
+    """
+    port = free_port()
+    url = f"http://127.0.0.1:{port}{HEALTH_PATH}"
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "main:app",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+        cwd=ROOT,
+        env=env,
+    )
+    try:
+        async with aiohttp.ClientSession() as session:
+            while time.perf_counter() - start < STARTUP_TIMEOUT:
+                if process.returncode is not None:
+                    raise RuntimeError("Сервер завершился при запуске")
+                try:
+                    async with session.get(url) as response:
+                        if response.status == 200:
+                            return (time.perf_counter() - start) * 1000
+                except aiohttp.ClientConnectionError:
+                    pass
+                await asyncio.sleep(0.005)
+        raise RuntimeError("Сервер не ответил за отведенное время")
+    finally:
+        process.terminate()
+        await process.wait()
+
+
+async def run(runs: int, top: int) -> None:
+    fake_api = FakeBotAPIServer()
+    await fake_api.start()
+    base_env = {
+        **ENV_DEFAULTS,
+        **os.environ,
+        "BOT_API_SERVER": fake_api.base_url,
+        "WEBHOOK_SECRET": "benchmark",
+    }
+    try:
+        for mode, lazy_init in MODES.items():
+            env = {**base_env, "LAZY_INIT": lazy_init}
+            print(f"Режим {mode}")
+            print(" Импорт main (-X importtime):")
+            report_imports(await asyncio.to_thread(measure_imports, env), top)
+
+            timings = [await time_to_first_request(env) for _ in range(runs)]
+            print(
+                f" Время до первого ответа: медиана {statistics.median(timings):.1f} мс"
+                f" (мин {min(timings):.1f}, макс {max(timings):.1f}, запусков {runs})"
+            )
+        print(f"Вызовы Bot API: {', '.join(sorted(set(fake_api.methods())))}")
+    finally:
+        await fake_api.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    asyncio.run(run(args.runs, args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Микробенчмарк валидации initData Telegram Mini App.
+Сравнивает полную проверку (разбор + HMAC) с повторной проверкой из кеша.
+
+Запуск:
+    python -m scripts.benchmarks.bench_init_data [--iterations N]
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import time
+import timeit
+import urllib.parse
+
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark-token")
+
+from services.web_app.auth import auth_handler  # noqa: E402
+
+
+def make_init_data() -> str:
+    """
+    Формирует подписанную строку initData, похожую на настоящую.
+    """
+    fields = {
+        "query_id": "AAHdF6IQAAAAAN0XohDhrOrc",
+        "user": json.dumps(
+            {
+                "id": 279058397,
+                "first_name": "Vladislav",
+                "last_name": "Kibenko",
+                "username": "vdkfrost",
+                "language_code": "ru",
+                "is_premium": True,
+                "allows_write_to_pm": True,
+            }
+        ),
+        "auth_date": str(int(time.time())),
+    }
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    data_hash = hmac.new(
+        auth_handler.bot_config.secret_key, data_check_string.encode(), hashlib.sha256
+    ).hexdigest()
+    init_data = urllib.parse.urlencode(fields, quote_via=urllib.parse.quote)
+    return f"{init_data}&hash={data_hash}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    init_data = make_init_data()
+    auth_handler.validate_telegram_data(init_data)
+
+    cases = {
+        "без кеша (разбор + HMAC)": lambda: auth_handler._parse_and_verify(init_data),
+        "с кешем (повторный запуск)": lambda: auth_handler.validate_telegram_data(
+            init_data
+        ),
+    }
+    for name, func in cases.items():
+        seconds = min(timeit.repeat(func, number=args.iterations, repeat=3))
+        print(f"{name:30} {args.iterations / seconds:12,.0f} проверок/с")
+
+
+if __name__ == "__main__":
+    main()
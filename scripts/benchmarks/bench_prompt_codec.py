@@ -0,0 +1,104 @@
+"""
+Бенчмарк сжатия промптов (PromptCodec): размер документа message
+и скорость кодирования/декодирования.
+Промпты генерируются по шаблону так, как их собирает форма: поля
+со значениями по умолчанию предзаполнены, часть полей заполнена текстом.
+Размер JSONB в PostgreSQL близок к размеру JSON; для документов больше
+~2 КБ PostgreSQL дополнительно сжимает значение (TOAST), поэтому
+приводится и размер после zlib.
+
+Запуск:
+    python -m scripts.benchmarks.bench_prompt_codec [--prompts N] [--rounds N]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+import zlib
+from pathlib import Path
+
+from core.prompt_codec import ARRAY_TYPE, CONTAINER_TYPES, PromptCodec, stored_default
+
+TEMPLATE_PATH = (
+    Path(__file__).resolve().parents[2]
+    / "services/web_app/static/templates/template-video-1.0.json"
+)
+WORDS = "кот идет по крыше утром свет падает мягко камера следит за ним".split()
+
+
+def fill(template: dict, rng: random.Random) -> dict | None:
+    """Заполняет узел шаблона как форма: значения по умолчанию и случайный текст."""
+    result = {}
+    for key, node in template.items():
+        if key.startswith("_") or not isinstance(node, dict):
+            continue
+        node_type = node.get("_type")
+        if node_type in CONTAINER_TYPES:
+            include = node.get("_important") or rng.random() < 0.7
+            value = fill(node, rng) if include else None
+        elif node_type == ARRAY_TYPE:
+            item_key = next(k for k in node if not k.startswith("_"))
+            items = {}
+            for index in range(1, rng.randint(1, 5) + 1):
+                item = fill(node[item_key], rng)
+                if item:
+                    items[f"{item_key}_{index}"] = item
+            value = items or None
+        elif node_type in ("text", "textarea") and (
+            node.get("_important") or rng.random() < 0.3
+        ):
+            value = " ".join(rng.choices(WORDS, k=rng.randint(3, 30)))
+        elif node_type == "number" and rng.random() < 0.5:
+            value = str(rng.randint(1, 60))
+        else:
+            value = stored_default(node)
+        if value is not None:
+            result[key] = value
+    return result or None
+
+
+def size(document: dict) -> tuple[int, int]:
+    body = json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode()
+    return len(body), len(zlib.compress(body))
+
+
+def rate(func, documents: list[dict], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for document in documents:
+            func(document)
+    return rounds * len(documents) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prompts", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        template = json.load(f)
+    version = template["version"]["_default"]
+    codec = PromptCodec({version: template}.__getitem__)
+    rng = random.Random(1)
+    prompts = [fill(template, rng) for _ in range(args.prompts)]
+    encoded = [codec.encode(prompt) for prompt in prompts]
+    assert all(codec.decode(e) == p for e, p in zip(encoded, prompts))
+
+    raw_sizes = [size(prompt) for prompt in prompts]
+    encoded_sizes = [size(document) for document in encoded]
+    print(f"шаблон: {TEMPLATE_PATH.stat().st_size} байт, промптов: {len(prompts)}")
+    print(f"{'':12} {'JSON, медиана':>14} {'JSON, всего':>12} {'zlib, всего':>12}")
+    for title, sizes in (("исходный", raw_sizes), ("сжатый", encoded_sizes)):
+        print(
+            f"{title:12} {statistics.median(s[0] for s in sizes):14.0f}"
+            f" {sum(s[0] for s in sizes):12d} {sum(s[1] for s in sizes):12d}"
+        )
+    print(f"encode: {rate(codec.encode, prompts, args.rounds):,.0f} промптов/с")
+    print(f"decode: {rate(codec.decode, encoded, args.rounds):,.0f} промптов/с")
+
+
+if __name__ == "__main__":
+    main()
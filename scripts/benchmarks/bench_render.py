@@ -0,0 +1,84 @@
+"""
+Бенчмарк отображения промптов в сообщения Telegram (PromptRenderer).
+Промпты генерируются по шаблону (см. bench_prompt_codec), число сцен
+задается параметром, чтобы получить большие промпты на несколько
+сообщений. Сравнивается отображение без кеша (каждый промпт впервые)
+и повторное отображение из кеша.
+
+Запуск:
+    python -m scripts.benchmarks.bench_render [--prompts N] [--scenes N] [--rounds N]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from core.prompt_codec import PromptCodec
+from scripts.benchmarks.bench_prompt_codec import TEMPLATE_PATH, fill
+from services.bot.render import PromptRenderer, text_length
+from services.web_app.prompt_templates import TemplateRegistry
+
+
+def large_prompt(template: dict, scenes: int, rng: random.Random) -> dict:
+    """Промпт с заданным числом сцен."""
+    prompt = fill(template, rng)
+    item_template = template["scenes"]["scene"]
+    prompt["scenes"] = {
+        f"scene_{index}": fill(item_template, rng) or {}
+        for index in range(1, scenes + 1)
+    }
+    return prompt
+
+
+def rate(func, rounds: int, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return rounds * count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prompts", type=int, default=500)
+    parser.add_argument("--scenes", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        template = json.load(f)
+    registry = TemplateRegistry(TEMPLATE_PATH.parent, template["version"]["_default"])
+    registry.load()
+    codec = PromptCodec(lambda version: registry.get(version).data)
+    rng = random.Random(1)
+    prompts = [
+        codec.encode(large_prompt(template, args.scenes, rng))
+        for _ in range(args.prompts)
+    ]
+
+    renderer = PromptRenderer(registry, codec, len(prompts), cache_ttl=3600)
+    rendered = [renderer.render(i, p) for i, p in enumerate(prompts)]
+    messages = [len(r.texts) for r in rendered]
+    length = [sum(text_length(t) for t in r.texts) for r in rendered]
+    print(
+        f"промптов: {len(prompts)}, сцен: {args.scenes}, "
+        f"сообщений на промпт: {statistics.mean(messages):.1f} "
+        f"(макс. {max(messages)}), символов: {statistics.mean(length):,.0f}"
+    )
+
+    def uncached():
+        renderer._cache.clear()
+        for i, prompt in enumerate(prompts):
+            renderer.render(i, prompt)
+
+    def cached():
+        for i, prompt in enumerate(prompts):
+            renderer.render(i, prompt)
+
+    for title, func in {"без кеша": uncached, "из кеша": cached}.items():
+        print(f"{title:10} {rate(func, args.rounds, len(prompts)):10,.0f} промптов/с")
+
+
+if __name__ == "__main__":
+    main()
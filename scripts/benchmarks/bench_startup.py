@@ -0,0 +1,74 @@
+"""
+Бенчмарк времени импорта main.py и числа разборов TOML-файлов конфигурации.
+Каждый замер выполняется в отдельном процессе, чтобы импорт был холодным.
+
+Запуск:
+    python -m scripts.benchmarks.bench_startup [--runs N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+ENV_DEFAULTS = {
+    "BOT_TOKEN": "123456:benchmark-token",
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "POSTGRES_DB": "bench",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+}
+
+# Код, выполняемый в дочернем процессе: считает вызовы tomllib.load и load_dotenv
+PROBE = """
+import json, time, tomllib, dotenv
+counts = {"toml_parses": 0, "dotenv_loads": 0}
+_load, _dotenv = tomllib.load, dotenv.load_dotenv
+def load(*a, **kw):
+    counts["toml_parses"] += 1
+    return _load(*a, **kw)
+def load_dotenv(*a, **kw):
+    counts["dotenv_loads"] += 1
+    return _dotenv(*a, **kw)
+tomllib.load, dotenv.load_dotenv = load, load_dotenv
+start = time.perf_counter()
+import main
+counts["import_ms"] = (time.perf_counter() - start) * 1000
+print(json.dumps(counts))
+"""
+
+
+def run_once(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    env = {**ENV_DEFAULTS, **os.environ}
+    results = [run_once(env) for _ in range(args.runs)]
+    import_ms = [result["import_ms"] for result in results]
+    print(f"Импорт main.py: медиана {statistics.median(import_ms):.1f} мс", end="")
+    print(f" (мин {min(import_ms):.1f}, макс {max(import_ms):.1f}, запусков {args.runs})")
+    print(f"Разборов TOML: {results[0]['toml_parses']}")
+    print(f"Вызовов load_dotenv: {results[0]['dotenv_loads']}")
+
+
+if __name__ == "__main__":
+    main()
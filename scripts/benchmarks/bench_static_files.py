@@ -0,0 +1,107 @@
+"""
+Бенчмарк раздачи статических файлов: StaticFiles против CachedStaticFiles.
+Статика копируется во временную директорию и собирается (build_assets),
+туда же добавляется крупный медиафайл. Запросы выполняются через ASGI
+без сети, поэтому замер отражает затраты самого приложения.
+
+Запуск:
+    python -m scripts.benchmarks.bench_static_files [--requests N]
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+
+from services.web_app.assets import build_assets
+from services.web_app.static_files import CachedStaticFiles
+
+STATIC_DIRECTORY = Path(__file__).resolve().parents[2] / "services/web_app/static"
+MEDIA_SIZE = 5 * 1024 * 1024
+BASE_URL = "http://test"
+
+
+def make_app(static_files: StaticFiles) -> FastAPI:
+    app = FastAPI()
+    app.mount("/static", static_files)
+    return app
+
+
+async def measure(app: FastAPI, url: str, headers: dict, requests: int) -> tuple:
+    """
+    Выполняет запросы к одному адресу.
+    Returns:
+        tuple: Запросов в секунду, размер тела ответа (байт) и код ответа.
+    """
+    # Без явного Accept-Encoding httpx запрашивает сжатие, а StaticFiles его не знает
+    headers = {"Accept-Encoding": "identity", **headers}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url=BASE_URL) as client:
+        # Первый запрос прогревает кеш
+        response = await client.get(url, headers=headers)
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get(url, headers=headers)
+        elapsed = time.perf_counter() - start
+    return (
+        requests / elapsed,
+        int(response.headers.get("content-length", 0)),
+        response.status_code,
+    )
+
+
+async def run(requests: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        static = Path(tmp) / "static"
+        shutil.copytree(
+            STATIC_DIRECTORY, static, ignore=shutil.ignore_patterns("dist")
+        )
+        manifest = build_assets(static)
+        (static / "media.bin").write_bytes(os.urandom(MEDIA_SIZE))
+
+        backends = {
+            "StaticFiles": make_app(StaticFiles(directory=static)),
+            "CachedStaticFiles": make_app(CachedStaticFiles(directory=str(static))),
+        }
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=backends["StaticFiles"]),
+            base_url=BASE_URL,
+        ) as client:
+            response = await client.get(
+                f"/static/{manifest['app.js']}",
+                headers={"Accept-Encoding": "identity"},
+            )
+            etag = response.headers["etag"]
+
+        bundle_url = f"/static/{manifest['app.js']}"
+        scenarios = [
+            ("бандл app.js, br", bundle_url, {"Accept-Encoding": "br"}),
+            ("form_work.js", "/static/form_work.js", {"Accept-Encoding": "br"}),
+            ("медиа 5 МБ", "/static/media.bin", {}),
+            ("медиа, Range 64 КБ", "/static/media.bin", {"Range": "bytes=0-65535"}),
+            ("бандл, If-None-Match", bundle_url, {"If-None-Match": etag}),
+        ]
+        print(f"{'сценарий':24} {'бэкенд':18} {'запр/с':>10} {'байт':>9} код")
+        for title, url, headers in scenarios:
+            count = requests // 20 if "5 МБ" in title else requests
+            for name, app in backends.items():
+                rps, size, status = await measure(app, url, headers, count)
+                print(f"{title:24} {name:18} {rps:10.0f} {size:9d} {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
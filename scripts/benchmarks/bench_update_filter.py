@@ -0,0 +1,83 @@
+"""
+Бенчмарк разбора входящих обновлений вебхука на записанном корпусе.
+Сравнивает полную валидацию каждого обновления (json + Update.model_validate)
+с отсевом необрабатываемых типов до валидации (orjson + UpdateTypeFilter).
+
+Запуск:
+    python -m scripts.benchmarks.bench_update_filter [--corpus PATH] [--rounds N]
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+for key, value in {
+    "BOT_TOKEN": "123456:benchmark-token",
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "POSTGRES_DB": "bench",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+}.items():
+    os.environ.setdefault(key, value)
+
+from aiogram.types import Update  # noqa: E402
+
+from services.api.endpoints.bot import dp  # noqa: E402
+from services.bot.client import get_bot  # noqa: E402
+from services.bot.update_filter import UpdateTypeFilter, loads  # noqa: E402
+
+bot = get_bot()
+
+DEFAULT_CORPUS = Path(__file__).parent / "data" / "updates.jsonl"
+
+
+def baseline(bodies: list[bytes]) -> None:
+    for body in bodies:
+        Update.model_validate(json.loads(body), context={"bot": bot})
+
+
+def fast_path(bodies: list[bytes], update_filter: UpdateTypeFilter) -> None:
+    for body in bodies:
+        payload = loads(body)
+        if update_filter.accepts(payload):
+            Update.model_validate(payload, context={"bot": bot})
+
+
+def measure(func, *args, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    bodies = [line.encode() for line in args.corpus.read_text().splitlines() if line]
+    update_filter = UpdateTypeFilter(dp)
+    total = len(bodies) * args.rounds
+
+    before = measure(baseline, bodies, rounds=args.rounds)
+    after = measure(fast_path, bodies, update_filter, rounds=args.rounds)
+
+    print(
+        f"Корпус: {len(bodies)} обновлений,"
+        f" обрабатываемые типы: {sorted(update_filter.allowed)}"
+    )
+    print(f"Полная валидация:     {total / before:12,.0f} обновлений/с")
+    print(f"С отсевом по типу:    {total / after:12,.0f} обновлений/с")
+    stats = update_filter.snapshot()
+    print(
+        f"Отброшено до валидации: {stats['short_circuited'] // args.rounds}"
+        f" из {len(bodies)} ({stats['short_circuited_by_type']})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Бенчмарк проверки промптов по шаблону (TemplateValidator).
+Сравнивает проверку с обходом исходного шаблона для каждого промпта
+(варианты select ищутся в списке _options, как в форме) с проверкой
+по скомпилированной таблице правил.
+
+Запуск:
+    python -m scripts.benchmarks.bench_validator [--prompts N] [--rounds N]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from scripts.benchmarks.bench_prompt_codec import TEMPLATE_PATH, fill
+from services.api.validators import TemplateValidator
+
+
+def naive_validate(data: dict, template: dict, path: str = "") -> list[str]:
+    """Проверка без компиляции: каждый раз обходит узлы шаблона."""
+    issues = []
+    for key, value in data.items():
+        node = template.get(key)
+        location = f"{path}.{key}" if path else key
+        if key.startswith("_") or not isinstance(node, dict):
+            issues.append(location)
+            continue
+        node_type = node.get("_type")
+        if node_type in ("box", "object"):
+            issues += naive_validate(value, node, location)
+        elif node_type == "array":
+            item_key = next(k for k in node if not k.startswith("_"))
+            for item in value.values():
+                issues += naive_validate(item, node[item_key], location)
+        elif node_type == "select":
+            if value not in [option["_value"] for option in node["_options"]]:
+                issues.append(location)
+        elif node_type == "checkbox":
+            allowed = [option["_value"] for option in node["_options"]]
+            if any(item not in allowed for item in value):
+                issues.append(location)
+        elif node_type == "number":
+            try:
+                if float(value) < 0:
+                    issues.append(location)
+            except ValueError:
+                issues.append(location)
+        elif not isinstance(value, str):
+            issues.append(location)
+    return issues
+
+
+def rate(func, rounds: int, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return rounds * count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prompts", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        template = json.load(f)
+    rng = random.Random(1)
+    prompts = [fill(template, rng) for _ in range(args.prompts)]
+
+    start = time.perf_counter()
+    validator = TemplateValidator(template)
+    compile_ms = (time.perf_counter() - start) * 1000
+    invalid = sum(bool(validator.validate(p)) for p in prompts)
+    print(
+        f"промптов: {len(prompts)}, с ошибками: {invalid}, "
+        f"правил: {len(validator.rules)}, компиляция: {compile_ms:.1f} мс"
+    )
+
+    scenarios = {
+        "обход шаблона": lambda: [naive_validate(p, template) for p in prompts],
+        "validate": lambda: [validator.validate(p) for p in prompts],
+    }
+    for title, func in scenarios.items():
+        print(f"{title:16} {rate(func, args.rounds, len(prompts)):10,.0f} промптов/с")
+
+
+if __name__ == "__main__":
+    main()
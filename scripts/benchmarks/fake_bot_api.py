@@ -0,0 +1,157 @@
+"""
+Локальная заглушка Telegram Bot API для бенчмарков и тестов без сети.
+Принимает запросы вида /bot<token>/<method>, запоминает их и отвечает
+правдоподобными результатами. Приложение направляется на заглушку
+переменной окружения BOT_API_SERVER.
+
+Запуск отдельным процессом:
+    python -m scripts.benchmarks.fake_bot_api [--port 8081]
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+
+BOT_USER = {
+    "id": 123456,
+    "is_bot": True,
+    "first_name": "Fake",
+    "username": "fake_bot",
+}
+
+
+def _message(params: dict) -> dict:
+    chat_id = params.get("chat_id", 0)
+    try:
+        chat_id = int(chat_id)
+    except (TypeError, ValueError):
+        chat_id = 0
+    return {
+        "message_id": 1,
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private"},
+        "from": BOT_USER,
+        "text": params.get("text", ""),
+    }
+
+
+# Результаты методов, отличные от True
+RESULTS = {
+    "getme": lambda params: BOT_USER,
+    "getwebhookinfo": lambda params: {
+        "url": "",
+        "has_custom_certificate": False,
+        "pending_update_count": 0,
+    },
+    "sendmessage": _message,
+    "editmessagetext": _message,
+}
+
+
+class FakeBotAPIServer:
+    """
+    Заглушка Bot API на aiohttp.
+    Args:
+        host (str): Адрес, на котором принимаются запросы.
+        port (int): Порт (0 - выбрать свободный).
+        delay (float): Задержка ответа в секундах.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0):
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.calls: list[tuple[str, dict]] = []
+        # Адреса клиентских сокетов: по ним видно переиспользование соединений
+        self.peers: set[tuple] = set()
+        # Обновления, которые отдает getUpdates (с учетом offset и limit)
+        self.updates: list[dict] = []
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        Базовый адрес для BOT_API_SERVER.
+        """
+        return f"http://{self.host}:{self.port}"
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        if request.transport is not None:
+            self.peers.add(request.transport.get_extra_info("peername"))
+        if request.content_type == "application/json":
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+        self.calls.append((method, params))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if method.lower() == "getupdates":
+            result = await self._get_updates(params)
+        else:
+            result = RESULTS.get(method.lower(), lambda params: True)(params)
+        return web.json_response({"ok": True, "result": result})
+
+    async def _get_updates(self, params: dict) -> list[dict]:
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        updates = [u for u in self.updates if u["update_id"] >= offset][:limit]
+        if not updates and int(params.get("timeout") or 0):
+            # Упрощенный long polling: короткое ожидание вместо timeout
+            await asyncio.sleep(0.01)
+        return updates
+
+    async def start(self) -> None:
+        """
+        Запускает сервер.
+        """
+        app = web.Application()
+        app.router.add_route("*", "/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Фактический порт, если был запрошен свободный
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """
+        Останавливает сервер.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def methods(self) -> list[str]:
+        """
+        Возвращает имена вызванных методов по порядку.
+        Returns:
+            list[str]: Имена методов.
+        """
+        return [method for method, _ in self.calls]
+
+
+async def _serve(port: int) -> None:
+    server = FakeBotAPIServer(port=port)
+    await server.start()
+    print(f"BOT_API_SERVER={server.base_url}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
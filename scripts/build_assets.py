@@ -0,0 +1,32 @@
+"""
+Сборка статических файлов веб-приложения: минификация JS/CSS, бандлы,
+хеш содержимого в именах файлов, сжатые копии (.gz, .br) и манифест
+в <static_directory>/dist.
+
+Запуск:
+    python -m scripts.build_assets [--no-minify]
+"""
+
+import argparse
+from pathlib import Path
+
+from config.config import get_settings
+from services.web_app.assets import build_assets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--no-minify", action="store_true", help="собрать бандлы без минификации"
+    )
+    args = parser.parse_args()
+
+    static_directory = Path(get_settings().app.static_directory)
+    manifest = build_assets(static_directory, minify=not args.no_minify)
+    for name, path in sorted(manifest.items()):
+        size = (static_directory / path).stat().st_size
+        print(f"{name:20} -> {path} ({size} байт)")
+
+
+if __name__ == "__main__":
+    main()
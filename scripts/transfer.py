@@ -0,0 +1,131 @@
+"""
+Выгрузка и загрузка таблиц users, prompt_chat и prompt_group в NDJSON.
+Выгрузка читает таблицы серверным курсором с постоянным расходом памяти
+(файл с расширением .gz сжимается). Загрузка выполняется через COPY
+пачками; строки, уже существующие в таблице, пропускаются.
+
+Запуск:
+    python -m scripts.transfer export [--tables users,prompt_chat] [--output FILE]
+    python -m scripts.transfer import FILE [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import gzip
+import sys
+import time
+
+from config.config import get_settings
+from core.database import get_engine
+from core.transfer import (
+    BulkImporter,
+    ImportStats,
+    export_ndjson,
+    gzip_stream,
+    parse_tables,
+    snapshot_connection,
+)
+
+# Период вывода прогресса выгрузки (секунды)
+PROGRESS_INTERVAL = 1.0
+
+
+def open_output(path: str):
+    if path == "-":
+        return sys.stdout.buffer
+    return open(path, "wb")
+
+
+def open_input(path: str):
+    if path == "-":
+        return sys.stdin.buffer
+    with open(path, "rb") as f:
+        magic = f.read(2)
+    return gzip.open(path, "rb") if magic == b"\x1f\x8b" else open(path, "rb")
+
+
+async def export(tables: list[str], output: str, batch_size: int) -> None:
+    start = last_report = time.perf_counter()
+    written = 0
+    out = open_output(output)
+    try:
+        async with snapshot_connection() as connection:
+            chunks = export_ndjson(connection, tables, batch_size)
+            if output.endswith(".gz"):
+                chunks = gzip_stream(chunks)
+            async for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+                now = time.perf_counter()
+                if now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    print(
+                        f"выгружено {written / 2**20:.1f} МБ "
+                        f"({written / 2**20 / (now - start):.1f} МБ/с)",
+                        file=sys.stderr,
+                    )
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"готово: {written / 2**20:.1f} МБ за {elapsed:.1f} с", file=sys.stderr)
+
+
+def report(stats: ImportStats) -> None:
+    print(
+        f"{stats.table}: {stats.rows} строк, вставлено {stats.inserted}, "
+        f"{stats.rate:,.0f} строк/с",
+        file=sys.stderr,
+    )
+
+
+async def load(path: str, batch_size: int) -> None:
+    async with get_engine().connect() as connection:
+        raw = await connection.get_raw_connection()
+        driver_connection = raw.driver_connection
+        await driver_connection.execute("SET statement_timeout = 0")
+        importer = BulkImporter(driver_connection, batch_size, on_progress=report)
+        with open_input(path) as f:
+            stats = await importer.run(f)
+    for item in stats.values():
+        print(
+            f"итого {item.table}: {item.rows} строк за {item.elapsed:.1f} с "
+            f"({item.rate:,.0f} строк/с)",
+            file=sys.stderr,
+        )
+
+
+async def run(args) -> None:
+    try:
+        if args.command == "export":
+            await export(parse_tables(args.tables), args.output, args.batch_size)
+        else:
+            await load(args.file, args.batch_size)
+    finally:
+        await get_engine().dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="выгрузить таблицы")
+    export_parser.add_argument("--tables", help="таблицы через запятую (все)")
+    export_parser.add_argument(
+        "--output", default="-", help="файл (.gz - со сжатием), - для stdout"
+    )
+    export_parser.add_argument(
+        "--batch-size", type=int, default=get_settings().app.export_batch_size
+    )
+
+    import_parser = commands.add_parser("import", help="загрузить выгрузку")
+    import_parser.add_argument("file", help="файл NDJSON или NDJSON.gz, - для stdin")
+    import_parser.add_argument("--batch-size", type=int, default=10000)
+
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,17 @@
-from typing import AsyncGenerator
+from typing import Annotated, AsyncGenerator
 
+from fastapi import Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config.config import get_settings
 from core.database import async_session_factory
+from services.web_app.auth.auth_handler import (
+    JWT_COOKIE_NAME,
+    create_jwt_token,
+    decode_jwt_token,
+    jwt_needs_refresh,
+    set_jwt_cookie,
+)
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
@@ -14,3 +23,58 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     """
     async with async_session_factory() as session:
         yield session
+
+
+async def get_current_user_id(request: Request, response: Response) -> int:
+    """
+    Зависимость FastAPI для получения ID пользователя из JWT-токена в cookie.
+    Токен проверяется один раз за запрос, данные проверенных токенов
+    кешируются. Если прошла половина времени жизни токена, в ответ
+    записывается новый токен (скользящее продление без обращения к БД).
+
+    Args:
+        request (Request): Объект запроса FastAPI.
+        response (Response): Ответ FastAPI для записи обновленного cookie.
+    Returns:
+        int: ID пользователя Telegram.
+    Raises:
+        HTTPException: 401, если токен отсутствует или невалиден.
+    """
+    token = request.cookies.get(JWT_COOKIE_NAME)
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        claims = decode_jwt_token(token)
+    except ValueError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+    user_id = claims["user_id"]
+    if jwt_needs_refresh(claims):
+        set_jwt_cookie(response, create_jwt_token(user_id))
+    request.state.user_id = user_id
+    return user_id
+
+
+# Аннотация для обработчиков: `user_id: CurrentUserId`
+CurrentUserId = Annotated[int, Depends(get_current_user_id)]
+
+
+async def get_admin_user_id(user_id: CurrentUserId) -> int:
+    """
+    Зависимость FastAPI для служебных эндпоинтов: пользователь должен
+    входить в список администраторов (ADMIN_IDS).
+
+    Args:
+        user_id (int): ID пользователя из JWT-токена.
+    Returns:
+        int: ID администратора.
+    Raises:
+        HTTPException: 403, если пользователь не администратор.
+    """
+    if user_id not in get_settings().bot.admin_ids:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return user_id
+
+
+# Аннотация для служебных обработчиков: `user_id: AdminUserId`
+AdminUserId = Annotated[int, Depends(get_admin_user_id)]
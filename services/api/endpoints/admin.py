@@ -0,0 +1,52 @@
+import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from config.config import get_settings
+from core.transfer import export_ndjson, gzip_stream, parse_tables, snapshot_connection
+from services.api.dependencies import AdminUserId
+
+router = APIRouter()
+
+
+@router.get("/admin/export")
+async def export_data(
+    user_id: AdminUserId, tables: Optional[str] = None, compress: bool = True
+):
+    """
+    Эндпоинт потоковой выгрузки таблиц в NDJSON (см. core.transfer).
+    Данные читаются серверным курсором и сразу отправляются клиенту,
+    поэтому расход памяти не зависит от размера таблиц.
+    Args:
+        user_id (int): ID администратора.
+        tables (str | None): Таблицы через запятую (по умолчанию все).
+        compress (bool): Сжимать ли выгрузку в gzip.
+    Returns:
+        StreamingResponse: Файл выгрузки.
+    Raises:
+        HTTPException: 422, если таблица не поддерживается.
+    """
+    try:
+        names = parse_tables(tables)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    batch_size = get_settings().app.export_batch_size
+
+    async def body():
+        async with snapshot_connection() as connection:
+            chunks = export_ndjson(connection, names, batch_size)
+            if compress:
+                chunks = gzip_stream(chunks)
+            async for chunk in chunks:
+                yield chunk
+
+    filename = f"jprompter-{datetime.date.today().isoformat()}.ndjson"
+    if compress:
+        filename += ".gz"
+    return StreamingResponse(
+        body(),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
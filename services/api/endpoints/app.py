@@ -1,13 +1,25 @@
-import json
-from pathlib import Path
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
 
-from services.web_app.auth.auth_handler import create_jwt_token, validate_telegram_data
+from config.config import get_settings
+from core.users import UserProfile, user_writer
+from core.utils import choose_encoding, etag_matches
+from services.web_app.auth.auth_handler import (
+    create_jwt_token,
+    set_jwt_cookie,
+    validate_telegram_data,
+)
+from services.web_app.prompt_templates import template_registry
 
 router = APIRouter()
+app_config = get_settings().app
+
+# Тело шаблона с хешем в адресе не меняется, поэтому кешируется навсегда
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Без хеша в адресе клиент обязан перепроверить актуальность по ETag
+REVALIDATE_CACHE_CONTROL = "no-cache"
 
 
 class ButtonClickMessage(BaseModel):
@@ -24,42 +36,94 @@ class InitData(BaseModel):
 async def init(data: InitData, response: Response):
     """
     Эндпоинт для получения авторизации (записи JWT токена с cookies).
-    Читает шаблон из docs/templates/template-video-1.0.json
-    и возвращает его с пустым промптом.
+    Возвращает версию и хеш шаблона по умолчанию вместе с пустым промптом.
+    Сам шаблон загружается клиентом отдельно через /templates/{version}
+    и кешируется им по хешу.
     Args:
-        None
+        data (InitData): initData Telegram Mini App и параметры запуска.
+        response (Response): Ответ FastAPI для записи cookies.
     Returns:
-        dict: Шаблон и пользовательские данные.
+        dict: Ссылка на шаблон и пользовательские данные.
     """
     try:
-        print(data)
         all_data = validate_telegram_data(data.initData)
-        # print(f"Все полученные данные: {all_data}")
-        # print(f"message_id: {data.message_id}")
-        # print(f"chat: {data}")
         user_data = all_data.get("user", {})
         jwt_token = create_jwt_token(user_data["id"])
-        response.set_cookie(key="jwt", value=jwt_token, httponly=True)
-
-        # Читаем шаблон из файла
-        template_path = (
-            Path(__file__).parent.parent.parent.parent
-            / "services"
-            / "web_app"
-            / "static"
-            / "templates"
-            / "template-video-1.0.json"
-        )
-        with open(template_path, "r", encoding="utf-8") as f:
-            template = json.load(f)
-
-        # Создаем пустой промпт (пока заглушка)
-        prompt = {}
-
-        return {"template": template, "prompt": prompt, "prompt_type": "json"}
+        set_jwt_cookie(response, jwt_token)
     except ValueError as e:
         raise HTTPException(status_code=401, detail=str(e))
 
+    # Профиль записывается в БД отложенно, пачкой с другими пользователями
+    user_writer.submit(UserProfile.from_init_data(user_data))
+
+    template = template_registry.get()
+
+    # Создаем пустой промпт (пока заглушка)
+    prompt = {}
+
+    return {
+        "template_version": template.version,
+        "template_hash": template.hash,
+        "template_url": (
+            f"{app_config.api_path}/templates/{template.version}?v={template.hash}"
+        ),
+        "prompt": prompt,
+        "prompt_type": "json",
+    }
+
+
+@router.get("/templates/{version}")
+async def get_template(version: str, request: Request):
+    """
+    Эндпоинт для получения шаблона промпта по версии.
+    Отдает заранее сериализованное и сжатое тело шаблона с сильным ETag.
+    Если клиент передал актуальный ETag в If-None-Match, отвечает 304.
+    Запрос с параметром v, равным хешу шаблона, кешируется как неизменяемый.
+    Args:
+        version (str): Версия шаблона.
+        request (Request): Объект запроса FastAPI.
+    Returns:
+        Response: Тело шаблона или 304 Not Modified.
+    """
+    try:
+        template = template_registry.get(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Template not found")
+
+    requested_hash = request.query_params.get("v")
+    if requested_hash is not None and requested_hash != template.hash:
+        # Запрошена устаревшая версия: отправляем клиента за актуальной
+        return Response(
+            status_code=307,
+            headers={
+                "Location": (
+                    f"{app_config.api_path}/templates/{version}?v={template.hash}"
+                ),
+                "Cache-Control": REVALIDATE_CACHE_CONTROL,
+            },
+        )
+
+    encoding = choose_encoding(
+        request.headers.get("accept-encoding"), template.variants
+    )
+    headers = {
+        "ETag": template.etag_for(encoding),
+        "Cache-Control": (
+            IMMUTABLE_CACHE_CONTROL if requested_hash else REVALIDATE_CACHE_CONTROL
+        ),
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), template.etags):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=template.variants[encoding],
+        media_type="application/json",
+        headers=headers,
+    )
+
 
 @router.get("/greeting")
 async def get_greeting():
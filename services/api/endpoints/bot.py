@@ -1,28 +1,113 @@
-from aiogram import Bot, Dispatcher
-from aiogram.client.default import DefaultBotProperties
-from aiogram.enums import ParseMode
+import hmac
+import logging
+
+from aiogram import Dispatcher
 from aiogram.types import Update
 from fastapi import Request, Response
+from pydantic import ValidationError
 
-from config.config import BotConfig
+from config.config import get_settings
+from core import metrics
+from core.database import async_session_factory
+from core.users import user_writer
 from services.bot import handlers
-
-bot_config = BotConfig()
-bot = Bot(
-    token=bot_config.bot_token, default=DefaultBotProperties(parse_mode=ParseMode.HTML)
+from services.bot.client import get_bot
+from services.bot.middleware import (
+    FSMWriteCoalescingMiddleware,
+    UserTrackingMiddleware,
 )
-dp = Dispatcher()
+from services.bot.storage import UserFSMStorage
+from services.bot.update_filter import UpdateDeduplicator, UpdateTypeFilter, loads
+from services.bot.update_queue import UpdateQueue, UpdateQueueFull
+
+logger = logging.getLogger(__name__)
+
+bot_config = get_settings().bot
+# В ленивом режиме клиент бота создается при первом обращении
+if not get_settings().app.lazy_init:
+    get_bot()
+fsm_storage = UserFSMStorage(async_session_factory, user_writer.ensure_written)
+metrics.register("fsm_storage", lambda: dict(fsm_storage.stats))
+dp = Dispatcher(storage=fsm_storage)
+dp.update.outer_middleware(UserTrackingMiddleware(user_writer))
+dp.update.outer_middleware(FSMWriteCoalescingMiddleware(fsm_storage))
 dp.include_router(handlers.router)
 
+update_queue = UpdateQueue(
+    dp,
+    get_bot,
+    workers=bot_config.update_workers,
+    maxsize=bot_config.update_queue_size,
+    enqueue_timeout=bot_config.update_enqueue_timeout,
+)
+metrics.register("update_queue", update_queue.snapshot)
+
+update_filter = UpdateTypeFilter(dp)
+metrics.register("update_filter", update_filter.snapshot)
+
+update_dedup = UpdateDeduplicator(bot_config.update_dedup_window)
+metrics.register("update_dedup", update_dedup.snapshot)
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
 
 async def bot_webhook_endpoint(request: Request):
     """
     Эндпоинт для обработки входящих вебхуков от Telegram.
+    В режиме "queue" обновление ставится в очередь и ответ возвращается
+    сразу, в режиме "inline" обновление обрабатывается до ответа.
+    Обновления типов, которые не обрабатывает ни один роутер,
+    отбрасываются до построения модели Update. Обновление запоминается
+    для отсечения повторных доставок только после проверки модели.
     Args:
         request (Request): Объект запроса FastAPI.
     Returns:
-        Response: Ответ FastAPI с содержимым "OK" и статусом 200.
+        Response: Ответ FastAPI с содержимым "OK" и статусом 200
+            (в том числе для обновления, не соответствующего формату
+            Bot API: повторная доставка его не исправит),
+            400, если тело не является JSON-объектом,
+            403 при неверном секрете вебхука
+            или 503, если очередь обновлений переполнена.
     """
-    update = Update.model_validate(await request.json(), context={"bot": bot})
-    await dp.feed_update(bot, update)
+    secret = request.headers.get(SECRET_TOKEN_HEADER, "")
+    if not hmac.compare_digest(secret.encode(), bot_config.webhook_secret.encode()):
+        return Response(content="Forbidden", status_code=403)
+
+    try:
+        payload = loads(await request.body())
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        return Response(content="Bad Request", status_code=400)
+    if not update_filter.accepts(payload):
+        return Response(content="OK", status_code=200)
+
+    bot = get_bot()
+    try:
+        update = Update.model_validate(payload, context={"bot": bot})
+    except ValidationError as e:
+        logger.warning(
+            "Обновление %s отброшено, неверный формат: %s",
+            payload.get("update_id"),
+            e,
+        )
+        return Response(content="OK", status_code=200)
+    if update_dedup.check_and_add(update.update_id):
+        return Response(content="OK", status_code=200)
+    if bot_config.webhook_mode == "inline":
+        try:
+            await dp.feed_update(bot, update)
+        except Exception:
+            update_dedup.discard(update.update_id)
+            raise
+        return Response(content="OK", status_code=200)
+
+    try:
+        await update_queue.enqueue(update)
+    except UpdateQueueFull:
+        # Telegram повторит доставку позже, она не должна считаться дубликатом
+        update_dedup.discard(update.update_id)
+        return Response(
+            content="Busy", status_code=503, headers={"Retry-After": "1"}
+        )
     return Response(content="OK", status_code=200)
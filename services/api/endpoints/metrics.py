@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+
+from core import metrics
+from services.api.dependencies import AdminUserId
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics(user_id: AdminUserId):
+    """
+    Эндпоинт для получения метрик сервиса (пул БД, очереди и т.д.).
+    Доступен только администраторам.
+    Args:
+        user_id (int): ID администратора.
+    Returns:
+        dict: Метрики, сгруппированные по источникам.
+    """
+    return metrics.collect()
@@ -0,0 +1,75 @@
+import json
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.repositories import MAX_PAGE_SIZE, PromptRepository
+from services.api.dependencies import CurrentUserId, get_db_session
+from services.api.serializers import serialize_group_prompt
+
+router = APIRouter()
+
+# Короче трех символов триграммный индекс не помогает
+MIN_SEARCH_TEXT_LENGTH = 3
+
+
+@router.get("/prompts/search")
+async def search_prompts(
+    user_id: CurrentUserId,
+    session: Annotated[AsyncSession, Depends(get_db_session)],
+    q: Annotated[Optional[str], Query(min_length=MIN_SEARCH_TEXT_LENGTH)] = None,
+    visual_style: Optional[str] = None,
+    version: Optional[str] = None,
+    min_duration: Annotated[Optional[float], Query(ge=0)] = None,
+    max_duration: Annotated[Optional[float], Query(ge=0)] = None,
+    contains: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 20,
+    cursor: Optional[int] = None,
+):
+    """
+    Эндпоинт поиска по витрине промптов группы.
+    Результаты отдаются от новых к старым страницами; для следующей страницы
+    передается cursor из предыдущего ответа.
+    Args:
+        user_id (int): ID пользователя (требуется авторизация).
+        session (AsyncSession): Сессия БД.
+        q (str | None): Подстрока названия.
+        visual_style (str | None): Визуальный стиль.
+        version (str | None): Версия шаблона.
+        min_duration (float | None): Минимальная общая длительность (секунды).
+        max_duration (float | None): Максимальная общая длительность (секунды).
+        contains (str | None): JSON-объект - фрагмент, который должен
+            содержаться в промпте, например {"main": {"target_audience": "дети"}}.
+        limit (int): Размер страницы.
+        cursor (int | None): Курсор из предыдущего ответа.
+    Returns:
+        dict: Найденные промпты и курсор следующей страницы (None - конец).
+    Raises:
+        HTTPException: 422, если contains не является JSON-объектом.
+    """
+    fragment = None
+    if contains is not None:
+        try:
+            fragment = json.loads(contains)
+        except ValueError:
+            fragment = None
+        if not isinstance(fragment, dict):
+            raise HTTPException(
+                status_code=422, detail="contains must be a JSON object"
+            )
+
+    page = await PromptRepository(session).search(
+        limit,
+        cursor,
+        text=q,
+        visual_style=visual_style,
+        version=version,
+        min_duration=min_duration,
+        max_duration=max_duration,
+        contains=fragment,
+    )
+    return {
+        "items": [serialize_group_prompt(prompt) for prompt in page.items],
+        "next_cursor": page.next_cursor,
+    }
@@ -0,0 +1,23 @@
+from core.models import PromptGroup
+from services.web_app.prompt_templates import prompt_codec
+
+
+def serialize_group_prompt(prompt: PromptGroup) -> dict:
+    """
+    Преобразует промпт группы в словарь для ответа API.
+    Args:
+        prompt (PromptGroup): Промпт группы.
+    Returns:
+        dict: Идентификаторы, поля для списка и сам промпт
+            (со значениями по умолчанию, см. PromptCodec).
+    """
+    return {
+        "prompt_id": prompt.prompt_id,
+        "chat_id": prompt.chat_id,
+        "message_thread_id": prompt.message_thread_id,
+        "title": prompt.title,
+        "version": prompt.version,
+        "visual_style": prompt.visual_style,
+        "general_duration": prompt.general_duration,
+        "message": prompt_codec.decode(prompt.message),
+    }
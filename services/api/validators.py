@@ -0,0 +1,365 @@
+import math
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from services.web_app.prompt_templates import (
+    MEDIA_KEY,
+    MEDIA_TYPES,
+    TemplateEntry,
+    template_registry,
+)
+
+# Ограничения, действующие, если в шаблоне не заданы _min, _max и _max_length
+NUMBER_MIN = 0
+TEXT_MAX_LENGTH = 10000
+
+CONTAINER_TYPES = frozenset({"box", "object"})
+ARRAY_TYPE = "array"
+COLOR_RE = re.compile(r"#[0-9a-fA-F]{6}")
+# Ключ элемента массива: <имя элемента шаблона>_<номер>, например scene_1
+ITEM_SUFFIX_RE = re.compile(r"_[1-9][0-9]*")
+
+
+@dataclass(frozen=True)
+class ValidationIssue:
+    """
+    Ошибка в промпте.
+    Args:
+        path (str): Путь к полю (например, scenes.scene_1.main.scene_duration).
+        message (str): Описание ошибки.
+    """
+
+    path: str
+    message: str
+
+
+@dataclass
+class Rule:
+    """
+    Правило проверки узла шаблона.
+    Args:
+        kind (str): Тип узла (_type).
+        fields (dict[str, Rule]): Правила дочерних полей контейнера.
+        important (frozenset[str]): Важные поля: хотя бы одно из них
+            должно быть заполнено, иначе контейнер не имеет смысла.
+        required (frozenset[str]): Поля, обязательные все (корень промпта).
+        item_key (str | None): Имя элемента массива.
+        item (Rule | None): Правило элемента массива.
+        options (frozenset[str]): Допустимые значения select и checkbox.
+        minimum (float | None): Минимальное значение числа.
+        maximum (float | None): Максимальное значение числа.
+        max_length (int): Максимальная длина текста.
+        value (object): Единственное допустимое значение readonly.
+    """
+
+    kind: str
+    fields: dict[str, "Rule"] = field(default_factory=dict)
+    important: frozenset[str] = frozenset()
+    required: frozenset[str] = frozenset()
+    item_key: str | None = None
+    item: "Rule | None" = None
+    options: frozenset[str] = frozenset()
+    minimum: float | None = None
+    maximum: float | None = None
+    max_length: int = TEXT_MAX_LENGTH
+    value: object = None
+    check: Callable[[object], str | None] = field(default=None, repr=False)
+
+
+def compile_rules(template: dict) -> dict[tuple[str, ...], Rule]:
+    """
+    Компилирует шаблон в плоскую таблицу правил.
+    Путь поля внутри массива содержит имя элемента шаблона, а не ключ
+    элемента промпта: ("scenes", "scene", "main", "scene_duration").
+    Args:
+        template (dict): Шаблон промпта.
+    Returns:
+        dict[tuple[str, ...], Rule]: Путь -> правило; корень - пустой путь.
+    """
+    rules: dict[tuple[str, ...], Rule] = {}
+
+    def visit(node: dict, path: tuple[str, ...], kind: str) -> Rule:
+        children = [
+            key
+            for key, child in node.items()
+            if not key.startswith("_") and isinstance(child, dict)
+        ]
+        important = frozenset(key for key in children if node[key].get("_important"))
+        rule = Rule(kind=kind)
+        if kind == ARRAY_TYPE:
+            rule.item_key = children[0] if children else None
+        elif not path:
+            # В корне обязательны все важные поля (см. getJsonFromForm)
+            rule.required = important
+        elif kind in CONTAINER_TYPES:
+            rule.important = important
+        else:
+            rule.options = frozenset(
+                option["_value"]
+                for option in node.get("_options", [])
+                if isinstance(option, dict) and "_value" in option
+            )
+            rule.minimum = node.get("_min", NUMBER_MIN if kind == "number" else None)
+            rule.maximum = node.get("_max")
+            rule.max_length = node.get("_max_length", TEXT_MAX_LENGTH)
+            rule.value = node.get("_default")
+        rule.check = CHECKS.get(kind, _check_unknown)(rule)
+        rules[path] = rule
+        if kind == ARRAY_TYPE:
+            if rule.item_key is not None:
+                item_path = path + (rule.item_key,)
+                rule.item = visit(node[rule.item_key], item_path, "object")
+        elif kind in CONTAINER_TYPES:
+            for key in children:
+                child = node[key]
+                kind = child.get("_type", "box")
+                rule.fields[key] = visit(child, path + (key,), kind)
+        return rule
+
+    root = visit(template, (), "box")
+    # Медиафайлы промпта добавляет бот, в шаблоне их нет
+    if MEDIA_KEY not in root.fields:
+        media = Rule(kind="media")
+        media.check = _check_media(media)
+        root.fields[MEDIA_KEY] = rules[(MEDIA_KEY,)] = media
+    return rules
+
+
+def _check_text(rule: Rule) -> Callable[[object], str | None]:
+    def check(value):
+        if not isinstance(value, str):
+            return "must be a string"
+        if len(value) > rule.max_length:
+            return f"must be at most {rule.max_length} characters"
+        return None
+
+    return check
+
+
+def _check_number(rule: Rule) -> Callable[[object], str | None]:
+    def check(value):
+        # Форма отправляет числа строками
+        if isinstance(value, bool):
+            return "must be a number"
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return "must be a number"
+        if not math.isfinite(number):
+            return "must be a number"
+        if rule.minimum is not None and number < rule.minimum:
+            return f"must be at least {rule.minimum}"
+        if rule.maximum is not None and number > rule.maximum:
+            return f"must be at most {rule.maximum}"
+        return None
+
+    return check
+
+
+def _check_select(rule: Rule) -> Callable[[object], str | None]:
+    options = rule.options
+
+    def check(value):
+        if not isinstance(value, str) or value not in options:
+            return "is not an allowed option"
+        return None
+
+    return check
+
+
+def _check_checkbox(rule: Rule) -> Callable[[object], str | None]:
+    options = rule.options
+
+    def check(value):
+        if not isinstance(value, list) or not value:
+            return "must be a non-empty list"
+        if not all(isinstance(item, str) for item in value):
+            return "contains an option that is not allowed"
+        if len(set(value)) != len(value):
+            return "must not contain duplicates"
+        if not options.issuperset(value):
+            return "contains an option that is not allowed"
+        return None
+
+    return check
+
+
+def _check_color(rule: Rule) -> Callable[[object], str | None]:
+    def check(value):
+        if not isinstance(value, str) or not COLOR_RE.fullmatch(value):
+            return "must be a color in #rrggbb format"
+        return None
+
+    return check
+
+
+def _check_readonly(rule: Rule) -> Callable[[object], str | None]:
+    expected = rule.value
+
+    def check(value):
+        if value != expected:
+            return f"must be {expected!r}"
+        return None
+
+    return check
+
+
+def _check_container(rule: Rule) -> Callable[[object], str | None]:
+    def check(value):
+        if not isinstance(value, dict):
+            return "must be an object"
+        return None
+
+    return check
+
+
+def _check_media(rule: Rule) -> Callable[[object], str | None]:
+    types = ", ".join(sorted(MEDIA_TYPES))
+
+    def check(value):
+        if not isinstance(value, dict):
+            return "must be an object"
+        items = value.get("items", [])
+        if not isinstance(items, list):
+            return "items must be a list"
+        for item in items:
+            if not isinstance(item, dict) or item.get("type") not in MEDIA_TYPES:
+                return f"items must have a type: {types}"
+            file_id = item.get("file_id")
+            if not isinstance(file_id, str) or not file_id:
+                return "items must have a file_id"
+            caption = item.get("caption")
+            if caption is not None and not isinstance(caption, str):
+                return "item caption must be a string"
+        return None
+
+    return check
+
+
+def _check_unknown(rule: Rule) -> Callable[[object], str | None]:
+    def check(value):
+        return f"has unsupported field type {rule.kind!r}"
+
+    return check
+
+
+CHECKS: dict[str, Callable[[Rule], Callable[[object], str | None]]] = {
+    "text": _check_text,
+    "textarea": _check_text,
+    "number": _check_number,
+    "select": _check_select,
+    "checkbox": _check_checkbox,
+    "color": _check_color,
+    "readonly": _check_readonly,
+    "box": _check_container,
+    "object": _check_container,
+    "array": _check_container,
+}
+
+
+class TemplateValidator:
+    """
+    Проверка промптов по шаблону (серверный аналог проверок формы).
+    Библиотека для будущего эндпоинта сохранения промптов: сейчас промпты
+    не принимаются сервером, поэтому проверка ни на каком запросе
+    не выполняется. Шаблон компилируется один раз: варианты select -
+    в множества, проверки значений - в замыкания, дочерние правила связаны
+    напрямую, поэтому при проверке шаблон не обходится и путь к полю
+    строится только для сообщений об ошибках.
+    Args:
+        template (dict): Шаблон промпта.
+    """
+
+    def __init__(self, template: dict):
+        self.rules = compile_rules(template)
+        self.root = self.rules[()]
+
+    def _walk(
+        self, data: dict, rule: Rule, location: str, issues: list[ValidationIssue]
+    ) -> None:
+        fields = rule.fields
+        important = rule.important
+        filled = False
+        for key, value in data.items():
+            child = fields.get(key)
+            if child is None:
+                issues.append(ValidationIssue(_join(location, key), "is not allowed"))
+                continue
+            if value is None:
+                continue
+            if key in important:
+                filled = True
+            message = child.check(value)
+            if message is not None:
+                issues.append(ValidationIssue(_join(location, key), message))
+            elif child.fields:
+                self._walk(value, child, _join(location, key), issues)
+            elif child.item is not None:
+                self._walk_items(value, child, _join(location, key), issues)
+        if important and not filled:
+            fields_list = ", ".join(sorted(important))
+            issues.append(ValidationIssue(location, f"requires one of: {fields_list}"))
+        for key in rule.required:
+            if data.get(key) is None:
+                issues.append(ValidationIssue(_join(location, key), "is required"))
+
+    def _walk_items(
+        self, data: dict, rule: Rule, location: str, issues: list[ValidationIssue]
+    ) -> None:
+        item = rule.item
+        prefix = rule.item_key
+        for key, value in data.items():
+            item_location = f"{location}.{key}"
+            if not key.startswith(prefix) or not ITEM_SUFFIX_RE.fullmatch(
+                key, len(prefix)
+            ):
+                issues.append(ValidationIssue(item_location, "is not allowed"))
+                continue
+            message = item.check(value)
+            if message is not None:
+                issues.append(ValidationIssue(item_location, message))
+            else:
+                self._walk(value, item, item_location, issues)
+
+    def validate(self, prompt: dict) -> list[ValidationIssue]:
+        """
+        Проверяет один промпт.
+        Args:
+            prompt (dict): Промпт.
+        Returns:
+            list[ValidationIssue]: Ошибки (пустой список - промпт корректен).
+        """
+        issues: list[ValidationIssue] = []
+        message = self.root.check(prompt)
+        if message is not None:
+            issues.append(ValidationIssue("", message))
+        else:
+            self._walk(prompt, self.root, "", issues)
+        return issues
+
+
+def _join(location: str, key: str) -> str:
+    return f"{location}.{key}" if location else key
+
+
+_validators: dict[str, tuple[TemplateEntry, TemplateValidator]] = {}
+
+
+def get_validator(version: str | None = None) -> TemplateValidator:
+    """
+    Возвращает валидатор для загруженного шаблона.
+    Валидатор компилируется заново, только если шаблон был перезагружен.
+    Args:
+        version (str | None): Версия шаблона, по умолчанию - основная.
+    Returns:
+        TemplateValidator: Валидатор.
+    Raises:
+        KeyError: Если шаблон с такой версией не найден.
+    """
+    entry = template_registry.get(version)
+    cached = _validators.get(entry.version)
+    if cached is None or cached[0] is not entry:
+        cached = (entry, TemplateValidator(entry.data))
+        _validators[entry.version] = cached
+    return cached[1]
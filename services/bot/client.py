@@ -0,0 +1,154 @@
+import time
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+from aiogram.enums import ParseMode
+from aiogram.methods import TelegramMethod
+
+from config.config import BotConfig, get_settings
+from core import metrics
+from services.bot.send_scheduler import outbound_scheduler
+
+_bot: Bot | None = None
+
+
+class BotAPISession(AiohttpSession):
+    """
+    Сессия aiohttp для Bot API с настраиваемым пулом соединений
+    и гистограммами задержек по методам.
+    Соединения с Bot API переиспользуются (keep-alive), адрес сервера
+    кешируется на dns_cache_ttl секунд.
+    Args:
+        api (TelegramAPIServer): Адрес Bot API сервера.
+        limit (int): Максимум одновременных соединений.
+        limit_per_host (int): Максимум соединений с одним хостом (0 - без ограничения).
+        keepalive_timeout (float): Время жизни простаивающего соединения (секунды).
+        dns_cache_ttl (int): Время кеширования DNS (секунды).
+        timeout (float): Время ожидания ответа на запрос (секунды).
+    """
+
+    def __init__(
+        self,
+        api: TelegramAPIServer = PRODUCTION,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 15,
+        dns_cache_ttl: int = 3600,
+        timeout: float = 60,
+    ):
+        super().__init__(api=api, limit=limit, timeout=timeout)
+        # Параметры TCPConnector, с которыми aiogram создает соединения
+        self._connector_init.update(
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            ttl_dns_cache=dns_cache_ttl,
+            use_dns_cache=True,
+        )
+        self.latency: dict[str, metrics.LatencyHistogram] = {}
+        self.errors: dict[str, int] = {}
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod, timeout: int | None = None
+    ):
+        name = method.__api_method__
+        start = time.perf_counter()
+        try:
+            return await super().make_request(bot, method, timeout=timeout)
+        except Exception:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            raise
+        finally:
+            histogram = self.latency.get(name)
+            if histogram is None:
+                histogram = self.latency[name] = metrics.LatencyHistogram()
+            histogram.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        """
+        Возвращает метрики сессии.
+        Returns:
+            dict: Состояние пула соединений, ошибки и задержки по методам.
+        """
+        connector = self._session.connector if self._session else None
+        pool = {"open": False}
+        if connector is not None and not connector.closed:
+            pool = {
+                "open": True,
+                "limit": connector.limit,
+                "limit_per_host": connector.limit_per_host,
+                # Простаивающие соединения, готовые к повторному использованию
+                "idle": sum(len(conns) for conns in connector._conns.values()),
+                "acquired": len(connector._acquired),
+            }
+        return {
+            "pool": pool,
+            "errors": dict(self.errors),
+            "latency": {
+                name: histogram.snapshot()
+                for name, histogram in sorted(self.latency.items())
+            },
+        }
+
+
+def create_session(config: BotConfig) -> BotAPISession:
+    """
+    Создает сессию Bot API с параметрами пула соединений из конфигурации.
+    Если задан адрес BOT_API_SERVER, запросы отправляются на него
+    (локальный Bot API сервер или заглушка в бенчмарках и тестах).
+    Args:
+        config (BotConfig): Конфигурация бота.
+    Returns:
+        BotAPISession: Сессия.
+    """
+    api = PRODUCTION
+    if config.bot_api_server:
+        api = TelegramAPIServer.from_base(config.bot_api_server)
+    return BotAPISession(
+        api=api,
+        limit=config.api_connections_limit,
+        limit_per_host=config.api_connections_per_host,
+        keepalive_timeout=config.api_keepalive_timeout,
+        dns_cache_ttl=config.api_dns_cache_ttl,
+        timeout=config.api_request_timeout,
+    )
+
+
+def create_bot(config: BotConfig) -> Bot:
+    """
+    Создает клиент Telegram Bot API.
+    Args:
+        config (BotConfig): Конфигурация бота.
+    Returns:
+        Bot: Экземпляр бота.
+    """
+    return Bot(
+        token=config.bot_token,
+        session=create_session(config),
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
+
+
+def get_bot() -> Bot:
+    """
+    Возвращает общий для процесса экземпляр бота, создавая его
+    при первом обращении. Исходящие запросы бота проходят через
+    планировщик outbound_scheduler (ограничения частоты Telegram).
+    Returns:
+        Bot: Экземпляр бота.
+    """
+    global _bot
+    if _bot is None:
+        _bot = create_bot(get_settings().bot)
+        _bot.session.middleware(outbound_scheduler)
+        metrics.register("bot_api", _bot.session.snapshot)
+    return _bot
+
+
+async def close_bot() -> None:
+    """
+    Закрывает сессию общего экземпляра бота (соединения с Bot API).
+    """
+    if _bot is not None:
+        await _bot.session.close()
@@ -1,11 +1,11 @@
 from aiogram import F, Router, types
 from aiogram.filters import Command, CommandStart
 
-from config.config import BotConfig
+from config.config import get_settings
 from services.bot.keyboards import main_inline_keyboard, web_app_keyboard
 
 router = Router()
-bot_config = BotConfig()
+bot_config = get_settings().bot
 
 
 @router.message(CommandStart())
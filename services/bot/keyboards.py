@@ -1,8 +1,8 @@
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
 
-from config.config import AppConfig
+from config.config import get_settings
 
-app_config = AppConfig()
+app_config = get_settings().app
 
 
 def web_app_keyboard(base_url: str, message_id: str, chat: str) -> InlineKeyboardMarkup:
@@ -0,0 +1,51 @@
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from core.users import UserProfile, UserWriteBehind
+from services.bot.storage import UserFSMStorage
+
+
+class UserTrackingMiddleware(BaseMiddleware):
+    """
+    Внешний middleware, передающий профиль автора каждого обновления
+    в очередь отложенной записи пользователей.
+    Args:
+        writer (UserWriteBehind): Очередь записи профилей.
+    """
+
+    def __init__(self, writer: UserWriteBehind):
+        self.writer = writer
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is not None:
+            self.writer.submit(UserProfile.from_telegram(user))
+        return await handler(event, data)
+
+
+class FSMWriteCoalescingMiddleware(BaseMiddleware):
+    """
+    Внешний middleware, объединяющий изменения состояния FSM
+    за время обработки одного обновления в одну запись в БД.
+    Args:
+        storage (UserFSMStorage): Хранилище состояний FSM.
+    """
+
+    def __init__(self, storage: UserFSMStorage):
+        self.storage = storage
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        async with self.storage.coalesce():
+            return await handler(event, data)
@@ -0,0 +1,210 @@
+"""
+Получение обновлений Telegram через long polling (альтернатива вебхуку).
+Запускает тот же диспетчер и роутеры, что и веб-приложение, поэтому
+бота можно вынести в отдельный процесс и масштабировать отдельно
+от веб-воркеров FastAPI (в bot_config.toml update_source = "polling").
+
+Запуск:
+    python -m services.bot.polling [--limit N] [--timeout N]
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+
+from aiogram import Bot
+from aiogram.methods import GetUpdates
+from aiogram.types import Update
+
+from config.config import get_settings
+from core.users import user_writer
+from services.api.endpoints.bot import dp, update_queue
+from services.bot.client import close_bot, get_bot
+from services.bot.send_scheduler import outbound_scheduler
+from services.bot.update_queue import UpdateQueue
+from services.web_app.prompt_templates import template_registry
+
+logger = logging.getLogger(__name__)
+
+bot_config = get_settings().bot
+
+# Максимальная пауза между попытками после ошибок getUpdates (секунды)
+MAX_BACKOFF = 30
+
+
+class PollingRunner:
+    """
+    Цикл long polling: запрашивает обновления и ставит их в очередь
+    обработчиков (UpdateQueue), которая обрабатывает обновления разных
+    чатов параллельно, а одного чата - по порядку. Если очередь заполнена,
+    следующие обновления не запрашиваются, пока не освободится место.
+    После stop() текущий запрос и ожидание места в очереди прерываются,
+    а номер последнего принятого обновления подтверждается Telegram,
+    чтобы оно не пришло повторно; непринятые обновления придут снова.
+    Args:
+        bot (Bot): Клиент бота.
+        queue (UpdateQueue): Очередь обработки обновлений.
+        allowed_updates (list[str]): Типы обновлений, которые нужно получать.
+        limit (int): Максимум обновлений за один запрос (1-100).
+        timeout (int): Время ожидания обновлений на сервере (секунды).
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        queue: UpdateQueue,
+        allowed_updates: list[str],
+        limit: int = 100,
+        timeout: int = 30,
+    ):
+        if not 1 <= limit <= 100:
+            raise ValueError("limit must be between 1 and 100")
+        self.bot = bot
+        self.queue = queue
+        self.allowed_updates = allowed_updates
+        self.limit = limit
+        self.timeout = timeout
+        self.offset: int | None = None
+        self._stopping = asyncio.Event()
+        self.stats = {"requests": 0, "received": 0, "errors": 0}
+
+    def stop(self) -> None:
+        """
+        Останавливает получение обновлений.
+        """
+        self._stopping.set()
+
+    async def _unless_stopped(self, awaitable) -> asyncio.Future | None:
+        # Выполняет операцию, прерывая ее вызовом stop()
+        task = asyncio.ensure_future(awaitable)
+        stopping = asyncio.ensure_future(self._stopping.wait())
+        await asyncio.wait({task, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return None
+        return task
+
+    async def _fetch(self) -> list[Update] | None:
+        method = GetUpdates(
+            offset=self.offset,
+            limit=self.limit,
+            timeout=self.timeout,
+            allowed_updates=self.allowed_updates,
+        )
+        fetch = await self._unless_stopped(
+            self.bot(method, request_timeout=self.timeout + self.bot.session.timeout)
+        )
+        if fetch is None:
+            # Обновления прерванного запроса не подтверждены и придут снова
+            return None
+        self.stats["requests"] += 1
+        return fetch.result()
+
+    async def _submit(self, update: Update) -> bool:
+        # Вебхук при заполненной очереди отвечает Telegram ошибкой,
+        # а здесь достаточно подождать места
+        put = await self._unless_stopped(self.queue.put(update))
+        if put is None:
+            return False
+        put.result()
+        return True
+
+    async def run(self) -> None:
+        """
+        Удаляет вебхук и получает обновления до вызова stop().
+        """
+        await self.bot.delete_webhook()
+        failures = 0
+        while not self._stopping.is_set():
+            try:
+                updates = await self._fetch()
+            except Exception as e:
+                failures += 1
+                self.stats["errors"] += 1
+                delay = min(2 ** (failures - 1), MAX_BACKOFF)
+                logger.error(
+                    "Ошибка getUpdates (%s: %s), повтор через %d с",
+                    type(e).__name__,
+                    e,
+                    delay,
+                )
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            if updates is None:
+                break
+            failures = 0
+            for update in updates:
+                if not await self._submit(update):
+                    # Непринятые обновления не подтверждаются и придут снова
+                    break
+                self.offset = update.update_id + 1
+                self.stats["received"] += 1
+        await self._confirm()
+
+    async def _confirm(self) -> None:
+        if self.offset is None:
+            return
+        try:
+            await self.bot(GetUpdates(offset=self.offset, limit=1, timeout=0))
+        except Exception as e:
+            logger.warning("Не удалось подтвердить обновления: %s", e)
+
+
+async def serve(limit: int, timeout: int) -> None:
+    """
+    Запускает бота в режиме long polling и останавливает его по SIGTERM
+    или SIGINT, дождавшись обработки принятых обновлений и отправки ответов.
+    Args:
+        limit (int): Максимум обновлений за один запрос.
+        timeout (int): Время ожидания обновлений на сервере (секунды).
+    """
+    loop = asyncio.get_running_loop()
+    runner = PollingRunner(
+        get_bot(),
+        update_queue,
+        dp.resolve_used_update_types(),
+        limit=limit,
+        timeout=timeout,
+    )
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, runner.stop)
+
+    await template_registry.start()
+    user_writer.start()
+    outbound_scheduler.start()
+    update_queue.start()
+    logger.info("Получение обновлений через long polling")
+    try:
+        await runner.run()
+    finally:
+        logger.info("Остановка: обработка принятых обновлений")
+        await update_queue.stop(bot_config.polling_drain_timeout)
+        await outbound_scheduler.stop()
+        await close_bot()
+        await template_registry.stop()
+        await user_writer.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=bot_config.polling_limit)
+    parser.add_argument("--timeout", type=int, default=bot_config.polling_timeout)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    if bot_config.update_source != "polling":
+        logger.warning(
+            "update_source = %r: веб-приложение тоже устанавливает вебхук",
+            bot_config.update_source,
+        )
+    asyncio.run(serve(args.limit, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
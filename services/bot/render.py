@@ -0,0 +1,533 @@
+import hashlib
+import html
+import json
+from dataclasses import dataclass
+
+from aiogram import Bot
+from aiogram.enums import ParseMode
+from aiogram.types import (
+    InputMediaAudio,
+    InputMediaDocument,
+    InputMediaPhoto,
+    InputMediaVideo,
+    LinkPreviewOptions,
+    Message,
+)
+
+from config.config import get_settings
+from core.prompt_codec import CODEC_KEY, PromptCodec
+from core.utils import TTLCache
+from services.web_app.prompt_templates import (
+    MEDIA_KEY,
+    MEDIA_TYPES,
+    TemplateRegistry,
+    prompt_codec,
+    template_registry,
+)
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен, без него используется json
+    orjson = None
+
+bot_config = get_settings().bot
+
+# Ограничения Telegram: длина текста сообщения после разбора разметки,
+# подписи к медиа и число элементов медиагруппы
+TEXT_LIMIT = 4096
+CAPTION_LIMIT = 1024
+MEDIA_GROUP_LIMIT = 10
+
+CONTAINER_TYPES = frozenset({"box", "object"})
+PRE_OPEN = '<pre><code class="language-json">'
+PRE_CLOSE = "</code></pre>"
+
+INPUT_MEDIA = {
+    "photo": InputMediaPhoto,
+    "video": InputMediaVideo,
+    "document": InputMediaDocument,
+    "audio": InputMediaAudio,
+}
+# Фото и видео можно смешивать в одной медиагруппе, документы и аудио - нет
+MEDIA_GROUP_KIND = {"photo": "visual", "video": "visual"}
+# Медиагруппа требует от 2 файлов: одиночный файл отправляется своим методом
+SEND_SINGLE = {
+    "photo": "send_photo",
+    "video": "send_video",
+    "document": "send_document",
+    "audio": "send_audio",
+}
+
+
+def text_length(text: str) -> int:
+    """
+    Длина текста так, как ее считает Telegram (в единицах UTF-16).
+    Args:
+        text (str): Текст без разметки.
+    Returns:
+        int: Длина.
+    """
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-16-le")) // 2
+
+
+def truncate_text(text: str, limit: int) -> str:
+    """
+    Обрезает текст до limit единиц UTF-16 (так Telegram считает длину).
+    Args:
+        text (str): Текст без разметки.
+        limit (int): Максимальная длина.
+    Returns:
+        str: Текст не длиннее limit.
+    """
+    text = text[:limit]
+    while text_length(text) > limit:
+        # Каждый символ вне BMP сверх лимита занимает две единицы
+        text = text[: len(text) - (text_length(text) - limit + 1) // 2]
+    return text
+
+
+@dataclass(frozen=True)
+class SummaryField:
+    """
+    Поле, выводимое в описании промпта над JSON.
+    Args:
+        path (tuple[str, ...]): Путь к полю.
+        label (str): Подпись поля из шаблона.
+    """
+
+    path: tuple[str, ...]
+    label: str
+
+
+@dataclass(frozen=True)
+class RenderPlan:
+    """
+    План отображения промптов одной версии шаблона.
+    Args:
+        template_hash (str): Хеш шаблона (часть ключа кеша).
+        title_path (tuple[str, ...]): Путь к названию промпта.
+        summary (tuple[SummaryField, ...]): Поля описания по порядку шаблона.
+        fields (frozenset[str]): Поля верхнего уровня, выводимые в JSON.
+    """
+
+    template_hash: str
+    title_path: tuple[str, ...]
+    summary: tuple[SummaryField, ...]
+    fields: frozenset[str]
+
+
+def compile_plan(template: dict, template_hash: str = "") -> RenderPlan:
+    """
+    Обходит шаблон один раз и строит план отображения.
+    В описание попадают простые поля разделов верхнего уровня (например,
+    main), в JSON - все поля шаблона.
+    Args:
+        template (dict): Шаблон промпта.
+        template_hash (str): Хеш шаблона.
+    Returns:
+        RenderPlan: План.
+    """
+    fields = [
+        key
+        for key, node in template.items()
+        if not key.startswith("_") and isinstance(node, dict)
+    ]
+    summary = []
+    for key in fields:
+        node = template[key]
+        if node.get("_type") not in CONTAINER_TYPES:
+            continue
+        for child_key, child in node.items():
+            if child_key.startswith("_") or not isinstance(child, dict):
+                continue
+            if child.get("_type") in CONTAINER_TYPES or child.get("_type") == "array":
+                continue
+            summary.append(
+                SummaryField((key, child_key), child.get("_label") or child_key)
+            )
+    return RenderPlan(
+        template_hash=template_hash,
+        title_path=("title",),
+        summary=tuple(summary),
+        fields=frozenset(fields),
+    )
+
+
+@dataclass(frozen=True)
+class MediaItem:
+    """
+    Медиафайл промпта.
+    Args:
+        type (str): photo, video, document или audio.
+        file_id (str): file_id Telegram.
+        caption (str | None): Подпись (HTML, значение пользователя экранировано).
+    """
+
+    type: str
+    file_id: str
+    caption: str | None = None
+
+
+@dataclass(frozen=True)
+class MediaGroup:
+    """
+    Медиагруппа (не больше MEDIA_GROUP_LIMIT файлов). Группа из одного
+    файла отправляется отдельным сообщением.
+    """
+
+    items: tuple[MediaItem, ...]
+
+    def input_media(self) -> list:
+        """
+        Возвращает элементы для Bot.send_media_group.
+        Returns:
+            list: InputMediaPhoto, InputMediaVideo и т.д.
+        """
+        return [
+            INPUT_MEDIA[item.type](
+                media=item.file_id,
+                caption=item.caption,
+                parse_mode=ParseMode.HTML,
+            )
+            for item in self.items
+        ]
+
+
+@dataclass(frozen=True)
+class RenderedPrompt:
+    """
+    Промпт, подготовленный к отправке.
+    Args:
+        texts (tuple[str, ...]): HTML-сообщения, каждое не длиннее TEXT_LIMIT.
+        media (tuple[MediaGroup, ...]): Медиагруппы.
+        content_hash (str): Хеш содержимого, по которому закеширован результат.
+    """
+
+    texts: tuple[str, ...]
+    media: tuple[MediaGroup, ...]
+    content_hash: str
+
+
+# Строка сообщения: фрагменты (текст, жирный ли) и признак блока JSON
+_Line = tuple[tuple[tuple[str, bool], ...], bool]
+
+
+def _split_line(line: _Line, limit: int) -> list[tuple[_Line, int]]:
+    spans, pre = line
+    length = sum(text_length(text) for text, _ in spans)
+    if length <= limit:
+        return [(line, length)]
+    lines: list[tuple[_Line, int]] = []
+    current: list[tuple[str, bool]] = []
+    size = 0
+    for text, bold in spans:
+        while text:
+            room = limit - size
+            # Срез по символам; суррогатные пары учитываются в text_length
+            piece = text[:room]
+            while text_length(piece) > room:
+                piece = piece[:-1]
+            if not piece and current:
+                # Символ из суррогатной пары не помещается в остаток строки
+                lines.append(((tuple(current), pre), size))
+                current, size = [], 0
+                continue
+            piece = piece or text[0]
+            current.append((piece, bold))
+            size += text_length(piece)
+            text = text[len(piece):]
+            if size >= limit:
+                lines.append(((tuple(current), pre), size))
+                current, size = [], 0
+    if current:
+        lines.append(((tuple(current), pre), size))
+    return lines
+
+
+def _line_html(spans: tuple[tuple[str, bool], ...]) -> str:
+    return "".join(
+        f"<b>{html.escape(text, quote=False)}</b>"
+        if bold
+        else html.escape(text, quote=False)
+        for text, bold in spans
+    )
+
+
+def chunk_lines(lines: list[_Line], limit: int = TEXT_LIMIT) -> list[str]:
+    """
+    Собирает строки в HTML-сообщения, не превышающие limit символов текста.
+    Сообщения режутся по границам строк; строка длиннее limit делится.
+    Блок JSON, попавший в несколько сообщений, в каждом закрывается
+    и открывается заново, поэтому разметка каждого сообщения корректна.
+    Args:
+        lines (list[_Line]): Строки.
+        limit (int): Максимальная длина текста сообщения.
+    Returns:
+        list[str]: HTML-сообщения.
+    """
+    chunks: list[str] = []
+    parts: list[str] = []
+    size = 0
+    in_pre = False
+
+    def flush():
+        nonlocal parts, size, in_pre
+        if in_pre:
+            parts.append(PRE_CLOSE)
+            in_pre = False
+        if parts:
+            chunks.append("".join(parts))
+        parts, size = [], 0
+
+    for line in lines:
+        for (spans, pre), length in _split_line(line, limit):
+            separator = 1 if parts else 0
+            if size + separator + length > limit:
+                flush()
+                separator = 0
+            if separator:
+                parts.append("\n")
+            if pre and not in_pre:
+                parts.append(PRE_OPEN)
+                in_pre = True
+            elif not pre and in_pre:
+                parts.append(PRE_CLOSE)
+                in_pre = False
+            parts.append(_line_html(spans))
+            size += separator + length
+    flush()
+    return chunks
+
+
+def _format_value(value) -> str:
+    if isinstance(value, list):
+        return ", ".join(str(item) for item in value)
+    return str(value)
+
+
+def _get(message: dict, path: tuple[str, ...]):
+    value = message
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _dumps_pretty(value: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False, indent=2)
+
+
+def _media_groups(message: dict) -> tuple[MediaGroup, ...]:
+    media = message.get(MEDIA_KEY)
+    items = media.get("items", []) if isinstance(media, dict) else []
+    groups: list[list[MediaItem]] = []
+    group_kind = None
+    for item in items:
+        if not isinstance(item, dict) or item.get("type") not in MEDIA_TYPES:
+            continue
+        if not item.get("file_id"):
+            continue
+        caption = item.get("caption")
+        if isinstance(caption, str):
+            # Подпись вводит пользователь, а отправляется она с разметкой HTML
+            caption = html.escape(truncate_text(caption, CAPTION_LIMIT), quote=False)
+        else:
+            caption = None
+        media_item = MediaItem(
+            type=item["type"], file_id=item["file_id"], caption=caption
+        )
+        kind = MEDIA_GROUP_KIND.get(media_item.type, media_item.type)
+        if not groups or kind != group_kind or len(groups[-1]) >= MEDIA_GROUP_LIMIT:
+            groups.append([])
+            group_kind = kind
+        groups[-1].append(media_item)
+    return tuple(MediaGroup(tuple(group)) for group in groups)
+
+
+def render_prompt(message: dict, plan: RenderPlan, digest: str = "") -> RenderedPrompt:
+    """
+    Отображает промпт в сообщения Telegram: описание (название и основные
+    поля), JSON промпта и медиагруппы.
+    Args:
+        message (dict): Промпт со значениями по умолчанию (см. PromptCodec.decode).
+        plan (RenderPlan): План отображения версии шаблона промпта.
+        digest (str): Хеш содержимого для RenderedPrompt.
+    Returns:
+        RenderedPrompt: Сообщения и медиагруппы.
+    """
+    lines: list[_Line] = []
+    title = _get(message, plan.title_path)
+    if title:
+        lines.append((((str(title), True),), False))
+    for field in plan.summary:
+        value = _get(message, field.path)
+        if value is None or value == "" or value == []:
+            continue
+        spans = ((f"{field.label}: ", True), (_format_value(value), False))
+        lines.append((spans, False))
+    if lines:
+        lines.append(((), False))
+
+    body = {key: value for key, value in message.items() if key in plan.fields}
+    for row in _dumps_pretty(body).split("\n"):
+        lines.append((((row, False),), True))
+
+    return RenderedPrompt(
+        texts=tuple(chunk_lines(lines)),
+        media=_media_groups(message),
+        content_hash=digest,
+    )
+
+
+def content_hash(message: dict) -> str:
+    """
+    Вычисляет хеш содержимого промпта (порядок ключей не влияет).
+    Args:
+        message (dict): Содержимое колонки message.
+    Returns:
+        str: Хеш.
+    """
+    if orjson is not None:
+        body = orjson.dumps(message, option=orjson.OPT_SORT_KEYS)
+    else:
+        body = json.dumps(
+            message, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+        ).encode("utf-8")
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+class PromptRenderer:
+    """
+    Отображение сохраненных промптов с кешем результатов.
+    Результат кешируется по (prompt_id, хеш содержимого, хеш шаблона),
+    поэтому повторный показ или публикация неизмененного промпта
+    не требует повторного отображения, а изменение промпта или шаблона
+    дает новый ключ. План шаблона строится один раз на версию шаблона.
+    Args:
+        registry (TemplateRegistry): Реестр шаблонов.
+        codec (PromptCodec): Кодек хранения промптов.
+        cache_size (int): Число промптов в кеше.
+        cache_ttl (float): Время жизни записи кеша (секунды).
+    """
+
+    def __init__(
+        self,
+        registry: TemplateRegistry,
+        codec: PromptCodec,
+        cache_size: int,
+        cache_ttl: float,
+    ):
+        self.registry = registry
+        self.codec = codec
+        self._plans: dict[str, RenderPlan] = {}
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.stats = {"hits": 0, "misses": 0}
+
+    def plan(self, version: str | None) -> RenderPlan:
+        """
+        Возвращает план отображения версии шаблона.
+        Args:
+            version (str | None): Версия шаблона.
+        Returns:
+            RenderPlan: План.
+        Raises:
+            KeyError: Если шаблон не найден.
+        """
+        entry = self.registry.get(version)
+        plan = self._plans.get(entry.version)
+        if plan is None or plan.template_hash != entry.hash:
+            plan = compile_plan(entry.data, entry.hash)
+            self._plans[entry.version] = plan
+        return plan
+
+    def render(
+        self, prompt_id: int, message: dict, digest: str | None = None
+    ) -> RenderedPrompt:
+        """
+        Отображает сохраненный промпт, используя кеш.
+        Args:
+            prompt_id (int): ID промпта.
+            message (dict): Содержимое колонки message (может быть сжато кодеком).
+            digest (str | None): Хеш содержимого, если уже известен.
+        Returns:
+            RenderedPrompt: Сообщения и медиагруппы.
+        Raises:
+            KeyError: Если шаблон версии промпта не найден.
+        """
+        plan = self.plan(message.get("version"))
+        digest = digest or content_hash(message)
+        key = (prompt_id, digest, plan.template_hash)
+        rendered = self._cache.get(key)
+        if rendered is not None:
+            self.stats["hits"] += 1
+            return rendered
+        self.stats["misses"] += 1
+        decoded = self.codec.decode(message)
+        rendered = render_prompt(
+            {k: v for k, v in decoded.items() if k != CODEC_KEY}, plan, digest
+        )
+        self._cache.set(key, rendered)
+        return rendered
+
+
+async def send_rendered(
+    bot: Bot,
+    chat_id: int,
+    rendered: RenderedPrompt,
+    message_thread_id: int | None = None,
+) -> list[Message]:
+    """
+    Отправляет отображенный промпт: текстовые сообщения, затем медиагруппы
+    (одиночные файлы - методами send_photo, send_video и т.д.).
+    Args:
+        bot (Bot): Клиент бота.
+        chat_id (int): ID чата.
+        rendered (RenderedPrompt): Промпт.
+        message_thread_id (int | None): ID темы супергруппы.
+    Returns:
+        list[Message]: Отправленные сообщения.
+    """
+    sent: list[Message] = []
+    for text in rendered.texts:
+        sent.append(
+            await bot.send_message(
+                chat_id,
+                text,
+                message_thread_id=message_thread_id,
+                parse_mode=ParseMode.HTML,
+                link_preview_options=LinkPreviewOptions(is_disabled=True),
+            )
+        )
+    for group in rendered.media:
+        if len(group.items) == 1:
+            item = group.items[0]
+            send = getattr(bot, SEND_SINGLE[item.type])
+            sent.append(
+                await send(
+                    chat_id,
+                    item.file_id,
+                    caption=item.caption,
+                    parse_mode=ParseMode.HTML,
+                    message_thread_id=message_thread_id,
+                )
+            )
+            continue
+        sent.extend(
+            await bot.send_media_group(
+                chat_id, group.input_media(), message_thread_id=message_thread_id
+            )
+        )
+    return sent
+
+
+prompt_renderer = PromptRenderer(
+    template_registry,
+    prompt_codec,
+    cache_size=bot_config.render_cache_size,
+    cache_ttl=bot_config.render_cache_ttl,
+)
@@ -0,0 +1,469 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import (
+    EditMessageCaption,
+    EditMessageMedia,
+    EditMessageReplyMarkup,
+    EditMessageText,
+    Response,
+    TelegramMethod,
+)
+
+from config.config import get_settings
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+bot_config = get_settings().bot
+
+# Полосы приоритета: ответы пользователю отправляются раньше массовых рассылок
+INTERACTIVE = 0
+BULK = 1
+LANES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+send_priority: ContextVar[int] = ContextVar("send_priority", default=INTERACTIVE)
+
+# Изменения сообщения, из которых в очереди достаточно оставить последнее
+COALESCED_METHODS = (
+    EditMessageText,
+    EditMessageCaption,
+    EditMessageReplyMarkup,
+    EditMessageMedia,
+)
+
+
+# Методы, отправляющие и изменяющие сообщения: на них действуют лимиты
+# Telegram на отправку. Остальные запросы (getChat, sendChatAction и т.д.)
+# выполняются без очереди
+THROTTLED_PREFIXES = ("send", "copyMessage", "forwardMessage", "editMessage")
+UNTHROTTLED_METHODS = frozenset({"sendChatAction"})
+
+
+def is_throttled(method: TelegramMethod) -> bool:
+    """
+    Проверяет, проходит ли запрос через ограничение скорости отправки.
+    Args:
+        method (TelegramMethod): Метод Bot API.
+    Returns:
+        bool: True для отправки и изменения сообщений.
+    """
+    name = method.__api_method__
+    return name.startswith(THROTTLED_PREFIXES) and name not in UNTHROTTLED_METHODS
+
+
+@contextmanager
+def send_lane(priority: int) -> Iterator[None]:
+    """
+    Задает полосу приоритета запросов к Bot API, выполняемых внутри блока.
+    Пример: with send_lane(BULK): await bot.send_message(...)
+    Args:
+        priority (int): INTERACTIVE или BULK.
+    """
+    token = send_priority.set(priority)
+    try:
+        yield
+    finally:
+        send_priority.reset(token)
+
+
+class TokenBucket:
+    """
+    Ведро токенов: не больше rate запросов в секунду в среднем
+    и не больше capacity подряд.
+    Args:
+        rate (float): Скорость пополнения (токенов в секунду).
+        capacity (float): Емкость ведра.
+        now (float): Текущее время.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1, now: float = 0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """
+        Возвращает время до появления токена.
+        Args:
+            now (float): Текущее время.
+        Returns:
+            float: Задержка в секундах (0 - токен есть).
+        """
+        self._refill(now)
+        wait = self.blocked_until - now
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return max(wait, 0.0)
+
+    def consume(self, now: float) -> None:
+        """
+        Забирает токен.
+        Args:
+            now (float): Текущее время.
+        """
+        self._refill(now)
+        self.tokens -= 1
+
+    def block(self, until: float) -> None:
+        """
+        Запрещает выдачу токенов до указанного времени (ответ RetryAfter).
+        Args:
+            until (float): Время окончания блокировки.
+        """
+        self.blocked_until = max(self.blocked_until, until)
+        self.tokens = min(self.tokens, 0)
+
+    def idle(self, now: float) -> bool:
+        """
+        Проверяет, что ведро полное и не заблокировано.
+        Args:
+            now (float): Текущее время.
+        Returns:
+            bool: True, если состояние ведра можно не хранить.
+        """
+        self._refill(now)
+        return self.tokens >= self.capacity and now >= self.blocked_until
+
+
+@dataclass
+class _Request:
+    priority: int
+    seq: int
+    bot: Bot
+    method: TelegramMethod
+    make_request: NextRequestMiddlewareType
+    enqueued_at: float
+    futures: list[asyncio.Future] = field(default_factory=list)
+    attempts: int = 0
+
+
+@dataclass
+class _Chat:
+    buckets: list[TokenBucket]
+    queue: deque[_Request] = field(default_factory=deque)
+    in_flight: bool = False
+    scheduled: bool = False
+
+    def delay(self, now: float) -> float:
+        return max(bucket.delay(now) for bucket in self.buckets)
+
+
+def coalesce_key(method: TelegramMethod) -> tuple | None:
+    """
+    Возвращает ключ, по которому объединяются изменения одного сообщения.
+    Args:
+        method (TelegramMethod): Метод Bot API.
+    Returns:
+        tuple | None: Ключ или None, если метод не объединяется.
+    """
+    if not isinstance(method, COALESCED_METHODS):
+        return None
+    return (
+        type(method),
+        method.chat_id,
+        method.message_id,
+        method.inline_message_id,
+    )
+
+
+class OutboundScheduler(BaseRequestMiddleware):
+    """
+    Планировщик исходящих запросов к Bot API (middleware сессии бота).
+    Отправка и изменение сообщений (см. is_throttled) проходят через
+    ведра токенов: общее (global_rate в секунду), ведро чата (chat_rate
+    в секунду) и для групп и каналов еще одно (group_rate в минуту).
+    Запросы одного чата отправляются строго по очереди, из готовых чатов
+    первым выбирается запрос с более высоким приоритетом (см. send_lane).
+    Ответ RetryAfter на запрос в чат блокирует на указанное время только
+    этот чат (остальные чаты продолжают получать ответы), после чего
+    запрос повторяется. RetryAfter на запрос без chat_id относится
+    ко всему боту и блокирует общее ведро.
+    Изменения одного и того же сообщения, еще не отправленные,
+    объединяются: отправляется только последнее, все вызовы получают
+    его результат. Прочие запросы выполняются сразу.
+    Args:
+        global_rate (float): Запросов в секунду на всего бота.
+        chat_rate (float): Запросов в секунду в один чат.
+        chat_burst (int): Запросов подряд в один чат.
+        group_rate (float): Запросов в минуту в одну группу или канал.
+        max_retries (int): Число повторов после RetryAfter.
+    """
+
+    def __init__(
+        self,
+        global_rate: float,
+        chat_rate: float,
+        chat_burst: int,
+        group_rate: float,
+        max_retries: int,
+    ):
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self._global: TokenBucket | None = None
+        self._chats: dict[int | str, _Chat] = {}
+        # Готовые к отправке чаты: (приоритет, номер запроса, чат)
+        self._ready: list[tuple[int, int, int | str]] = []
+        # Чаты, ожидающие токена: (время готовности, чат)
+        self._timers: list[tuple[float, int | str]] = []
+        self._seq = itertools.count()
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._sending: set[asyncio.Task] = set()
+        self.queue_wait = {lane: metrics.LatencyHistogram() for lane in LANES}
+        self.stats = {
+            "enqueued": 0,
+            "sent": 0,
+            "failed": 0,
+            "coalesced": 0,
+            "retry_after": 0,
+        }
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+    def _chat(self, chat_id: int | str) -> _Chat:
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            now = self._now()
+            buckets = [TokenBucket(self.chat_rate, self.chat_burst, now)]
+            # Группы, супергруппы и каналы (@username) имеют отрицательный ID
+            if isinstance(chat_id, str) or chat_id < 0:
+                buckets.append(TokenBucket(self.group_rate / 60, 1, now))
+            chat = self._chats[chat_id] = _Chat(buckets)
+        return chat
+
+    def _schedule(self, chat_id: int | str) -> None:
+        chat = self._chats[chat_id]
+        if chat.scheduled or chat.in_flight:
+            return
+        now = self._now()
+        if not chat.queue:
+            if all(bucket.idle(now) for bucket in chat.buckets):
+                del self._chats[chat_id]
+            return
+        delay = chat.delay(now)
+        if delay > 0:
+            heapq.heappush(self._timers, (now + delay, chat_id))
+        else:
+            head = chat.queue[0]
+            heapq.heappush(self._ready, (head.priority, head.seq, chat_id))
+        chat.scheduled = True
+        self._wakeup.set()
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod,
+    ) -> Response:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None or not is_throttled(method):
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if chat_id is None and self._global is not None:
+                    # Ограничение без чата относится ко всему боту
+                    self.stats["retry_after"] += 1
+                    self._global.block(self._now() + e.retry_after)
+                raise
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        chat = self._chat(chat_id)
+        key = coalesce_key(method)
+        if key is not None:
+            for pending in chat.queue:
+                if coalesce_key(pending.method) == key:
+                    pending.method = method
+                    pending.make_request = make_request
+                    pending.futures.append(future)
+                    self.stats["coalesced"] += 1
+                    return await future
+        chat.queue.append(
+            _Request(
+                priority=send_priority.get(),
+                seq=next(self._seq),
+                bot=bot,
+                method=method,
+                make_request=make_request,
+                enqueued_at=self._now(),
+                futures=[future],
+            )
+        )
+        self.stats["enqueued"] += 1
+        self._schedule(chat_id)
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            now = self._now()
+            while self._timers and self._timers[0][0] <= now:
+                _, chat_id = heapq.heappop(self._timers)
+                chat = self._chats[chat_id]
+                chat.scheduled = False
+                self._schedule(chat_id)
+            if not self._ready:
+                timeout = self._timers[0][0] - now if self._timers else None
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            delay = self._global.delay(now)
+            if delay > 0:
+                # После ожидания выбор повторяется: мог прийти запрос важнее
+                await asyncio.sleep(delay)
+                continue
+            _, _, chat_id = heapq.heappop(self._ready)
+            chat = self._chats[chat_id]
+            chat.scheduled = False
+            if chat.delay(now) > 0:
+                # Чат заблокирован ответом RetryAfter после постановки в очередь
+                self._schedule(chat_id)
+                continue
+            request = chat.queue.popleft()
+            for bucket in chat.buckets:
+                bucket.consume(now)
+            self._global.consume(now)
+            chat.in_flight = True
+            self.queue_wait[request.priority].observe(now - request.enqueued_at)
+            task = asyncio.create_task(self._send(chat_id, chat, request))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, chat_id: int | str, chat: _Chat, request: _Request) -> None:
+        try:
+            result = await request.make_request(request.bot, request.method)
+        except TelegramRetryAfter as e:
+            self.stats["retry_after"] += 1
+            for bucket in chat.buckets:
+                bucket.block(self._now() + e.retry_after)
+            if request.attempts < self.max_retries:
+                logger.warning(
+                    "RetryAfter %s с в чате %s, повтор запроса", e.retry_after, chat_id
+                )
+                request.attempts += 1
+                chat.queue.appendleft(request)
+            else:
+                self._resolve(request, exception=e)
+        except BaseException as e:
+            self._resolve(request, exception=e)
+            if not isinstance(e, Exception):
+                raise
+        else:
+            self._resolve(request, result=result)
+        finally:
+            chat.in_flight = False
+            self._schedule(chat_id)
+
+    def _resolve(self, request: _Request, result=None, exception=None) -> None:
+        self.stats["failed" if exception is not None else "sent"] += 1
+        for future in request.futures:
+            if future.done():
+                continue
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+
+    def depth(self) -> int:
+        """
+        Возвращает число запросов, ожидающих отправки.
+        Returns:
+            int: Число запросов.
+        """
+        return sum(len(chat.queue) for chat in self._chats.values())
+
+    def start(self) -> None:
+        """
+        Запускает планировщик (вызывается и при первом запросе).
+        """
+        if self._task is None:
+            self._global = TokenBucket(self.global_rate, self.global_rate, self._now())
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10) -> None:
+        """
+        Дожидается отправки очереди (не дольше timeout) и останавливает
+        планировщик. Неотправленные запросы отменяются.
+        Args:
+            timeout (float): Максимальное время ожидания в секундах.
+        """
+        if self._task is None:
+            return
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while (self.depth() or self._sending) and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        if self.depth():
+            logger.warning("Остановка с неотправленными запросами: %d", self.depth())
+        self._task.cancel()
+        for task in self._sending:
+            task.cancel()
+        await asyncio.gather(self._task, *self._sending, return_exceptions=True)
+        for chat in self._chats.values():
+            for request in chat.queue:
+                for future in request.futures:
+                    future.cancel()
+        self._chats.clear()
+        self._ready.clear()
+        self._timers.clear()
+        self._task = None
+
+    def snapshot(self) -> dict:
+        """
+        Возвращает метрики планировщика.
+        Returns:
+            dict: Глубина очереди по полосам, счетчики и время ожидания.
+        """
+        depth = {name: 0 for name in LANES.values()}
+        for chat in self._chats.values():
+            for request in chat.queue:
+                depth[LANES[request.priority]] += 1
+        return {
+            "depth": depth,
+            "chats": len(self._chats),
+            "in_flight": len(self._sending),
+            **self.stats,
+            "queue_wait": {
+                name: self.queue_wait[lane].snapshot() for lane, name in LANES.items()
+            },
+        }
+
+
+outbound_scheduler = OutboundScheduler(
+    global_rate=bot_config.send_global_rate,
+    chat_rate=bot_config.send_chat_rate,
+    chat_burst=bot_config.send_chat_burst,
+    group_rate=bot_config.send_group_rate,
+    max_retries=bot_config.send_max_retries,
+)
+metrics.register("outbound_scheduler", outbound_scheduler.snapshot)
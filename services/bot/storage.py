@@ -0,0 +1,191 @@
+import copy
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from sqlalchemy import String, bindparam, func, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models import User
+
+logger = logging.getLogger(__name__)
+
+class _UpdateDocuments:
+    """
+    Документы пользователей, прочитанные в текущем обновлении,
+    и измененные в нем записи.
+    """
+
+    def __init__(self):
+        self.documents: dict[int, dict] = {}
+        self.dirty: dict[tuple[int, str], None] = {}
+
+
+# Состояние текущего обновления (см. UserFSMStorage.coalesce)
+_update_documents: ContextVar[_UpdateDocuments | None] = ContextVar(
+    "fsm_update_documents", default=None
+)
+
+
+def storage_key_id(key: StorageKey) -> str:
+    """
+    Формирует ключ записи состояния внутри users.fsm_data.
+    Args:
+        key (StorageKey): Ключ хранилища aiogram.
+    Returns:
+        str: Строковый ключ (бот, чат, тема, бизнес-подключение, назначение).
+    """
+    return ":".join(
+        str(part) if part is not None else ""
+        for part in (
+            key.bot_id,
+            key.chat_id,
+            key.thread_id,
+            key.business_connection_id,
+            key.destiny,
+        )
+    )
+
+
+class UserFSMStorage(BaseStorage):
+    """
+    Хранилище состояний FSM aiogram в колонке users.fsm_data.
+    Все состояния пользователя (по чатам и темам) хранятся одним JSON-документом
+    в его строке таблицы users, но записываются по одной записи (чат, тема),
+    поэтому процессы, работающие с разными чатами пользователя, не затирают
+    изменения друг друга.
+    Состояние всегда читается из БД: обновления одного пользователя могут
+    обрабатывать разные процессы (воркеры gunicorn), поэтому общего для
+    процесса кеша нет. Внутри coalesce() документ читается один раз
+    за обновление и переиспользуется до конца обновления, изменения
+    сохраняются при выходе из контекста, поэтому шаг формы
+    (set_state + update_data) стоит одно чтение и одну запись на запись
+    состояния.
+    Состояние записывается только в существующую строку users: профиль
+    пользователя создает очередь записи профилей (ensure_user), хранилище
+    строк-заглушек не создает.
+    Args:
+        session_factory (Callable[[], AsyncSession]): Фабрика сессий БД.
+        ensure_user (Callable[[int], Awaitable[None]] | None): Записывает
+            ожидающий записи профиль пользователя, если строки еще нет.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        ensure_user: Callable[[int], Awaitable[None]] | None = None,
+    ):
+        self._session_factory = session_factory
+        self._ensure_user = ensure_user
+        self.stats = {"reads": 0, "update_hits": 0, "writes": 0, "skipped": 0}
+
+    async def _read(self, user_id: int) -> dict:
+        self.stats["reads"] += 1
+        async with self._session_factory() as session:
+            document = await session.scalar(
+                select(User.fsm_data).where(User.user_id == user_id)
+            )
+        return document or {}
+
+    async def _load(self, user_id: int) -> dict:
+        update = _update_documents.get()
+        if update is None:
+            return await self._read(user_id)
+        # Документ из БД, который читает и меняет текущее обновление
+        document = update.documents.get(user_id)
+        if document is not None:
+            self.stats["update_hits"] += 1
+            return document
+        document = update.documents[user_id] = await self._read(user_id)
+        return document
+
+    async def _write(self, user_id: int, record_id: str, record: dict | None) -> None:
+        key = bindparam("record_id", record_id, type_=String)
+        current = func.coalesce(User.fsm_data, literal({}, JSONB))
+        if record:
+            value = func.jsonb_build_object(
+                key, bindparam("record", record, type_=JSONB)
+            )
+            updated = current.op("||")(value)
+        else:
+            updated = current.op("-")(key)
+        stmt = update(User).where(User.user_id == user_id).values(fsm_data=updated)
+        written = await self._execute(stmt)
+        if not written and self._ensure_user is not None:
+            # Профиль нового пользователя еще в очереди записи
+            await self._ensure_user(user_id)
+            written = await self._execute(stmt)
+        if not written:
+            self.stats["skipped"] += 1
+            logger.warning(
+                "Пользователь %d не найден, состояние FSM не сохранено", user_id
+            )
+            return
+        self.stats["writes"] += 1
+
+    async def _execute(self, stmt) -> bool:
+        async with self._session_factory() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount > 0
+
+    async def _update(self, key: StorageKey, field: str, value: Any) -> None:
+        update = _update_documents.get()
+        document = await self._load(key.user_id)
+        record_id = storage_key_id(key)
+        record = document.setdefault(record_id, {})
+        if value:
+            record[field] = value
+        else:
+            record.pop(field, None)
+        if not record:
+            del document[record_id]
+
+        if update is not None:
+            update.dirty[(key.user_id, record_id)] = None
+        else:
+            await self._write(key.user_id, record_id, document.get(record_id))
+
+    @asynccontextmanager
+    async def coalesce(self) -> AsyncIterator[None]:
+        """
+        Откладывает запись изменений до выхода из контекста.
+        Документ каждого пользователя читается из БД один раз,
+        каждая измененная запись сохраняется одним запросом.
+        """
+        update = _UpdateDocuments()
+        token = _update_documents.set(update)
+        try:
+            yield
+        finally:
+            _update_documents.reset(token)
+            for user_id, record_id in update.dirty:
+                record = update.documents[user_id].get(record_id)
+                await self._write(user_id, record_id, record)
+
+    async def set_state(
+        self, key: StorageKey, state: str | State | None = None
+    ) -> None:
+        if isinstance(state, State):
+            state = state.state
+        await self._update(key, "state", state)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        document = await self._load(key.user_id)
+        return document.get(storage_key_id(key), {}).get("state")
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        await self._update(key, "data", copy.deepcopy(dict(data)))
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        document = await self._load(key.user_id)
+        return copy.deepcopy(document.get(storage_key_id(key), {}).get("data", {}))
+
+    async def close(self) -> None:
+        # Соединения принадлежат фабрике сессий, закрывать нечего
+        pass
@@ -0,0 +1,148 @@
+import json
+from collections import Counter, OrderedDict
+
+from aiogram import Dispatcher
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен, без него используется json
+    orjson = None
+
+
+def loads(body: bytes) -> dict:
+    """
+    Разбирает тело запроса в JSON (orjson, если он установлен).
+    Args:
+        body (bytes): Тело запроса.
+    Returns:
+        dict: Разобранный JSON.
+    Raises:
+        ValueError: Если тело не является корректным JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def update_type(payload: dict) -> str | None:
+    """
+    Определяет тип обновления по ключу верхнего уровня.
+    Args:
+        payload (dict): Разобранное обновление Telegram.
+    Returns:
+        str | None: Тип обновления (message, callback_query, ...) или None.
+    """
+    for key in payload:
+        if key != "update_id":
+            return key
+    return None
+
+
+class UpdateTypeFilter:
+    """
+    Отбрасывает обновления, для которых в диспетчере нет обработчиков,
+    до построения моделей aiogram (pydantic).
+    Набор обрабатываемых типов вычисляется по роутерам диспетчера
+    при первом обращении.
+    Args:
+        dispatcher (Dispatcher): Диспетчер aiogram.
+    """
+
+    def __init__(self, dispatcher: Dispatcher):
+        self.dispatcher = dispatcher
+        self._allowed: frozenset[str] | None = None
+        self.accepted = 0
+        self.short_circuited: Counter[str] = Counter()
+
+    @property
+    def allowed(self) -> frozenset[str]:
+        """
+        Типы обновлений, для которых зарегистрированы обработчики.
+        """
+        if self._allowed is None:
+            self._allowed = frozenset(self.dispatcher.resolve_used_update_types())
+        return self._allowed
+
+    def accepts(self, payload: dict) -> bool:
+        """
+        Проверяет, нужно ли передавать обновление в диспетчер.
+        Args:
+            payload (dict): Разобранное обновление Telegram.
+        Returns:
+            bool: True, если обновление будет обработано.
+        """
+        kind = update_type(payload)
+        if kind in self.allowed:
+            self.accepted += 1
+            return True
+        self.short_circuited[kind or "unknown"] += 1
+        return False
+
+    def snapshot(self) -> dict:
+        """
+        Возвращает счетчики принятых и отброшенных обновлений.
+        Returns:
+            dict: Счетчики по типам обновлений.
+        """
+        return {
+            "allowed": sorted(self.allowed),
+            "accepted": self.accepted,
+            "short_circuited": sum(self.short_circuited.values()),
+            "short_circuited_by_type": dict(self.short_circuited),
+        }
+
+
+class UpdateDeduplicator:
+    """
+    Отсеивает повторные доставки обновлений по update_id.
+    Хранит скользящее окно последних update_id в упорядоченном множестве:
+    проверка и вытеснение самого старого ID выполняются за O(1).
+    Args:
+        window (int): Число запоминаемых update_id.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._seen: OrderedDict[int, None] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def check_and_add(self, update_id: int) -> bool:
+        """
+        Проверяет, встречался ли update_id, и запоминает его.
+        Args:
+            update_id (int): ID обновления.
+        Returns:
+            bool: True, если обновление уже было принято (дубликат).
+        """
+        if update_id in self._seen:
+            self.hits += 1
+            return True
+        self.misses += 1
+        self._seen[update_id] = None
+        if len(self._seen) > self.window:
+            self._seen.popitem(last=False)
+        return False
+
+    def discard(self, update_id: int) -> None:
+        """
+        Забывает update_id, чтобы повторная доставка была обработана.
+        Используется, если обновление не удалось принять.
+        Args:
+            update_id (int): ID обновления.
+        """
+        self._seen.pop(update_id, None)
+
+    def snapshot(self) -> dict:
+        """
+        Возвращает счетчики дубликатов.
+        Returns:
+            dict: Число дубликатов, уникальных обновлений и доля дубликатов.
+        """
+        total = self.hits + self.misses
+        return {
+            "window": self.window,
+            "duplicates": self.hits,
+            "unique": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
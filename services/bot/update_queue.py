@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateQueueFull(Exception):
+    """
+    Очередь обновлений переполнена, обновление не принято.
+    """
+
+
+def ordering_key(update: Update) -> int:
+    """
+    Определяет ключ упорядочивания обновления (ID чата или пользователя).
+    Обновления с одинаковым ключом обрабатываются строго по порядку.
+    Args:
+        update (Update): Обновление Telegram.
+    Returns:
+        int: Ключ упорядочивания.
+    """
+    try:
+        event = update.event
+    except Exception:  # неизвестный тип обновления
+        return update.update_id
+    chat = getattr(event, "chat", None)
+    if chat is None:
+        message = getattr(event, "message", None)
+        chat = getattr(message, "chat", None)
+    if chat is not None:
+        return chat.id
+    user = getattr(event, "from_user", None) or getattr(event, "user", None)
+    if user is not None:
+        return user.id
+    return update.update_id
+
+
+class UpdateQueue:
+    """
+    Очередь входящих обновлений с пулом обработчиков.
+    Вебхук ставит обновление в очередь и сразу отвечает Telegram,
+    обработку выполняют фоновые задачи. Каждый обработчик имеет свою
+    очередь, а обновления распределяются по ключу чата, поэтому
+    обновления одного чата обрабатываются последовательно.
+    Args:
+        dispatcher (Dispatcher): Диспетчер aiogram.
+        get_bot (Callable[[], Bot]): Функция, возвращающая экземпляр бота.
+        workers (int): Число обработчиков.
+        maxsize (int): Максимальное общее число обновлений в очереди.
+        enqueue_timeout (float): Время ожидания места в переполненной очереди.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        get_bot: Callable[[], Bot],
+        workers: int,
+        maxsize: int,
+        enqueue_timeout: float,
+    ):
+        self.dispatcher = dispatcher
+        self.get_bot = get_bot
+        self.workers = max(workers, 1)
+        self.enqueue_timeout = enqueue_timeout
+        shard_size = max(maxsize // self.workers, 1)
+        self._queues: list[asyncio.Queue[tuple[float, Update]]] = [
+            asyncio.Queue(maxsize=shard_size) for _ in range(self.workers)
+        ]
+        self._tasks: list[asyncio.Task] = []
+        self.queue_wait = metrics.LatencyHistogram()
+        self.processing_time = metrics.LatencyHistogram()
+        self.stats = {"enqueued": 0, "rejected": 0, "processed": 0, "failed": 0}
+
+    def depth(self) -> int:
+        """
+        Возвращает текущее число обновлений в очереди.
+        Returns:
+            int: Число ожидающих обработки обновлений.
+        """
+        return sum(queue.qsize() for queue in self._queues)
+
+    async def enqueue(self, update: Update) -> None:
+        """
+        Ставит обновление в очередь своего обработчика.
+        Если очередь заполнена, ждет освобождения места не дольше enqueue_timeout.
+        Args:
+            update (Update): Обновление Telegram.
+        Raises:
+            UpdateQueueFull: Если место в очереди не освободилось.
+        """
+        queue = self._queues[ordering_key(update) % self.workers]
+        item = (time.perf_counter(), update)
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(queue.put(item), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.stats["rejected"] += 1
+                raise UpdateQueueFull()
+        self.stats["enqueued"] += 1
+
+    async def put(self, update: Update) -> None:
+        """
+        Ставит обновление в очередь своего обработчика, ожидая места
+        без ограничения времени (long polling: следующие обновления
+        не запрашиваются, пока это не принято). Ожидание можно отменить,
+        тогда обновление в очередь не попадает.
+        Args:
+            update (Update): Обновление Telegram.
+        """
+        queue = self._queues[ordering_key(update) % self.workers]
+        await queue.put((time.perf_counter(), update))
+        self.stats["enqueued"] += 1
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            enqueued_at, update = await queue.get()
+            started_at = time.perf_counter()
+            self.queue_wait.observe(started_at - enqueued_at)
+            try:
+                await self.dispatcher.feed_update(self.get_bot(), update)
+                self.stats["processed"] += 1
+            except Exception:
+                self.stats["failed"] += 1
+                logger.exception("Ошибка обработки обновления %s", update.update_id)
+            finally:
+                self.processing_time.observe(time.perf_counter() - started_at)
+                queue.task_done()
+
+    def start(self) -> None:
+        """
+        Запускает обработчики очереди.
+        """
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker(queue)) for queue in self._queues
+            ]
+
+    async def stop(self, timeout: float = 10) -> None:
+        """
+        Дожидается обработки очереди (не дольше timeout) и останавливает обработчики.
+        Args:
+            timeout (float): Максимальное время ожидания в секундах.
+        """
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)), timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Остановка с необработанными обновлениями: %d", self.depth())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def snapshot(self) -> dict:
+        """
+        Возвращает метрики очереди.
+        Returns:
+            dict: Глубина очереди, счетчики и гистограммы задержек.
+        """
+        return {
+            "depth": self.depth(),
+            "workers": self.workers,
+            **self.stats,
+            "queue_wait": self.queue_wait.snapshot(),
+            "processing_time": self.processing_time.snapshot(),
+        }
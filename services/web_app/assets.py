@@ -0,0 +1,381 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+from core.utils import compress_variants
+
+# Бандлы: имя -> исходные файлы в порядке подключения.
+# Скрипты подключаются с defer и выполняются по порядку после разбора
+# страницы, поэтому скрипты из head и из конца body собраны в один бандл.
+BUNDLES: dict[str, list[str]] = {
+    "app.js": [
+        "start.js",
+        "json_prompt.js",
+        "templates.js",
+        "script.js",
+        "media.js",
+        "create_element.js",
+        "create_form.js",
+        "form_work.js",
+        "form.js",
+    ],
+    "app.css": ["style.css", "menu.css"],
+}
+
+DIST_DIRECTORY = "dist"
+MANIFEST_NAME = "manifest.json"
+# Длина хеша содержимого в имени файла
+FINGERPRINT_LENGTH = 12
+
+_IDENTIFIER_CHARS = frozenset(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$\\"
+)
+# Символы, после которых в JS начинается регулярное выражение, а не деление
+_REGEX_PRECEDERS = frozenset("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = frozenset(
+    "return typeof instanceof in of new delete void throw case do else yield await"
+    .split()
+)
+# Пробел рядом с этими символами можно удалить
+_JS_TIGHT = frozenset("{}()[];,:=<>?!&|*%^~")
+# Операторы, пробел между которыми и идентификатором можно удалить
+_JS_OPERATORS = frozenset("+-/")
+# Пары символов, которые нельзя склеивать (комментарии, инкременты, <!--)
+_JS_FORBIDDEN_PAIRS = frozenset(("//", "/*", "*/", "<!", "--", "++"))
+# Перенос строки можно удалить после этих символов или перед ними (ASI)
+_JS_NEWLINE_AFTER = frozenset("{;,([")
+_JS_NEWLINE_BEFORE = frozenset(")]},;")
+_CSS_TIGHT = frozenset("{};,>")
+
+
+def _is_identifier_char(char: str) -> bool:
+    return char in _IDENTIFIER_CHARS or not char.isascii()
+
+
+def _skip_string(source: str, start: int) -> int:
+    quote = source[start]
+    i = start + 1
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == quote or char == "\n":
+            return i + 1
+        i += 1
+    return i
+
+
+def _skip_template(source: str, start: int) -> int:
+    i = start + 1
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+        elif char == "`":
+            return i + 1
+        elif source.startswith("${", i):
+            i = _skip_expression(source, i + 2)
+        else:
+            i += 1
+    return i
+
+
+def _skip_expression(source: str, start: int) -> int:
+    # Выражение внутри ${...}: до парной закрывающей скобки
+    depth = 1
+    i = start
+    while i < len(source):
+        char = source[i]
+        if char in "'\"":
+            i = _skip_string(source, i)
+        elif char == "`":
+            i = _skip_template(source, i)
+        elif char == "{":
+            depth += 1
+            i += 1
+        elif char == "}":
+            depth -= 1
+            i += 1
+            if depth == 0:
+                return i
+        else:
+            i += 1
+    return i
+
+
+def _skip_regex(source: str, start: int) -> int | None:
+    i = start + 1
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == "\n":
+            return None
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            i += 1
+            while i < len(source) and source[i].isalpha():
+                i += 1
+            return i
+        i += 1
+    return None
+
+
+def _join_tokens(
+    tokens: list[str],
+    tight: frozenset,
+    operators: frozenset = frozenset(),
+    forbidden: frozenset = frozenset(),
+) -> str:
+    """
+    Склеивает токены, удаляя лишние пробелы и переносы строк.
+    Пробельные токены - пробел и перенос строки. Пробел удаляется рядом с символами
+    tight, а также между идентификатором и символом из operators,
+    если получившаяся пара не входит в forbidden.
+    """
+    result: list[str] = []
+    pending = ""
+    for token in tokens:
+        if token in (" ", "\n"):
+            if result and pending != "\n":
+                pending = token
+            continue
+        if pending:
+            prev, next_ = result[-1][-1], token[0]
+            if pending == "\n":
+                keep = not (prev in _JS_NEWLINE_AFTER or next_ in _JS_NEWLINE_BEFORE)
+            else:
+                keep = not (
+                    prev in tight
+                    or next_ in tight
+                    or (_is_identifier_char(prev) and next_ in operators)
+                    or (prev in operators and _is_identifier_char(next_))
+                )
+            if keep or prev + next_ in forbidden:
+                result.append(pending)
+            pending = ""
+        result.append(token)
+    return "".join(result)
+
+
+def minify_js(source: str) -> str:
+    """
+    Консервативно минифицирует JavaScript: удаляет комментарии и лишние
+    пробелы, не переименовывая идентификаторы. Строки, шаблонные строки
+    и регулярные выражения сохраняются как есть; переносы строк, значимые
+    для автоматической расстановки точек с запятой, не удаляются.
+    Args:
+        source (str): Исходный код.
+    Returns:
+        str: Минифицированный код.
+    """
+    tokens: list[str] = []
+    last = ""
+    i = 0
+    n = len(source)
+    while i < n:
+        char = source[i]
+        if char in "'\"":
+            end = _skip_string(source, i)
+            tokens.append(source[i:end])
+            last = '"'
+        elif char == "`":
+            end = _skip_template(source, i)
+            tokens.append(source[i:end])
+            last = "`"
+        elif source.startswith("//", i):
+            end = source.find("\n", i)
+            end = n if end == -1 else end
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            tokens.append("\n" if "\n" in source[i:end] else " ")
+        elif char == "/" and (
+            not last or last in _REGEX_PRECEDERS or last in _REGEX_KEYWORDS
+        ):
+            end = _skip_regex(source, i) or i + 1
+            tokens.append(source[i:end])
+            last = "/" if end > i + 1 else char
+        elif char.isspace():
+            end = i + 1
+            while end < n and source[end].isspace():
+                end += 1
+            tokens.append("\n" if "\n" in source[i:end] else " ")
+        elif _is_identifier_char(char):
+            end = i + 1
+            while end < n and _is_identifier_char(source[end]):
+                end += 1
+            last = source[i:end]
+            tokens.append(last)
+        else:
+            end = i + 1
+            tokens.append(char)
+            last = char
+        i = end
+    result = _join_tokens(tokens, _JS_TIGHT, _JS_OPERATORS, _JS_FORBIDDEN_PAIRS)
+    return result.strip() + "\n"
+
+
+def minify_css(source: str) -> str:
+    """
+    Консервативно минифицирует CSS: удаляет комментарии, лишние пробелы
+    и последнюю точку с запятой в блоке. Строки сохраняются как есть.
+    Args:
+        source (str): Исходный код.
+    Returns:
+        str: Минифицированный код.
+    """
+    tokens: list[str] = []
+    i = 0
+    n = len(source)
+    while i < n:
+        char = source[i]
+        if char in "'\"":
+            end = _skip_string(source, i)
+            tokens.append(source[i:end])
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            tokens.append(" ")
+        elif char.isspace():
+            end = i + 1
+            while end < n and source[end].isspace():
+                end += 1
+            tokens.append(" ")
+        else:
+            end = i + 1
+            tokens.append(char)
+        i = end
+    css = _join_tokens(tokens, _CSS_TIGHT)
+    return css.replace(";}", "}").strip() + "\n"
+
+
+MINIFIERS = {".js": minify_js, ".css": minify_css}
+
+
+def fingerprint(name: str, body: bytes) -> str:
+    """
+    Добавляет хеш содержимого к имени файла (app.js -> app.<hash>.js).
+    Args:
+        name (str): Имя файла.
+        body (bytes): Содержимое файла.
+    Returns:
+        str: Имя файла с хешем.
+    """
+    stem, suffix = os.path.splitext(name)
+    digest = hashlib.sha256(body).hexdigest()[:FINGERPRINT_LENGTH]
+    return f"{stem}.{digest}{suffix}"
+
+
+def _write_asset(dist: Path, name: str, body: bytes) -> str:
+    filename = fingerprint(name, body)
+    for encoding, variant in compress_variants(body).items():
+        suffix = {"identity": "", "gzip": ".gz", "br": ".br"}[encoding]
+        (dist / f"{filename}{suffix}").write_bytes(variant)
+    return f"{DIST_DIRECTORY}/{filename}"
+
+
+def build_assets(static_directory: str | Path, minify: bool = True) -> dict[str, str]:
+    """
+    Собирает статические файлы в директорию dist: минифицирует JS/CSS,
+    собирает бандлы, добавляет хеш содержимого к именам файлов и сохраняет
+    сжатые копии (.gz, .br). Результат описывается в dist/manifest.json.
+    Каждый JS/CSS-файл попадает в манифест и по отдельности.
+    Args:
+        static_directory (str | Path): Директория статических файлов.
+        minify (bool): Минифицировать ли файлы.
+    Returns:
+        dict[str, str]: Манифест: логическое имя -> путь внутри static_directory.
+    Raises:
+        FileNotFoundError: Если исходный файл бандла не найден.
+    """
+    static = Path(static_directory)
+    dist = static / DIST_DIRECTORY
+    shutil.rmtree(dist, ignore_errors=True)
+    dist.mkdir(parents=True)
+
+    sources: dict[str, str] = {}
+    for path in sorted(static.glob("*")):
+        if path.suffix in MINIFIERS and path.is_file():
+            text = path.read_text(encoding="utf-8")
+            sources[path.name] = MINIFIERS[path.suffix](text) if minify else text
+
+    manifest: dict[str, str] = {}
+    for name, text in sources.items():
+        manifest[name] = _write_asset(dist, name, text.encode("utf-8"))
+    for name, files in BUNDLES.items():
+        missing = [file for file in files if file not in sources]
+        if missing:
+            raise FileNotFoundError(f"Bundle {name}: {', '.join(missing)} not found")
+        # Точка с запятой защищает от склейки выражений соседних скриптов
+        separator = ";\n" if name.endswith(".js") else "\n"
+        body = separator.join(sources[file].rstrip() for file in files) + "\n"
+        manifest[name] = _write_asset(dist, name, body.encode("utf-8"))
+
+    (dist / MANIFEST_NAME).write_text(
+        json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8"
+    )
+    return manifest
+
+
+class AssetManifest:
+    """
+    Манифест собранных статических файлов.
+    Перечитывается при изменении файла. Если сборка не выполнялась,
+    возвращает исходные файлы (режим разработки).
+    Args:
+        static_directory (str | Path): Директория статических файлов.
+        url_prefix (str): Путь, по которому смонтированы статические файлы.
+    """
+
+    def __init__(self, static_directory: str | Path, url_prefix: str):
+        self.static_directory = Path(static_directory)
+        self.path = self.static_directory / DIST_DIRECTORY / MANIFEST_NAME
+        self.url_prefix = url_prefix.rstrip("/")
+        self._mtime: int | None = None
+        self._entries: dict[str, str] = {}
+
+    def entries(self) -> dict[str, str]:
+        """
+        Возвращает записи манифеста, перечитывая файл при изменении.
+        Returns:
+            dict[str, str]: Логическое имя -> путь внутри директории статики.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self._mtime, self._entries = None, {}
+            return self._entries
+        if mtime != self._mtime:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+            self._mtime = mtime
+        return self._entries
+
+    def urls(self, name: str) -> list[str]:
+        """
+        Возвращает адреса, по которым подключается ресурс.
+        Используется в шаблонах Jinja2 как asset_urls(name).
+        Args:
+            name (str): Имя бандла (app.js) или исходного файла (style.css).
+        Returns:
+            list[str]: Один адрес собранного файла или адреса исходных файлов.
+        Raises:
+            KeyError: Если ресурс неизвестен.
+        """
+        entries = self.entries()
+        if name in entries:
+            return [f"{self.url_prefix}/{entries[name]}"]
+        if name in BUNDLES:
+            return [f"{self.url_prefix}/{file}" for file in BUNDLES[name]]
+        if (self.static_directory / name).is_file():
+            return [f"{self.url_prefix}/{name}"]
+        raise KeyError(f"Unknown asset: {name}")
@@ -1,20 +1,127 @@
 import hashlib
 import hmac
 import json
+import re
 import time
 import urllib.parse
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
 import jwt
 
-from config.config import BotConfig
+from config.config import get_settings
+from core.utils import TTLCache
 
-bot_config = BotConfig()
+bot_config = get_settings().bot
+app_config = get_settings().app
 
+# Время действия initData в секундах (15 минут)
+INIT_DATA_LIFETIME = 900
+# Максимальное число запомненных результатов валидации initData
+INIT_DATA_CACHE_SIZE = 1024
 
-def validate_telegram_data(init_data: str) -> dict:
+# Проверенные JWT-токены запоминаются на это время (секунды)
+JWT_CLAIMS_CACHE_TTL = 300
+# Максимальное число запомненных JWT-токенов
+JWT_CLAIMS_CACHE_SIZE = 4096
+# Имя cookie с JWT-токеном
+JWT_COOKIE_NAME = "jwt"
+
+_HASH_RE = re.compile(r"(?:^|&)hash=([0-9a-fA-F]+)(?:&|$)")
+
+
+@dataclass
+class _ValidatedInitData:
     """
-    Валидирует данные, полученные от Telegram Mini App.
+    Результат успешной валидации initData.
+    """
+
+    init_data: str
+    result: dict
+    expires_at: float
+    replays: int = 0
+
+
+class InitDataCache:
+    """
+    Ограниченный LRU-кеш проверенных initData с временем жизни.
+    Ключ - значение параметра hash из initData. Запись живет не дольше
+    окна авторизации (auth_date + INIT_DATA_LIFETIME), поэтому повторные
+    запуски Mini App с теми же initData не повторяют разбор и HMAC.
+    Args:
+        maxsize (int): Максимальное число записей.
+    """
+
+    def __init__(self, maxsize: int = INIT_DATA_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, _ValidatedInitData] = OrderedDict()
+
+    def get(self, data_hash: str, init_data: str) -> dict | None:
+        """
+        Возвращает ранее проверенные данные и увеличивает счетчик повторов.
+        Args:
+            data_hash (str): Значение параметра hash.
+            init_data (str): Полная строка initData.
+        Returns:
+            dict | None: Данные или None, если записи нет.
+        Raises:
+            ValueError: Если срок действия данных истек.
+        """
+        entry = self._entries.get(data_hash)
+        if entry is None:
+            return None
+        # Сравниваем строку целиком: совпадение hash не гарантирует совпадение данных
+        if not hmac.compare_digest(entry.init_data.encode(), init_data.encode()):
+            return None
+        if time.time() > entry.expires_at:
+            del self._entries[data_hash]
+            raise ValueError("Auth date expired")
+        self._entries.move_to_end(data_hash)
+        entry.replays += 1
+        return entry.result
+
+    def put(self, data_hash: str, init_data: str, result: dict) -> None:
+        """
+        Запоминает результат успешной валидации.
+        Args:
+            data_hash (str): Значение параметра hash.
+            init_data (str): Полная строка initData.
+            result (dict): Результат валидации.
+        """
+        expires_at = int(result["auth_date"]) + INIT_DATA_LIFETIME
+        self._entries[data_hash] = _ValidatedInitData(init_data, result, expires_at)
+        self._entries.move_to_end(data_hash)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def replays(self, data_hash: str) -> int:
+        """
+        Возвращает число повторных предъявлений initData с данным hash.
+        Args:
+            data_hash (str): Значение параметра hash.
+        Returns:
+            int: Число повторов (0, если запись отсутствует).
+        """
+        entry = self._entries.get(data_hash)
+        return entry.replays if entry else 0
+
+    def clear(self) -> None:
+        """
+        Очищает кеш.
+        """
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+init_data_cache = InitDataCache()
+
+
+def _parse_and_verify(init_data: str) -> dict:
+    """
+    Разбирает initData и проверяет подпись и срок действия.
     Args:
         init_data (str): Строка initData из Telegram Mini App.
     Returns:
@@ -42,13 +149,14 @@ def validate_telegram_data(init_data: str) -> dict:
         bot_config.secret_key, data_check_string.encode(), hashlib.sha256
     ).hexdigest()
 
-    # Сравнение хешей
-    if calculated_hash != data["hash"]:
+    # Сравнение хешей за постоянное время
+    received_hash = data.get("hash", "").encode()
+    if not hmac.compare_digest(calculated_hash.encode(), received_hash):
         raise ValueError("Invalid hash")
 
     # Проверка auth_date
     auth_date = int(data["auth_date"])
-    if time.time() - auth_date > 900:  # 15 минут
+    if time.time() - auth_date > INIT_DATA_LIFETIME:
         raise ValueError("Auth date expired")
 
     # Возвращаем все данные, декодируя user
@@ -58,6 +166,50 @@ def validate_telegram_data(init_data: str) -> dict:
     return result
 
 
+def _copy_result(result: dict) -> dict:
+    """
+    Копирует результат валидации, чтобы вызывающий код не менял кеш.
+    """
+    result = result.copy()
+    if isinstance(result.get("user"), dict):
+        result["user"] = result["user"].copy()
+    return result
+
+
+def validate_telegram_data(init_data: str) -> dict:
+    """
+    Валидирует данные, полученные от Telegram Mini App.
+    Успешные результаты запоминаются в init_data_cache до окончания
+    окна авторизации, повторная проверка тех же данных берется из кеша.
+    Args:
+        init_data (str): Строка initData из Telegram Mini App.
+    Returns:
+        dict: Декодированные и валидированные данные, включая пользователя и другие параметры.
+    Raises:
+        ValueError: Если данные невалидны или срок действия истек.
+    """
+    match = _HASH_RE.search(init_data)
+    data_hash = match.group(1) if match else None
+    if data_hash:
+        cached = init_data_cache.get(data_hash, init_data)
+        if cached is not None:
+            return _copy_result(cached)
+
+    result = _parse_and_verify(init_data)
+    if data_hash:
+        init_data_cache.put(data_hash, init_data, result)
+    return _copy_result(result)
+
+
+def jwt_lifetime() -> timedelta:
+    """
+    Возвращает время жизни JWT-токена из конфигурации.
+    Returns:
+        timedelta: Время жизни токена.
+    """
+    return timedelta(days=app_config.jwt_lifetime_days)
+
+
 def create_jwt_token(user_id: int) -> str:
     """
     Создает JWT-токен для пользователя.
@@ -66,8 +218,75 @@ def create_jwt_token(user_id: int) -> str:
     Returns:
         str: JWT-токен.
     """
+    now = datetime.now(timezone.utc)
     payload = {
         "user_id": user_id,
-        "exp": datetime.now(timezone.utc) + timedelta(days=7),  # Токен действует 7 дней
+        "iat": now,
+        "exp": now + jwt_lifetime(),  # Время жизни задается в app_config.toml
     }
     return jwt.encode(payload, bot_config.secret_key, algorithm="HS256")
+
+
+jwt_claims_cache = TTLCache(maxsize=JWT_CLAIMS_CACHE_SIZE, ttl=JWT_CLAIMS_CACHE_TTL)
+
+
+def decode_jwt_token(token: str) -> dict:
+    """
+    Проверяет подпись и срок действия JWT-токена и возвращает его данные.
+    Уже проверенные токены берутся из jwt_claims_cache без повторной
+    проверки подписи, но не дольше срока действия самого токена.
+    Args:
+        token (str): JWT-токен.
+    Returns:
+        dict: Данные токена (user_id, iat, exp).
+    Raises:
+        ValueError: Если токен невалиден или срок его действия истек.
+    """
+    claims = jwt_claims_cache.get(token)
+    if claims is not None:
+        if claims["exp"] > time.time():
+            return claims
+        jwt_claims_cache.pop(token)
+        raise ValueError("Token expired")
+
+    try:
+        claims = jwt.decode(
+            token,
+            bot_config.secret_key,
+            algorithms=["HS256"],
+            options={"require": ["exp", "user_id"]},
+        )
+    except jwt.ExpiredSignatureError:
+        raise ValueError("Token expired")
+    except jwt.InvalidTokenError as e:
+        raise ValueError(f"Invalid token: {e}")
+
+    jwt_claims_cache.set(token, claims, ttl=claims["exp"] - time.time())
+    return claims
+
+
+def jwt_needs_refresh(claims: dict) -> bool:
+    """
+    Определяет, пора ли продлить токен (скользящее продление).
+    Токен продлевается, когда прошла половина его времени жизни.
+    Args:
+        claims (dict): Данные проверенного токена.
+    Returns:
+        bool: True, если нужно выдать новый токен.
+    """
+    return claims["exp"] - time.time() < jwt_lifetime().total_seconds() / 2
+
+
+def set_jwt_cookie(response, token: str) -> None:
+    """
+    Записывает JWT-токен в cookie ответа.
+    Args:
+        response (Response): Ответ FastAPI.
+        token (str): JWT-токен.
+    """
+    response.set_cookie(
+        key=JWT_COOKIE_NAME,
+        value=token,
+        max_age=int(jwt_lifetime().total_seconds()),
+        httponly=True,
+    )
@@ -0,0 +1,175 @@
+import hashlib
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+import jinja2
+from fastapi import Request, Response
+
+from config.config import get_settings
+from core.utils import FileWatcher, choose_encoding, compress_variants, etag_matches
+from services.web_app.assets import AssetManifest
+
+logger = logging.getLogger(__name__)
+
+app_config = get_settings().app
+
+# Страница ссылается на статические файлы, поэтому браузер перепроверяет ее по ETag
+INDEX_CACHE_CONTROL = "no-cache"
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    """
+    Отрендеренная страница, готовая к отдаче.
+    Args:
+        body (bytes): HTML в кодировке UTF-8.
+        hash (str): Хеш содержимого body.
+        variants (dict[str, bytes]): Тело в кодировках identity/gzip/br.
+    """
+
+    body: bytes
+    hash: str
+    variants: dict[str, bytes]
+
+    def etag_for(self, encoding: str) -> str:
+        """
+        Возвращает сильный ETag для представления в указанной кодировке.
+        Args:
+            encoding (str): Кодировка тела (identity, gzip, br).
+        Returns:
+            str: ETag.
+        """
+        if encoding == "identity":
+            return f'"{self.hash}"'
+        return f'"{self.hash}-{encoding}"'
+
+    @property
+    def etags(self) -> list[str]:
+        """
+        ETag'и всех представлений страницы.
+        """
+        return [self.etag_for(encoding) for encoding in self.variants]
+
+
+class IndexPage:
+    """
+    Главная страница Mini App, отрендеренная заранее.
+    Шаблон не зависит от запроса, поэтому он рендерится один раз при запуске
+    и повторно только при изменении файлов шаблонов. Обработчик запроса
+    лишь выбирает готовое (при необходимости сжатое) представление.
+    Args:
+        directory (str | Path): Директория с шаблонами Jinja2.
+        template_name (str): Имя шаблона страницы.
+        reload_interval (float): Период проверки изменений файлов (0 - не следить).
+        watch_paths (Iterable[Path]): Дополнительные файлы, при изменении которых
+            страница рендерится заново (например, манифест статики).
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        template_name: str,
+        reload_interval: float = 0,
+        watch_paths: Iterable[Path] = (),
+    ):
+        self.directory = Path(directory)
+        self.template_name = template_name
+        self.watch_paths = list(watch_paths)
+        self.environment = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(self.directory), autoescape=True
+        )
+        self._page: RenderedPage | None = None
+        self._watcher = FileWatcher(self._files, self.render, interval=reload_interval)
+
+    def _files(self) -> list[Path]:
+        files = [path for path in self.directory.rglob("*") if path.is_file()]
+        return sorted(files) + self.watch_paths
+
+    def render(self) -> None:
+        """
+        Рендерит страницу и готовит ее сжатые варианты.
+        При ошибке рендеринга сохраняется предыдущая версия страницы.
+        Raises:
+            Exception: Ошибка рендеринга, если страница еще ни разу не была
+                отрендерена.
+        """
+        try:
+            html = self.environment.get_template(self.template_name).render()
+        except Exception:
+            if self._page is None:
+                raise
+            logger.exception("Не удалось отрендерить %s", self.template_name)
+            return
+        body = html.encode("utf-8")
+        self._page = RenderedPage(
+            body=body,
+            hash=hashlib.sha256(body).hexdigest()[:32],
+            variants=compress_variants(body),
+        )
+        logger.info("Главная страница отрендерена: %s", self.template_name)
+
+    def get(self) -> RenderedPage:
+        """
+        Возвращает отрендеренную страницу.
+        Returns:
+            RenderedPage: Страница.
+        """
+        if self._page is None:
+            self.render()
+        return self._page
+
+    def response(self, request: Request) -> Response:
+        """
+        Формирует ответ с подходящим клиенту представлением страницы.
+        Если клиент передал актуальный ETag в If-None-Match, отвечает 304.
+        Args:
+            request (Request): Объект запроса FastAPI.
+        Returns:
+            Response: Страница или 304 Not Modified.
+        """
+        page = self.get()
+        encoding = choose_encoding(
+            request.headers.get("accept-encoding"), page.variants
+        )
+        headers = {
+            "ETag": page.etag_for(encoding),
+            "Cache-Control": INDEX_CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request.headers.get("if-none-match"), page.etags):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(
+            content=page.variants[encoding], media_type="text/html", headers=headers
+        )
+
+    async def start(self) -> None:
+        """
+        Рендерит страницу и запускает отслеживание изменений шаблонов.
+        """
+        self.render()
+        self._watcher.start()
+
+    async def stop(self) -> None:
+        """
+        Останавливает отслеживание изменений шаблонов.
+        """
+        await self._watcher.stop()
+
+
+asset_manifest = AssetManifest(
+    app_config.static_directory, app_config.static_mount_path
+)
+
+index_page = IndexPage(
+    app_config.templates_directory,
+    app_config.index_template,
+    reload_interval=app_config.templates_reload_interval,
+    watch_paths=[asset_manifest.path],
+)
+# Адреса статических файлов в шаблонах: {% for url in asset_urls("app.js") %}
+index_page.environment.globals["asset_urls"] = asset_manifest.urls
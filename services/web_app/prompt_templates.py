@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+from config.config import get_settings
+from core.prompt_codec import PromptCodec
+from core.utils import FileWatcher, compress_variants
+
+logger = logging.getLogger(__name__)
+
+app_config = get_settings().app
+
+# Ключ промпта с медиафайлами и допустимые типы файлов (см. docs/database.md).
+# Поля нет в шаблонах: его заполняет бот, проверяет services.api.validators,
+# отображает services.bot.render
+MEDIA_KEY = "multimedia"
+MEDIA_TYPES = frozenset({"photo", "video", "document", "audio"})
+
+
+@dataclass(frozen=True)
+class TemplateEntry:
+    """
+    Загруженный и предварительно сериализованный шаблон промпта.
+    Args:
+        version (str): Версия шаблона (значение version._default).
+        path (Path): Путь к файлу шаблона.
+        data (dict): Разобранный шаблон.
+        body (bytes): Шаблон, сериализованный в компактный JSON (UTF-8).
+        hash (str): Хеш содержимого body.
+        variants (dict[str, bytes]): Тело в кодировках identity/gzip/br.
+    """
+
+    version: str
+    path: Path
+    data: dict
+    body: bytes
+    hash: str
+    variants: dict[str, bytes]
+
+    @property
+    def etag(self) -> str:
+        """
+        Сильный ETag несжатого представления.
+        """
+        return f'"{self.hash}"'
+
+    def etag_for(self, encoding: str) -> str:
+        """
+        Возвращает сильный ETag для представления в указанной кодировке.
+        Args:
+            encoding (str): Кодировка тела (identity, gzip, br).
+        Returns:
+            str: ETag.
+        """
+        if encoding == "identity":
+            return self.etag
+        return f'"{self.hash}-{encoding}"'
+
+    @property
+    def etags(self) -> list[str]:
+        """
+        ETag'и всех представлений шаблона.
+        """
+        return [self.etag_for(encoding) for encoding in self.variants]
+
+
+def serialize_template(data: dict) -> bytes:
+    """
+    Сериализует шаблон в компактный JSON.
+    Args:
+        data (dict): Шаблон.
+    Returns:
+        bytes: JSON в кодировке UTF-8.
+    """
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def load_template_file(path: Path) -> TemplateEntry:
+    """
+    Читает файл шаблона и готовит его к отдаче клиентам.
+    Args:
+        path (Path): Путь к JSON-файлу шаблона.
+    Returns:
+        TemplateEntry: Подготовленный шаблон.
+    Raises:
+        ValueError: Если файл не является шаблоном (нет version._default).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    version = None
+    if isinstance(data, dict) and isinstance(data.get("version"), dict):
+        version = data["version"].get("_default")
+    if not version:
+        raise ValueError(f"{path} does not contain version._default")
+    body = serialize_template(data)
+    return TemplateEntry(
+        version=version,
+        path=path,
+        data=data,
+        body=body,
+        hash=hashlib.sha256(body).hexdigest()[:32],
+        variants=compress_variants(body),
+    )
+
+
+class TemplateRegistry:
+    """
+    Реестр шаблонов промптов, загруженных в память.
+    Шаблоны читаются с диска один раз при запуске и перечитываются
+    только при изменении файлов, поэтому обработчики запросов
+    не выполняют файловый ввод-вывод и повторную сериализацию JSON.
+    Args:
+        directory (str | Path): Директория с JSON-шаблонами.
+        default_version (str): Версия шаблона по умолчанию.
+        reload_interval (float): Период проверки изменений файлов (0 - не следить).
+    """
+
+    def __init__(
+        self, directory: str | Path, default_version: str, reload_interval: float = 0
+    ):
+        self.directory = Path(directory)
+        self.default_version = default_version
+        self._templates: dict[str, TemplateEntry] = {}
+        self._loaded = False
+        self._watcher = FileWatcher(self._files, self.load, interval=reload_interval)
+
+    def _files(self) -> list[Path]:
+        return sorted(self.directory.glob("*.json"))
+
+    def load(self) -> None:
+        """
+        Загружает все шаблоны из директории и атомарно заменяет текущий набор.
+        Файлы с ошибками пропускаются, при этом ранее загруженная версия
+        такого шаблона сохраняется.
+        """
+        templates = {}
+        for path in self._files():
+            try:
+                entry = load_template_file(path)
+            except (OSError, ValueError) as e:
+                logger.error("Не удалось загрузить шаблон %s: %s", path, e)
+                continue
+            if entry.version in templates:
+                logger.warning(
+                    "Шаблон версии %s из %s перекрывает %s",
+                    entry.version,
+                    path,
+                    templates[entry.version].path,
+                )
+            templates[entry.version] = entry
+
+        # Сохраняем последние корректные версии шаблонов, чьи файлы не прочитались
+        for version, entry in self._templates.items():
+            if version not in templates and entry.path.exists():
+                templates[version] = entry
+
+        self._templates = templates
+        self._loaded = True
+        logger.info("Загружены шаблоны: %s", ", ".join(sorted(templates)) or "нет")
+
+    def get(self, version: str | None = None) -> TemplateEntry:
+        """
+        Возвращает шаблон по версии.
+        Args:
+            version (str | None): Версия шаблона, по умолчанию - default_version.
+        Returns:
+            TemplateEntry: Подготовленный шаблон.
+        Raises:
+            KeyError: Если шаблон с такой версией не найден.
+        """
+        if not self._loaded:
+            self.load()
+        return self._templates[version or self.default_version]
+
+    def versions(self) -> list[str]:
+        """
+        Возвращает список версий загруженных шаблонов.
+        Returns:
+            list[str]: Версии шаблонов.
+        """
+        if not self._loaded:
+            self.load()
+        return sorted(self._templates)
+
+    async def start(self) -> None:
+        """
+        Загружает шаблоны и запускает отслеживание изменений файлов.
+        """
+        self.load()
+        self._watcher.start()
+
+    async def stop(self) -> None:
+        """
+        Останавливает отслеживание изменений файлов.
+        """
+        await self._watcher.stop()
+
+
+template_registry = TemplateRegistry(
+    app_config.prompt_templates_directory,
+    app_config.default_template_version,
+    reload_interval=app_config.templates_reload_interval,
+)
+
+# Сжатие промптов для хранения в БД по загруженным шаблонам
+prompt_codec = PromptCodec(lambda version: template_registry.get(version).data)
@@ -33,10 +33,17 @@ document.addEventListener('DOMContentLoaded', function() {
         .then(response => response.json())
         .then(data => {
             console.log('Ответ от сервера:', data);
-            // Добавляем шаблон и промпт в глобальное хранилище
-            window.appData.template = data.template;
+            // Добавляем промпт в глобальное хранилище
             window.appData.prompt = data.prompt;
             window.appData.prompt_type = data.prompt_type;
+            window.appData.template_version = data.template_version;
+
+            // Шаблон загружается отдельно: адрес содержит хеш,
+            // поэтому повторно он берется из кеша WebView
+            return fetch(data.template_url).then(response => response.json());
+        })
+        .then(template => {
+            window.appData.template = template;
 
             // После получения шаблона, строим форму
             if (window.appData.template) {
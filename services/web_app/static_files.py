@@ -0,0 +1,202 @@
+import hashlib
+import mimetypes
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import formatdate
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from core.utils import choose_encoding
+from services.web_app.assets import FINGERPRINT_LENGTH
+
+# Файлы с хешем содержимого в имени (app.<hash>.js) никогда не меняются
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Остальные файлы браузер перепроверяет по ETag
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+FINGERPRINT_RE = re.compile(rf"\.[0-9a-f]{{{FINGERPRINT_LENGTH}}}\.[^./]+$")
+
+# Суффиксы заранее сжатых копий файла
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def stat_headers(stat_result: os.stat_result) -> dict[str, str]:
+    """
+    Формирует заголовки Last-Modified и ETag так же, как FileResponse,
+    чтобы ETag не зависел от того, отдан файл из памяти или с диска.
+    Args:
+        stat_result (os.stat_result): Результат os.stat файла.
+    Returns:
+        dict[str, str]: Заголовки ответа.
+    """
+    etag_base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+    etag = hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()
+    return {
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "etag": f'"{etag}"',
+    }
+
+
+@dataclass
+class _CachedFile:
+    """
+    Сведения о файле: версия исходника, доступные представления
+    и (для небольших файлов) их содержимое.
+    """
+
+    stamp: tuple[int, int]
+    paths: dict[str, tuple[str, os.stat_result]]
+    bodies: dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return sum(len(body) for body in self.bodies.values())
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    Раздача статических файлов с учетом заранее сжатых копий и кешем в памяти.
+    - Если рядом с файлом лежат актуальные копии .br/.gz (см. build_assets)
+      и клиент их принимает, отдается сжатая копия.
+    - Небольшие файлы держатся в памяти (LRU с ограничением по объему),
+      большие отдаются через FileResponse с поддержкой Range и
+      http.response.pathsend (передача без копирования, если ее
+      поддерживает ASGI-сервер).
+    - Файлы с хешем содержимого в имени кешируются клиентом навсегда.
+    Args:
+        directory (str): Директория статических файлов.
+        max_cache_bytes (int): Максимальный объем кеша в памяти (байты).
+        max_file_size (int): Максимальный размер файла, хранимого в памяти.
+    """
+
+    def __init__(
+        self,
+        *,
+        directory: str,
+        max_cache_bytes: int = 8 * 1024 * 1024,
+        max_file_size: int = 256 * 1024,
+        **kwargs,
+    ):
+        super().__init__(directory=directory, **kwargs)
+        self.max_cache_bytes = max_cache_bytes
+        self.max_file_size = max_file_size
+        self._cache: OrderedDict[str, _CachedFile] = OrderedDict()
+        self._cache_bytes = 0
+        self.stats = {"memory_hits": 0, "memory_misses": 0, "disk": 0}
+
+    def _entry(self, full_path: str, stat_result: os.stat_result) -> _CachedFile:
+        stamp = (stat_result.st_mtime_ns, stat_result.st_size)
+        entry = self._cache.get(full_path)
+        if entry is not None and entry.stamp == stamp:
+            self._cache.move_to_end(full_path)
+            return entry
+        if entry is not None:
+            self._evict(full_path)
+
+        paths = {"identity": (full_path, stat_result)}
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+            try:
+                sibling = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            # Копия, сжатая до последнего изменения файла, устарела
+            if sibling.st_mtime_ns >= stat_result.st_mtime_ns:
+                paths[encoding] = (full_path + suffix, sibling)
+        entry = _CachedFile(stamp=stamp, paths=paths)
+        self._cache[full_path] = entry
+        return entry
+
+    def _evict(self, full_path: str) -> None:
+        entry = self._cache.pop(full_path)
+        self._cache_bytes -= entry.size
+
+    def _load_body(self, full_path: str, entry: _CachedFile, encoding: str) -> bytes:
+        body = entry.bodies.get(encoding)
+        if body is not None:
+            self.stats["memory_hits"] += 1
+            return body
+        self.stats["memory_misses"] += 1
+        # Небольшой файл читается один раз, дальше отдается из памяти
+        with open(entry.paths[encoding][0], "rb") as f:
+            body = f.read()
+        entry.bodies[encoding] = body
+        self._cache_bytes += len(body)
+        while self._cache_bytes > self.max_cache_bytes and len(self._cache) > 1:
+            oldest = next(iter(self._cache))
+            if oldest == full_path:
+                self._cache.move_to_end(full_path)
+                continue
+            self._evict(oldest)
+        return body
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        entry = self._entry(full_path, stat_result)
+
+        is_range = "range" in request_headers
+        # Диапазоны байтов отдаются только для несжатого представления
+        encoding = "identity"
+        if not is_range:
+            encoding = choose_encoding(
+                request_headers.get("accept-encoding"), entry.paths
+            )
+        path, variant_stat = entry.paths[encoding]
+
+        headers = {
+            "cache-control": (
+                IMMUTABLE_CACHE_CONTROL
+                if FINGERPRINT_RE.search(full_path)
+                else REVALIDATE_CACHE_CONTROL
+            )
+        }
+        if len(entry.paths) > 1:
+            headers["vary"] = "Accept-Encoding"
+        if encoding != "identity":
+            headers["content-encoding"] = encoding
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+
+        if is_range or variant_stat.st_size > self.max_file_size:
+            self.stats["disk"] += 1
+            response = FileResponse(
+                path,
+                status_code=status_code,
+                headers=headers,
+                media_type=media_type,
+                stat_result=variant_stat,
+            )
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+
+        headers.update(stat_headers(variant_stat))
+        response_headers = Headers(headers)
+        if self.is_not_modified(response_headers, request_headers):
+            return NotModifiedResponse(response_headers)
+        body = self._load_body(full_path, entry, encoding)
+        return Response(
+            body, status_code=status_code, headers=headers, media_type=media_type
+        )
+
+    def snapshot(self) -> dict:
+        """
+        Возвращает метрики кеша статических файлов.
+        Returns:
+            dict: Число файлов и объем кеша, счетчики попаданий.
+        """
+        return {
+            "files": len(self._cache),
+            "bytes": self._cache_bytes,
+            **self.stats,
+        }
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from services.web_app import assets
+from services.web_app.assets import AssetManifest, build_assets, minify_css, minify_js
+
+
+def test_minify_js_keeps_strings_regex_and_templates():
+    """Тест: строки, шаблонные строки и регулярные выражения не изменяются."""
+    source = (
+        "// комментарий\n"
+        "const url = 'http://example.com/*path*/';  /* блок */\n"
+        "const re = /\\/\\/ [a-z/]+/g;\n"
+        "const ratio = total / count / 2;\n"
+        "const text = `a  ${ { b: '}' }.b }  // c`;\n"
+    )
+    result = minify_js(source)
+    assert "комментарий" not in result and "блок" not in result
+    assert "'http://example.com/*path*/'" in result
+    assert "/\\/\\/ [a-z/]+/g" in result
+    assert "total/count/2" in result
+    assert "`a  ${ { b: '}' }.b }  // c`" in result
+
+
+def test_minify_js_preserves_significant_newlines_and_operators():
+    """Тест: переносы, важные для ASI, и пробелы между операторами сохраняются."""
+    result = minify_js("function f() {\n  return\n  x\n}\na = b - -c\ni++\n++j\n")
+    assert "return\nx" in result
+    assert "b- -c" in result
+    assert "i++\n++j" in result
+
+
+def test_minify_css():
+    """Тест минификации CSS."""
+    source = "/* тема */\n.a  > .b ,\n.c {\n  color: red;\n  content: '; }';\n}\n"
+    assert minify_css(source) == ".a>.b,.c{color: red;content: '; }'}\n"
+
+
+def test_build_assets_and_manifest(tmp_path, monkeypatch):
+    """Тест сборки бандлов с хешами в именах и разрешения адресов по манифесту."""
+    (tmp_path / "one.js").write_text("var a = 1 // one\n", encoding="utf-8")
+    (tmp_path / "two.js").write_text("var b = a + 1\n", encoding="utf-8")
+    (tmp_path / "style.css").write_text("body { margin: 0; }\n", encoding="utf-8")
+    monkeypatch.setattr(assets, "BUNDLES", {"app.js": ["one.js", "two.js"]})
+
+    manifest_obj = AssetManifest(tmp_path, "/static/")
+    # До сборки используются исходные файлы
+    assert manifest_obj.urls("app.js") == ["/static/one.js", "/static/two.js"]
+
+    manifest = build_assets(tmp_path)
+    bundle = (tmp_path / manifest["app.js"]).read_text(encoding="utf-8")
+    assert bundle == "var a=1;\nvar b=a+1\n"
+    assert manifest["app.js"] == "dist/" + assets.fingerprint("app.js", bundle.encode())
+    assert json.loads((tmp_path / "dist" / "manifest.json").read_text()) == manifest
+
+    assert manifest_obj.urls("app.js") == [f"/static/{manifest['app.js']}"]
+    assert manifest_obj.urls("style.css") == [f"/static/{manifest['style.css']}"]
+    with pytest.raises(KeyError):
+        manifest_obj.urls("missing.js")
+
+
+def test_build_assets_missing_bundle_source(tmp_path, monkeypatch):
+    """Тест ошибки сборки при отсутствии исходного файла бандла."""
+    monkeypatch.setattr(assets, "BUNDLES", {"app.js": ["absent.js"]})
+    with pytest.raises(FileNotFoundError):
+        build_assets(tmp_path)
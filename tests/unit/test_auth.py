@@ -7,6 +7,31 @@ import pytest
 from services.web_app.auth import auth_handler
 
 
+@pytest.fixture(autouse=True)
+def clear_init_data_cache():
+    """Фикстура для очистки кеша валидации initData между тестами."""
+    auth_handler.init_data_cache.clear()
+    yield
+    auth_handler.init_data_cache.clear()
+
+
+def make_init_data(secret_key, auth_date=None, user_id=12345):
+    """Формирует подписанную строку initData."""
+    auth_date = int(time.time()) if auth_date is None else auth_date
+    fields = {
+        "auth_date": str(auth_date),
+        "user": f'{{"id":{user_id},"first_name":"Test"}}',
+    }
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    data_hash = auth_handler.hmac.new(
+        secret_key, data_check_string.encode(), auth_handler.hashlib.sha256
+    ).hexdigest()
+    init_data = "&".join(
+        f"{k}={auth_handler.urllib.parse.quote(v)}" for k, v in fields.items()
+    )
+    return f"{init_data}&hash={data_hash}", data_hash
+
+
 @pytest.fixture
 def mock_bot_config():
     """Фикстура для мока BotConfig."""
@@ -85,3 +110,89 @@ def test_validate_telegram_data_expired(mock_bot_config):
 
     with pytest.raises(ValueError, match="Auth date expired"):
         auth_handler.validate_telegram_data(init_data)
+
+
+def test_validate_telegram_data_cached_replay(mock_bot_config):
+    """Тест повторной валидации тех же initData из кеша."""
+    init_data, data_hash = make_init_data(mock_bot_config.secret_key)
+
+    first = auth_handler.validate_telegram_data(init_data)
+    first["user"]["id"] = 0  # Изменение результата не должно влиять на кеш
+    with patch.object(auth_handler, "_parse_and_verify") as parse:
+        second = auth_handler.validate_telegram_data(init_data)
+    parse.assert_not_called()
+
+    assert second["user"]["id"] == 12345
+    assert auth_handler.init_data_cache.replays(data_hash) == 1
+
+
+def test_validate_telegram_data_cache_rejects_tampered(mock_bot_config):
+    """Тест: совпадение hash в кеше не принимает измененные данные."""
+    init_data, _ = make_init_data(mock_bot_config.secret_key)
+    auth_handler.validate_telegram_data(init_data)
+
+    tampered = init_data.replace("12345", "99999")
+    with pytest.raises(ValueError, match="Invalid hash"):
+        auth_handler.validate_telegram_data(tampered)
+
+
+def test_validate_telegram_data_cache_expires(mock_bot_config):
+    """Тест истечения срока действия initData, находящихся в кеше."""
+    auth_date = int(time.time())
+    init_data, _ = make_init_data(mock_bot_config.secret_key, auth_date=auth_date)
+    auth_handler.validate_telegram_data(init_data)
+
+    with patch.object(auth_handler.time, "time", return_value=auth_date + 901):
+        with pytest.raises(ValueError, match="Auth date expired"):
+            auth_handler.validate_telegram_data(init_data)
+    assert len(auth_handler.init_data_cache) == 0
+
+
+def test_init_data_cache_is_bounded():
+    """Тест ограничения размера кеша initData (вытеснение LRU)."""
+    cache = auth_handler.InitDataCache(maxsize=2)
+    result = {"auth_date": str(int(time.time()))}
+    for data_hash in ("a", "b"):
+        cache.put(data_hash, data_hash, result)
+    cache.get("a", "a")
+    cache.put("c", "c", result)
+
+    assert cache.get("b", "b") is None
+    assert cache.get("a", "a") is not None
+    assert len(cache) == 2
+
+
+def test_create_jwt_token_uses_configured_lifetime(mock_bot_config):
+    """Тест: время жизни JWT-токена берется из AppConfig.jwt_lifetime_days."""
+    with patch.object(auth_handler, "app_config") as mock_app_config:
+        mock_app_config.jwt_lifetime_days = 1
+        token = auth_handler.create_jwt_token(1)
+    claims = jwt.decode(token, mock_bot_config.secret_key, algorithms=["HS256"])
+    assert claims["exp"] - claims["iat"] == 24 * 60 * 60
+
+
+def test_decode_jwt_token_cached(mock_bot_config):
+    """Тест кеширования данных проверенного JWT-токена."""
+    auth_handler.jwt_claims_cache.clear()
+    token = auth_handler.create_jwt_token(42)
+
+    assert auth_handler.decode_jwt_token(token)["user_id"] == 42
+    with patch.object(auth_handler.jwt, "decode") as decode:
+        assert auth_handler.decode_jwt_token(token)["user_id"] == 42
+    decode.assert_not_called()
+
+
+def test_decode_jwt_token_invalid(mock_bot_config):
+    """Тест отклонения поддельного и просроченного JWT-токена."""
+    auth_handler.jwt_claims_cache.clear()
+    forged = jwt.encode({"user_id": 1, "exp": time.time() + 60}, "x" * 32)
+    with pytest.raises(ValueError, match="Invalid token"):
+        auth_handler.decode_jwt_token(forged)
+
+    expired = jwt.encode(
+        {"user_id": 1, "exp": time.time() - 60},
+        mock_bot_config.secret_key,
+        algorithm="HS256",
+    )
+    with pytest.raises(ValueError, match="Token expired"):
+        auth_handler.decode_jwt_token(expired)
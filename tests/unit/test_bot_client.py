@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from scripts.benchmarks.fake_bot_api import FakeBotAPIServer
+from services.bot.client import create_bot
+
+
+def make_config(bot_api_server=None, **kwargs):
+    """Конфигурация клиента бота с параметрами пула соединений."""
+    options = dict(
+        bot_token="123456:test-token",
+        bot_api_server=bot_api_server,
+        api_connections_limit=100,
+        api_connections_per_host=4,
+        api_keepalive_timeout=60,
+        api_dns_cache_ttl=300,
+        api_request_timeout=10,
+    )
+    options.update(kwargs)
+    return SimpleNamespace(**options)
+
+
+@pytest.mark.asyncio
+async def test_create_bot_uses_local_api_server():
+    """Тест: при заданном BOT_API_SERVER запросы уходят на локальный сервер."""
+    server = FakeBotAPIServer()
+    await server.start()
+    bot = create_bot(make_config(server.base_url))
+    try:
+        me = await bot.get_me()
+        assert await bot.set_webhook("https://example.com/tbot")
+    finally:
+        await bot.session.close()
+        await server.stop()
+    assert me.username == "fake_bot"
+    assert server.methods() == ["getMe", "setWebhook"]
+
+
+def test_create_bot_default_server():
+    """Тест: без BOT_API_SERVER используется api.telegram.org."""
+    bot = create_bot(make_config())
+    assert bot.session.api.base.startswith("https://api.telegram.org")
+    assert bot.session.timeout == 10
+
+
+@pytest.mark.asyncio
+async def test_session_reuses_connections():
+    """Тест пула: соединений не больше limit_per_host, они переиспользуются."""
+    server = FakeBotAPIServer(delay=0.005)
+    await server.start()
+    bot = create_bot(make_config(server.base_url))
+    try:
+        for _ in range(3):
+            await asyncio.gather(
+                *(bot.send_message(chat_id=1, text="hi") for _ in range(20))
+            )
+        snapshot = bot.session.snapshot()
+    finally:
+        await bot.session.close()
+        await server.stop()
+    assert len(server.calls) == 60
+    assert len(server.peers) <= 4
+    assert snapshot["pool"]["limit_per_host"] == 4
+    assert snapshot["pool"]["idle"] == len(server.peers)
+    assert snapshot["latency"]["sendMessage"]["count"] == 60
+    assert bot.session.snapshot()["pool"] == {"open": False}
@@ -0,0 +1,72 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.api.endpoints import bot as bot_endpoint
+
+UPDATE = {
+    "update_id": 777001,
+    "message": {
+        "message_id": 1,
+        "date": 0,
+        "chat": {"id": 1, "type": "private"},
+        "from": {"id": 1, "is_bot": False, "first_name": "T"},
+        "text": "hi",
+    },
+}
+
+
+@pytest.fixture
+def client():
+    """Фикстура с приложением, принимающим вебхук бота."""
+    app = FastAPI()
+    app.add_api_route("/tbot", bot_endpoint.bot_webhook_endpoint, methods=["POST"])
+    bot_endpoint.update_dedup.discard(UPDATE["update_id"])
+    with patch.object(bot_endpoint.update_queue, "enqueue", AsyncMock()) as enqueue:
+        client = TestClient(app)
+        client.enqueue = enqueue
+        yield client
+
+
+def test_webhook_rejects_wrong_secret(client):
+    """Тест отказа в приеме обновления без верного секрета."""
+    response = client.post(
+        "/tbot", json=UPDATE, headers={bot_endpoint.SECRET_TOKEN_HEADER: "wrong"}
+    )
+    assert response.status_code == 403
+    client.enqueue.assert_not_called()
+
+
+def test_webhook_suppresses_duplicates(client):
+    """Тест: повторная доставка обновления не передается в обработку."""
+    headers = {
+        bot_endpoint.SECRET_TOKEN_HEADER: bot_endpoint.bot_config.webhook_secret
+    }
+    assert client.post("/tbot", json=UPDATE, headers=headers).status_code == 200
+    assert client.post("/tbot", json=UPDATE, headers=headers).status_code == 200
+    assert client.enqueue.await_count == 1
+
+
+def test_webhook_rejects_malformed_body(client):
+    """Тест: тело, не являющееся JSON-объектом, отклоняется с кодом 400."""
+    headers = {
+        bot_endpoint.SECRET_TOKEN_HEADER: bot_endpoint.bot_config.webhook_secret
+    }
+    for body in (b"not json", b"[1, 2]"):
+        response = client.post("/tbot", content=body, headers=headers)
+        assert response.status_code == 400
+    client.enqueue.assert_not_called()
+
+
+def test_webhook_invalid_update_is_not_remembered(client):
+    """Тест: неверное обновление не мешает принять повторную доставку."""
+    headers = {
+        bot_endpoint.SECRET_TOKEN_HEADER: bot_endpoint.bot_config.webhook_secret
+    }
+    invalid = {"update_id": UPDATE["update_id"], "message": {"text": "hi"}}
+    assert client.post("/tbot", json=invalid, headers=headers).status_code == 200
+    client.enqueue.assert_not_called()
+    assert client.post("/tbot", json=UPDATE, headers=headers).status_code == 200
+    assert client.enqueue.await_count == 1
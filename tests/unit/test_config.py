@@ -0,0 +1,31 @@
+from unittest.mock import patch
+
+import pytest
+
+from config import config
+
+
+def test_settings_singleton():
+    """Тест: разделы настроек создаются один раз и общие для процесса."""
+    settings = config.get_settings()
+    assert config.get_settings() is settings
+    assert settings.app is settings.app
+    assert settings.db is settings.db
+
+
+def test_toml_parsed_once():
+    """Тест: файл конфигурации разбирается один раз для всех разделов."""
+    config._read_toml.cache_clear()
+    with patch.object(config.tomllib, "load", wraps=config.tomllib.load) as load:
+        config.AppConfig()
+        config.AppConfig()
+    assert load.call_count == 1
+
+
+def test_config_is_immutable():
+    """Тест: изменение загруженной конфигурации запрещено."""
+    settings = config.get_settings()
+    with pytest.raises(AttributeError):
+        settings.app.jwt_lifetime_days = 1
+    with pytest.raises(AttributeError):
+        settings.app = None
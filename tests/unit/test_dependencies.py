@@ -0,0 +1,75 @@
+import time
+from unittest.mock import patch
+
+import jwt
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.api import dependencies
+from services.api.dependencies import AdminUserId, CurrentUserId
+from services.web_app.auth import auth_handler
+
+
+@pytest.fixture
+def client():
+    """Фикстура с приложением, эндпоинт которого требует авторизации."""
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(user_id: CurrentUserId):
+        return {"user_id": user_id}
+
+    auth_handler.jwt_claims_cache.clear()
+    with patch.object(auth_handler, "bot_config") as mock_bot_config:
+        mock_bot_config.secret_key = b"s" * 32
+        yield TestClient(app)
+    auth_handler.jwt_claims_cache.clear()
+
+
+def test_current_user_id_from_cookie(client):
+    """Тест получения ID пользователя из cookie с JWT-токеном."""
+    client.cookies.set("jwt", auth_handler.create_jwt_token(7))
+    response = client.get("/me")
+    assert response.status_code == 200
+    assert response.json() == {"user_id": 7}
+    assert "set-cookie" not in response.headers
+
+
+def test_current_user_id_requires_token(client):
+    """Тест ответа 401 без токена и с невалидным токеном."""
+    assert client.get("/me").status_code == 401
+    client.cookies.set("jwt", "garbage")
+    assert client.get("/me").status_code == 401
+
+
+def test_current_user_id_sliding_refresh(client):
+    """Тест продления токена, у которого прошла половина времени жизни."""
+    lifetime = auth_handler.jwt_lifetime().total_seconds()
+    old_token = jwt.encode(
+        {"user_id": 7, "exp": time.time() + lifetime / 4},
+        b"s" * 32,
+        algorithm="HS256",
+    )
+    client.cookies.set("jwt", old_token)
+    response = client.get("/me")
+    assert response.status_code == 200
+    new_token = response.cookies.get("jwt")
+    assert new_token and new_token != old_token
+    assert auth_handler.decode_jwt_token(new_token)["user_id"] == 7
+
+
+def test_admin_user_id(client):
+    """Тест доступа к служебным эндпоинтам только для администраторов."""
+    app = client.app
+
+    @app.get("/admin")
+    async def admin(user_id: AdminUserId):
+        return {"user_id": user_id}
+
+    client.cookies.set("jwt", auth_handler.create_jwt_token(7))
+    with patch.object(dependencies, "get_settings") as mock_settings:
+        mock_settings.return_value.bot.admin_ids = frozenset({1})
+        assert client.get("/admin").status_code == 403
+        mock_settings.return_value.bot.admin_ids = frozenset({1, 7})
+        assert client.get("/admin").json() == {"user_id": 7}
@@ -0,0 +1,189 @@
+import copy
+from types import SimpleNamespace
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy.dialects import postgresql
+
+from services.bot.storage import UserFSMStorage
+
+
+class FakeDB:
+    """Хранилище строк users, подменяющее БД."""
+
+    def __init__(self, users=(10,)):
+        # Строки users: ID пользователя -> fsm_data
+        self.fsm_data = {user_id: None for user_id in users}
+        self.writes = 0
+        self.reads = 0
+        self.fail = False
+
+    def session(self):
+        return FakeSession(self)
+
+
+class FakeSession:
+    """Сессия, читающая и записывающая users.fsm_data в FakeDB."""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def scalar(self, stmt):
+        self.db.reads += 1
+        user_id = stmt.compile().params["user_id_1"]
+        # Как и БД, каждый запрос возвращает новый объект
+        return copy.deepcopy(self.db.fsm_data.get(user_id))
+
+    async def execute(self, stmt):
+        # Запись одной записи состояния: fsm_data || {record_id: record}
+        # или fsm_data - record_id
+        if self.db.fail:
+            raise ConnectionError("database is unavailable")
+        params = stmt.compile(dialect=postgresql.dialect()).params
+        user_id = params["user_id_1"]
+        if user_id not in self.db.fsm_data:
+            return SimpleNamespace(rowcount=0)
+        document = dict(self.db.fsm_data[user_id] or {})
+        if params.get("record"):
+            document[params["record_id"]] = params["record"]
+        else:
+            document.pop(params["record_id"], None)
+        self.db.fsm_data[user_id] = document
+        self.db.writes += 1
+        return SimpleNamespace(rowcount=1)
+
+    async def commit(self):
+        pass
+
+
+KEY = StorageKey(bot_id=1, chat_id=10, user_id=10)
+
+
+@pytest.mark.asyncio
+async def test_state_and_data_roundtrip_through_db():
+    """Тест сохранения состояния и данных в users.fsm_data."""
+    db = FakeDB()
+    storage = UserFSMStorage(db.session)
+
+    await storage.set_state(KEY, "Form:title")
+    await storage.update_data(KEY, {"title": "Горы"})
+    assert db.writes == 2
+
+    # Другой процесс читает состояние из БД
+    other = UserFSMStorage(db.session)
+    assert await other.get_state(KEY) == "Form:title"
+    assert await other.get_data(KEY) == {"title": "Горы"}
+
+
+@pytest.mark.asyncio
+async def test_update_reads_document_once():
+    """Тест: внутри coalesce() документ читается из БД один раз."""
+    db = FakeDB()
+    storage = UserFSMStorage(db.session)
+
+    async with storage.coalesce():
+        assert await storage.get_state(KEY) is None
+        await storage.set_state(KEY, "Form:title")
+        await storage.update_data(KEY, {"title": "Горы"})
+        assert await storage.get_state(KEY) == "Form:title"
+    assert db.reads == 1
+    assert db.writes == 1
+
+
+@pytest.mark.asyncio
+async def test_coalesce_writes_once_per_step():
+    """Тест: шаг формы внутри coalesce() стоит одну запись в БД."""
+    db = FakeDB()
+    storage = UserFSMStorage(db.session)
+
+    async with storage.coalesce():
+        await storage.set_state(KEY, "Form:scene")
+        await storage.update_data(KEY, {"scene": 1})
+        await storage.update_data(KEY, {"duration": 5})
+        assert db.writes == 0
+    assert db.writes == 1
+
+    stored = next(iter(db.fsm_data[10].values()))
+    assert stored == {"state": "Form:scene", "data": {"scene": 1, "duration": 5}}
+
+
+@pytest.mark.asyncio
+async def test_clearing_state_removes_record():
+    """Тест удаления записи при сбросе состояния и данных."""
+    db = FakeDB()
+    storage = UserFSMStorage(db.session)
+
+    await storage.set_state(KEY, "Form:title")
+    await storage.set_state(KEY, None)
+    assert db.fsm_data[10] == {}
+    assert await storage.get_data(KEY) == {}
+
+
+@pytest.mark.asyncio
+async def test_processes_see_each_other_changes():
+    """Тест: процессы видят и не затирают изменения друг друга."""
+    db = FakeDB()
+    first, second = UserFSMStorage(db.session), UserFSMStorage(db.session)
+    other_chat = StorageKey(bot_id=1, chat_id=20, user_id=10)
+
+    await first.set_state(KEY, "Form:title")
+    assert await second.get_state(KEY) == "Form:title"
+    await first.set_state(KEY, "Form:scene")
+    assert await second.get_state(KEY) == "Form:scene"
+
+    await first.update_data(KEY, {"title": "Горы"})
+    await second.set_state(other_chat, "Form:scene")
+    async with second.coalesce():
+        await second.update_data(KEY, {"scene": 1})
+
+    assert await first.get_data(KEY) == {"title": "Горы", "scene": 1}
+    assert await first.get_state(other_chat) == "Form:scene"
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_not_visible():
+    """Тест: неудачная запись не меняет прочитанное состояние."""
+    db = FakeDB()
+    storage = UserFSMStorage(db.session)
+    await storage.set_state(KEY, "Form:title")
+
+    db.fail = True
+    with pytest.raises(ConnectionError):
+        await storage.set_state(KEY, "Form:scene")
+    db.fail = False
+    assert await storage.get_state(KEY) == "Form:title"
+
+
+@pytest.mark.asyncio
+async def test_missing_user_is_not_created():
+    """Тест: строка пользователя не создается, состояние без нее не пишется."""
+    db = FakeDB(users=())
+    storage = UserFSMStorage(db.session)
+
+    await storage.set_state(KEY, "Form:title")
+    assert db.fsm_data == {}
+    assert storage.stats["skipped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pending_profile_is_written_first():
+    """Тест: профиль нового пользователя записывается до его состояния."""
+    db = FakeDB(users=())
+    ensured = []
+
+    async def ensure_user(user_id):
+        ensured.append(user_id)
+        db.fsm_data[user_id] = None
+
+    storage = UserFSMStorage(db.session, ensure_user)
+    async with storage.coalesce():
+        await storage.set_state(KEY, "Form:title")
+    assert ensured == [10]
+    assert await storage.get_state(KEY) == "Form:title"
+    assert storage.stats["writes"] == 1
@@ -0,0 +1,77 @@
+import gzip
+import os
+
+import jinja2
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from services.web_app.index_page import IndexPage
+
+PAGE = "<html><body>{{ 'Mini App' }}" + "<p>текст</p>" * 100 + "</body></html>"
+
+
+@pytest.fixture
+def page(tmp_path):
+    """Фикстура с заранее отрендеренной страницей из временной директории."""
+    (tmp_path / "index.html").write_text(PAGE, encoding="utf-8")
+    return IndexPage(tmp_path, "index.html")
+
+
+@pytest.fixture
+def client(page):
+    """Фикстура с приложением, отдающим страницу."""
+    app = FastAPI()
+
+    @app.get("/")
+    async def root(request: Request):
+        return page.response(request)
+
+    return TestClient(app)
+
+
+def test_page_rendered_once(page):
+    """Тест: страница рендерится один раз и переиспользуется."""
+    first = page.get()
+    assert b"Mini App" in first.body
+    assert page.get() is first
+    assert set(first.variants) >= {"identity", "gzip"}
+    assert gzip.decompress(first.variants["gzip"]) == first.body
+
+
+def test_page_response_etag_and_304(client):
+    """Тест отдачи сжатой страницы с ETag и ответа 304."""
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.headers["content-type"].startswith("text/html")
+    assert "Mini App" in response.text
+
+    etag = response.headers["etag"]
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_page_rerender_keeps_last_good_version(page, tmp_path):
+    """Тест: ошибка в шаблоне не заменяет последнюю корректную версию."""
+    first = page.get()
+    path = tmp_path / "index.html"
+    path.write_text("<html>{% if %}</html>", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    page.render()
+    assert page.get() is first
+
+    path.write_text("<html>new</html>", encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    page.render()
+    assert page.get().body == b"<html>new</html>"
+
+
+def test_page_render_error_without_previous_version(tmp_path):
+    """Тест: ошибка первого рендеринга не скрывается."""
+    (tmp_path / "index.html").write_text("{% if %}", encoding="utf-8")
+    with pytest.raises(jinja2.TemplateError):
+        IndexPage(tmp_path, "index.html").get()
@@ -0,0 +1,114 @@
+import pytest
+
+from core.leader import LeaderElection, advisory_key
+
+
+class FakeLocks:
+    """Advisory-блокировки PostgreSQL в памяти (без ожидания)."""
+
+    def __init__(self):
+        self.shared: dict[int, set] = {}
+        self.exclusive: dict[int, object] = {}
+
+    def conflicts(self, key, connection, exclusive):
+        owner = self.exclusive.get(key)
+        if owner is not None and owner is not connection:
+            return True
+        others = self.shared.get(key, set()) - {connection}
+        return exclusive and bool(others)
+
+
+class FakeConnection:
+    """Соединение, выполняющее функции advisory-блокировок."""
+
+    def __init__(self, locks: FakeLocks, fail: bool = False):
+        self.locks = locks
+        self.fail = fail
+        self.closed = False
+
+    async def scalar(self, statement, params):
+        if self.fail:
+            raise OSError("connection refused")
+        sql, key, locks = str(statement), params["key"], self.locks
+        if "pg_advisory_lock_shared" in sql:
+            assert not locks.conflicts(key, self, exclusive=False)
+            locks.shared.setdefault(key, set()).add(self)
+        elif "pg_advisory_unlock_shared" in sql:
+            locks.shared[key].discard(self)
+        elif "pg_try_advisory_lock" in sql:
+            if locks.conflicts(key, self, exclusive=True):
+                return False
+            locks.exclusive[key] = self
+            return True
+        return None
+
+    async def execute(self, statement):
+        assert "pg_advisory_unlock_all" in str(statement)
+        for holders in self.locks.shared.values():
+            holders.discard(self)
+        for key, owner in list(self.locks.exclusive.items()):
+            if owner is self:
+                del self.locks.exclusive[key]
+
+    async def commit(self):
+        pass
+
+    async def invalidate(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+def make_election(locks, fail=False):
+    async def connect():
+        return FakeConnection(locks, fail)
+
+    return LeaderElection("webhook", connect=connect)
+
+
+def test_advisory_key_is_stable():
+    """Тест: ключ блокировки постоянен и помещается в bigint."""
+    assert advisory_key("webhook:leader") == advisory_key("webhook:leader")
+    assert advisory_key("webhook:leader") != advisory_key("webhook:members")
+    assert -(2**63) <= advisory_key("webhook:leader") < 2**63
+
+
+@pytest.mark.asyncio
+async def test_single_leader_and_last_member():
+    """Тест: ведущий один, удаляет вебхук только последний процесс."""
+    locks = FakeLocks()
+    workers = [make_election(locks) for _ in range(3)]
+    leaders = [await worker.join() for worker in workers]
+    assert leaders == [True, False, False]
+
+    results = []
+    for worker in workers:
+        async with worker.leave() as last:
+            results.append(last)
+    assert results == [False, False, True]
+    assert not any(locks.shared.values()) and not locks.exclusive
+
+    # После остановки всех процессов ведущим становится новый процесс
+    assert await make_election(locks).join()
+
+
+@pytest.mark.asyncio
+async def test_leader_restart_keeps_group():
+    """Тест: перезапуск ведущего не считается остановкой группы."""
+    locks = FakeLocks()
+    leader, follower = make_election(locks), make_election(locks)
+    await leader.join()
+    await follower.join()
+    async with leader.leave() as last:
+        assert not last
+    assert await make_election(locks).join()
+
+
+@pytest.mark.asyncio
+async def test_without_database_leads_but_is_not_last():
+    """Тест: без БД процесс ведущий, но при выходе не считается последним."""
+    election = make_election(FakeLocks(), fail=True)
+    assert await election.join()
+    async with election.leave() as last:
+        assert not last
@@ -0,0 +1,89 @@
+import sqlite3
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from config.config import DBConfig
+from core import metrics
+from core.database import InstrumentedQueuePool, pool_metrics
+from services.api.endpoints.metrics import router
+
+
+def test_latency_histogram_snapshot():
+    """Тест накопления измерений в гистограмме задержек."""
+    histogram = metrics.LatencyHistogram(buckets_ms=(1, 10))
+    for seconds in (0.0005, 0.005, 0.5):
+        histogram.observe(seconds)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 3
+    assert snapshot["max_ms"] == 500.0
+    assert snapshot["buckets"] == {"le_1ms": 1, "le_10ms": 2, "le_inf": 3}
+
+
+def test_collect_registered_providers():
+    """Тест сбора метрик из зарегистрированных источников."""
+    metrics.register("test_source", lambda: {"value": 1})
+    assert metrics.collect()["test_source"] == {"value": 1}
+
+
+def test_metrics_endpoint_requires_auth():
+    """Тест: метрики не отдаются без авторизации."""
+    app = FastAPI()
+    app.include_router(router)
+    assert TestClient(app).get("/metrics").status_code == 401
+
+
+def test_instrumented_pool_measures_checkout():
+    """Тест измерения задержки получения соединения из пула."""
+    pool = InstrumentedQueuePool(
+        lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0
+    )
+    before = pool_metrics.checkout_latency.count
+
+    connection = pool.connect()
+    assert pool.checkedout() == 1
+    connection.close()
+
+    assert pool_metrics.checkout_latency.count == before + 1
+
+
+@pytest.mark.asyncio
+async def test_instrumented_pool_counts_timeouts_and_errors():
+    """Тест: превышение ожидания и ошибки подключения считаются раздельно."""
+    pool = InstrumentedQueuePool(
+        lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.01
+    )
+    timeouts, errors = pool_metrics.timeouts, pool_metrics.errors
+    connection = pool.connect()
+    with pytest.raises(exc.TimeoutError):
+        # Асинхронный пул ждет соединение только внутри greenlet
+        await greenlet_spawn(pool.connect)
+    connection.close()
+    assert (pool_metrics.timeouts, pool_metrics.errors) == (timeouts + 1, errors)
+
+    def refuse():
+        raise OSError("connection refused")
+
+    failing = InstrumentedQueuePool(refuse, pool_size=1, max_overflow=0)
+    with pytest.raises(OSError):
+        failing.connect()
+    assert (pool_metrics.timeouts, pool_metrics.errors) == (timeouts + 1, errors + 1)
+
+
+def test_db_config_pool_settings(monkeypatch):
+    """Тест загрузки параметров пула соединений из окружения."""
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    monkeypatch.delenv("DB_ECHO", raising=False)
+    config = DBConfig()
+    assert config.pool_size == 20
+    assert config.pool_pre_ping is False
+    assert config.echo is False
+
+    monkeypatch.setenv("DB_POOL_SIZE", "many")
+    with pytest.raises(ValueError, match="DB_POOL_SIZE must be an integer"):
+        DBConfig()
@@ -0,0 +1,135 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from scripts.benchmarks.fake_bot_api import FakeBotAPIServer
+from services.bot.client import create_bot
+from services.bot.polling import PollingRunner
+from services.bot.update_queue import UpdateQueue
+
+
+def make_update(update_id, chat_id):
+    """Обновление с текстовым сообщением в формате Bot API."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "T"},
+            "text": "hi",
+        },
+    }
+
+
+class FakeDispatcher:
+    """Диспетчер, записывающий обработанные обновления."""
+
+    def __init__(self):
+        self.handled = []
+
+    async def feed_update(self, bot, update):
+        await asyncio.sleep(0.001)
+        self.handled.append(update.update_id)
+
+
+def make_bot(server):
+    config = SimpleNamespace(
+        bot_token="123456:test-token",
+        bot_api_server=server.base_url,
+        api_connections_limit=10,
+        api_connections_per_host=10,
+        api_keepalive_timeout=60,
+        api_dns_cache_ttl=300,
+        api_request_timeout=10,
+    )
+    return create_bot(config)
+
+
+@pytest.mark.asyncio
+async def test_polling_handles_and_confirms_updates():
+    """Тест: обновления обрабатываются, при остановке offset подтверждается."""
+    server = FakeBotAPIServer()
+    await server.start()
+    server.updates = [make_update(i, chat_id=i % 3) for i in range(1, 8)]
+    dispatcher = FakeDispatcher()
+    queue = UpdateQueue(
+        dispatcher, get_bot=lambda: None, workers=3, maxsize=10, enqueue_timeout=1
+    )
+    bot = make_bot(server)
+    runner = PollingRunner(bot, queue, ["message"], limit=3, timeout=5)
+    queue.start()
+    task = asyncio.create_task(runner.run())
+    while runner.stats["received"] < 7:
+        await asyncio.sleep(0.01)
+    runner.stop()
+    await asyncio.wait_for(task, 1)
+    await queue.stop()
+    await bot.session.close()
+    await server.stop()
+
+    assert sorted(dispatcher.handled) == list(range(1, 8))
+    methods = server.methods()
+    assert methods[0] == "deleteWebhook"
+    # Обновления запрашиваются пачками по limit
+    assert [params.get("offset") for _, params in server.calls[1:4]] == [
+        None,
+        "4",
+        "7",
+    ]
+    assert server.calls[-1][1]["offset"] == "8"
+    assert server.calls[-1][1]["timeout"] == "0"
+
+
+@pytest.mark.asyncio
+async def test_polling_stops_during_long_poll():
+    """Тест: остановка прерывает ожидающий запрос getUpdates."""
+    server = FakeBotAPIServer(delay=1)
+    await server.start()
+    bot = make_bot(server)
+    queue = UpdateQueue(
+        FakeDispatcher(), get_bot=lambda: None, workers=1, maxsize=1, enqueue_timeout=1
+    )
+    runner = PollingRunner(bot, queue, ["message"], timeout=30)
+    # Вебхук уже удален: запрос deleteWebhook тоже ждал бы ответа 1 с
+    bot.delete_webhook = lambda: asyncio.sleep(0)
+    task = asyncio.create_task(runner.run())
+    await asyncio.sleep(0.1)
+    runner.stop()
+    await asyncio.wait_for(task, 1)
+    await bot.session.close()
+    await server.stop()
+    assert runner.offset is None
+    assert runner.stats["requests"] == 0
+
+
+@pytest.mark.asyncio
+async def test_polling_stops_with_full_queue():
+    """Тест: остановка при заполненной очереди не подтверждает непринятое."""
+    server = FakeBotAPIServer()
+    await server.start()
+    server.updates = [make_update(i, chat_id=1) for i in range(1, 4)]
+    # Обработчики не запущены: в очередь помещается одно обновление
+    queue = UpdateQueue(
+        FakeDispatcher(), get_bot=lambda: None, workers=1, maxsize=1, enqueue_timeout=0
+    )
+    bot = make_bot(server)
+    runner = PollingRunner(bot, queue, ["message"], timeout=5)
+    task = asyncio.create_task(runner.run())
+    while runner.stats["received"] < 1:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+    runner.stop()
+    await asyncio.wait_for(task, 1)
+    await bot.session.close()
+    await server.stop()
+    assert runner.offset == 2
+    assert queue.stats == {"enqueued": 1, "rejected": 0, "processed": 0, "failed": 0}
+    assert server.calls[-1][1]["offset"] == "2"
+
+
+def test_polling_limit_validation():
+    """Тест проверки параметра limit."""
+    with pytest.raises(ValueError):
+        PollingRunner(None, None, [], limit=101)
@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from core.prompt_codec import CODEC_KEY, PromptCodec, stored_default
+
+TEMPLATE_PATH = (
+    Path(__file__).resolve().parents[2]
+    / "services/web_app/static/templates/template-video-1.0.json"
+)
+
+# Промпт в том виде, в каком его собирает форма: с предзаполненными значениями
+PROMPT = {
+    "version": "video-1.0",
+    "title": "Кот на крыше",
+    "main": {
+        "general_duration": "10",
+        "visual_style": "realistic",
+        "prompt": "Рыжий кот гуляет по крыше",
+        "target_audience": ["all"],
+    },
+    "scenes": {
+        "scene_1": {
+            "main": {"scene_duration": "10", "description_scene": "Кот идет"},
+            "audio": {"audio_talk": {"talk": "Мяу", "talk_language": "Русский"}},
+            "text_overlay": {
+                "content": "Кот",
+                "text_language": "English",
+                "text_style": {"color": "#ffffff"},
+            },
+        },
+        "scene_2": {"main": {"description_scene": "Кот спит"}},
+    },
+}
+
+
+@pytest.fixture
+def codec():
+    """Фикстура с кодеком по шаблону video-1.0."""
+    with open(TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        template = json.load(f)
+    return PromptCodec({"video-1.0": template}.__getitem__)
+
+
+def test_round_trip(codec):
+    """Тест: промпт восстанавливается без потерь."""
+    encoded = codec.encode(PROMPT)
+    assert encoded[CODEC_KEY] == 1
+    assert codec.decode(encoded) == PROMPT
+    assert len(json.dumps(encoded)) < len(json.dumps(PROMPT))
+
+
+def test_defaults_dropped_hot_paths_kept(codec):
+    """Тест: значения по умолчанию не хранятся, кроме полей поиска."""
+    encoded = codec.encode(PROMPT)
+    assert encoded["version"] == "video-1.0"
+    assert encoded["main"]["visual_style"] == "realistic"
+    assert "target_audience" not in encoded["main"]
+    scene = encoded["scenes"]["scene_1"]
+    assert scene["audio"]["audio_talk"] == {"talk": "Мяу"}
+    assert scene["text_overlay"]["text_language"] == "English"
+    assert scene["text_overlay"]["text_style"] == {}
+
+
+def test_missing_field_with_default(codec):
+    """Тест: отсутствующее поле со значением по умолчанию не появляется."""
+    prompt = {
+        "version": "video-1.0",
+        "title": "Без стиля",
+        "main": {"prompt": "Текст"},
+    }
+    encoded = codec.encode(prompt)
+    assert encoded["main"]["visual_style"] is None
+    assert encoded["main"]["target_audience"] is None
+    assert codec.decode(encoded) == prompt
+
+
+def test_unknown_version_and_fields(codec):
+    """Тест: неизвестные версии и поля сохраняются как есть."""
+    prompt = {"version": "image-2.0", "title": "x"}
+    assert codec.encode(prompt) is prompt
+    assert codec.decode(prompt) is prompt
+
+    prompt = {**PROMPT, "keyboard": {"message_id": 5}}
+    encoded = codec.encode(prompt)
+    assert encoded["keyboard"] == {"message_id": 5}
+    assert codec.decode(encoded) == prompt
+    assert codec.encode(encoded) is encoded
+
+
+def test_stored_default():
+    """Тест значений, которые форма отправляет для нетронутого поля."""
+    assert stored_default({"_type": "select", "_default": "none"}) is None
+    assert stored_default({"_type": "text", "_default": ""}) is None
+    assert stored_default({"_type": "checkbox", "_default": ["all"]}) == ["all"]
+    assert stored_default({"_type": "text", "_default": "Русский"}) == "Русский"
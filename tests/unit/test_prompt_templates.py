@@ -0,0 +1,123 @@
+import json
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.utils import choose_encoding
+from services.api.endpoints.app import router
+from services.web_app.prompt_templates import TemplateRegistry
+
+
+def write_template(path, version, title_label="Название"):
+    """Записывает минимальный шаблон в файл."""
+    data = {
+        "version": {"_type": "readonly", "_default": version},
+        "title": {"_type": "text", "_label": title_label, "_default": ""},
+    }
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+def test_registry_keys_templates_by_version(tmp_path):
+    """Тест загрузки шаблонов и индексации по version._default."""
+    write_template(tmp_path / "a.json", "video-1.0")
+    write_template(tmp_path / "b.json", "photo-1.0")
+    (tmp_path / "notes.md").write_text("не шаблон")
+
+    registry = TemplateRegistry(tmp_path, "video-1.0")
+
+    assert registry.versions() == ["photo-1.0", "video-1.0"]
+    entry = registry.get()
+    assert entry.version == "video-1.0"
+    assert json.loads(entry.body) == entry.data
+    assert entry.etag.startswith('"') and entry.etag.endswith('"')
+    with pytest.raises(KeyError):
+        registry.get("unknown")
+
+
+def test_registry_skips_invalid_files(tmp_path):
+    """Тест пропуска файлов без версии и с некорректным JSON."""
+    write_template(tmp_path / "a.json", "video-1.0")
+    (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+    (tmp_path / "no_version.json").write_text("{}", encoding="utf-8")
+
+    registry = TemplateRegistry(tmp_path, "video-1.0")
+
+    assert registry.versions() == ["video-1.0"]
+
+
+@pytest.mark.asyncio
+async def test_registry_reloads_changed_file(tmp_path):
+    """Тест перезагрузки шаблона при изменении файла."""
+    path = tmp_path / "a.json"
+    write_template(path, "video-1.0")
+    registry = TemplateRegistry(tmp_path, "video-1.0")
+    registry.load()
+    registry._watcher.mark_clean()
+    old_etag = registry.get().etag
+
+    write_template(path, "video-1.0", title_label="Новое название")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert await registry._watcher.check() is True
+    entry = registry.get()
+    assert entry.etag != old_etag
+    assert entry.data["title"]["_label"] == "Новое название"
+    assert await registry._watcher.check() is False
+
+
+def test_bundled_template_is_registered():
+    """Тест загрузки шаблона, поставляемого с приложением."""
+    from services.web_app.prompt_templates import template_registry
+
+    assert template_registry.get("video-1.0").data["version"]["_default"] == "video-1.0"
+
+
+def test_choose_encoding():
+    """Тест выбора кодировки по Accept-Encoding."""
+    available = {"identity": b"", "gzip": b"", "br": b""}
+    assert choose_encoding("gzip, deflate, br", available) == "br"
+    assert choose_encoding("gzip", available) == "gzip"
+    assert choose_encoding("br;q=0.5, gzip;q=0.8", available) == "gzip"
+    assert choose_encoding("br;q=0", {"identity": b"", "br": b""}) == "identity"
+    assert choose_encoding(None, available) == "identity"
+
+
+def test_template_endpoint_etag_and_encodings():
+    """Тест отдачи шаблона с ETag, 304 и сжатыми вариантами."""
+    from services.web_app.prompt_templates import template_registry
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    entry = template_registry.get("video-1.0")
+
+    response = client.get(
+        "/templates/video-1.0", headers={"Accept-Encoding": "identity"}
+    )
+    assert response.status_code == 200
+    assert response.content == entry.body
+    assert response.headers["etag"] == entry.etag
+    assert response.headers["cache-control"] == "no-cache"
+
+    response = client.get(
+        f"/templates/video-1.0?v={entry.hash}", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == entry.etag_for("gzip")
+    assert "immutable" in response.headers["cache-control"]
+    assert response.json() == entry.data
+
+    response = client.get(
+        "/templates/video-1.0", headers={"If-None-Match": entry.etag_for("gzip")}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = client.get("/templates/video-1.0?v=stale", follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["location"].endswith(f"?v={entry.hash}")
+
+    assert client.get("/templates/unknown").status_code == 404
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.repositories import Page
+from services.api.dependencies import get_current_user_id, get_db_session
+from services.api.endpoints import prompts
+
+PROMPT = SimpleNamespace(
+    prompt_id=5,
+    chat_id=-100,
+    message_thread_id=2,
+    title="Кот",
+    version="video-1.0",
+    visual_style="anime",
+    general_duration=10.0,
+    message={"title": "Кот"},
+)
+
+
+@pytest.fixture
+def search():
+    """Фикстура с подмененным поиском репозитория."""
+    with patch.object(
+        prompts.PromptRepository,
+        "search",
+        AsyncMock(return_value=Page(items=[PROMPT], next_cursor=5)),
+    ) as mock_search:
+        yield mock_search
+
+
+@pytest.fixture
+def client(search):
+    """Фикстура с приложением без БД и авторизации."""
+    app = FastAPI()
+    app.include_router(prompts.router)
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+    app.dependency_overrides[get_db_session] = lambda: None
+    return TestClient(app)
+
+
+def test_search_prompts(client, search):
+    """Тест ответа поиска и передачи фильтров в репозиторий."""
+    response = client.get(
+        "/prompts/search",
+        params={
+            "q": "кот",
+            "visual_style": "anime",
+            "contains": '{"main": {"target_audience": "дети"}}',
+            "limit": 1,
+            "cursor": 9,
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["next_cursor"] == 5
+    assert body["items"][0]["prompt_id"] == 5
+    assert body["items"][0]["visual_style"] == "anime"
+
+    args, kwargs = search.await_args
+    assert args == (1, 9)
+    assert kwargs["text"] == "кот"
+    assert kwargs["contains"] == {"main": {"target_audience": "дети"}}
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"contains": "[1, 2]"},
+        {"contains": "not json"},
+        {"q": "ab"},
+        {"limit": 1000},
+    ],
+)
+def test_search_prompts_invalid(client, search, params):
+    """Тест ответа 422 на некорректные параметры."""
+    assert client.get("/prompts/search", params=params).status_code == 422
+    search.assert_not_awaited()
@@ -0,0 +1,206 @@
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+from core.prompt_codec import PromptCodec
+from services.bot.render import (
+    CAPTION_LIMIT,
+    MEDIA_GROUP_LIMIT,
+    PRE_CLOSE,
+    PRE_OPEN,
+    TEXT_LIMIT,
+    PromptRenderer,
+    chunk_lines,
+    compile_plan,
+    render_prompt,
+    send_rendered,
+    text_length,
+)
+from services.web_app.prompt_templates import TemplateRegistry
+
+TEMPLATES_DIR = (
+    Path(__file__).resolve().parents[2] / "services/web_app/static/templates"
+)
+
+PROMPT = {
+    "version": "video-1.0",
+    "title": "Кот <на> крыше & луна",
+    "main": {
+        "general_duration": "10",
+        "visual_style": "anime",
+        "prompt": "Рыжий кот гуляет по крыше",
+        "target_audience": ["all", "kids"],
+    },
+    "scenes": {"scene_1": {"main": {"scene_duration": "10"}}},
+}
+
+
+def visible(text: str) -> str:
+    """Текст сообщения без HTML-разметки, каким его увидит пользователь."""
+    text = re.sub(r"<[^>]+>", "", text)
+    return text.replace("&lt;", "<").replace("&gt;", ">").replace("&amp;", "&")
+
+
+class RecordingBot:
+    """Бот, записывающий вызовы методов отправки."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        async def send(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return [] if name == "send_media_group" else None
+
+        return send
+
+
+@pytest.fixture
+def registry():
+    """Фикстура с реестром шаблонов проекта."""
+    registry = TemplateRegistry(TEMPLATES_DIR, "video-1.0")
+    registry.load()
+    return registry
+
+
+@pytest.fixture
+def renderer(registry):
+    """Фикстура с отображением промптов."""
+    codec = PromptCodec(lambda version: registry.get(version).data)
+    return PromptRenderer(registry, codec, cache_size=10, cache_ttl=60)
+
+
+def test_compile_plan(registry):
+    """Тест плана отображения: поля описания берутся из разделов шаблона."""
+    plan = compile_plan(registry.get("video-1.0").data)
+    paths = [field.path for field in plan.summary]
+    assert ("main", "visual_style") in paths
+    assert all(len(path) == 2 for path in paths)
+    assert {"version", "title", "main", "scenes"} <= plan.fields
+
+
+def test_render_escapes_html(renderer):
+    """Тест экранирования значений промпта."""
+    rendered = renderer.render(1, PROMPT)
+    text = rendered.texts[0]
+    assert text.startswith("<b>Кот &lt;на&gt; крыше &amp; луна</b>")
+    assert "<на>" not in text
+    assert "all, kids" in text
+    assert PRE_OPEN in text and text.endswith(PRE_CLOSE)
+    body = visible(text[text.index(PRE_OPEN):])
+    assert json.loads(body)["title"] == PROMPT["title"]
+
+
+def test_render_excludes_service_keys(renderer):
+    """Тест: служебные ключи и медиа не попадают в JSON промпта."""
+    codec = renderer.codec
+    message = codec.encode({**PROMPT, "multimedia": {"items": []}})
+    text = "".join(renderer.render(1, message).texts)
+    assert "_codec" not in text
+    assert "multimedia" not in text
+
+
+def test_chunk_lines_limits():
+    """Тест разбиения длинного текста на сообщения с корректной разметкой."""
+    lines = [(((f"строка {i} " + "&" * 50, False),), True) for i in range(500)]
+    lines.append(((("x" * (TEXT_LIMIT * 2 + 5), False),), True))
+    chunks = chunk_lines(lines)
+    assert len(chunks) > 2
+    joined = ""
+    for chunk in chunks:
+        assert text_length(visible(chunk)) <= TEXT_LIMIT
+        assert chunk.count(PRE_OPEN) == chunk.count(PRE_CLOSE)
+        assert chunk.startswith(PRE_OPEN)
+        joined += visible(chunk)
+    assert joined.count("&") == 500 * 50
+    assert joined.count("x") == TEXT_LIMIT * 2 + 5
+
+
+def test_text_length_counts_utf16():
+    """Тест длины текста: символы вне BMP считаются за два."""
+    assert text_length("ab") == 2
+    assert text_length("😀") == 2
+    chunks = chunk_lines([((("😀" * TEXT_LIMIT, False),), False)])
+    assert len(chunks) == 2
+    assert all(text_length(chunk) <= TEXT_LIMIT for chunk in chunks)
+
+
+def test_chunk_lines_astral_at_limit():
+    """Тест: символ вне BMP на границе сообщения переносится в следующее."""
+    text = "a" * (TEXT_LIMIT - 1) + "😀" * 3
+    chunks = chunk_lines([(((text, False),), False)])
+    assert [text_length(chunk) for chunk in chunks] == [TEXT_LIMIT - 1, 6]
+    assert "".join(chunks) == text
+
+
+def test_media_groups(registry):
+    """Тест группировки медиа: не больше MEDIA_GROUP_LIMIT, документы отдельно."""
+    items = [{"type": "photo", "file_id": f"p{i}"} for i in range(12)]
+    items.append({"type": "video", "file_id": "v", "caption": "c" * 2000})
+    items.append({"type": "document", "file_id": "d"})
+    items.append({"type": "sticker", "file_id": "s"})
+    plan = compile_plan(registry.get("video-1.0").data)
+    rendered = render_prompt({**PROMPT, "multimedia": {"items": items}}, plan)
+    sizes = [len(group.items) for group in rendered.media]
+    assert sizes == [MEDIA_GROUP_LIMIT, 3, 1]
+    assert rendered.media[1].items[-1].caption == "c" * CAPTION_LIMIT
+    media = rendered.media[2].input_media()
+    assert media[0].type == "document" and media[0].media == "d"
+
+
+def test_caption_limit_counts_utf16(registry):
+    """Тест: длина подписи ограничивается в единицах UTF-16."""
+    items = [{"type": "photo", "file_id": "p", "caption": "a" + "😀" * CAPTION_LIMIT}]
+    plan = compile_plan(registry.get("video-1.0").data)
+    rendered = render_prompt({**PROMPT, "multimedia": {"items": items}}, plan)
+    caption = rendered.media[0].items[0].caption
+    assert text_length(caption) == CAPTION_LIMIT - 1
+    assert caption == "a" + "😀" * (CAPTION_LIMIT // 2 - 1)
+
+
+@pytest.mark.asyncio
+async def test_send_rendered_single_media(registry):
+    """Тест: одиночный файл отправляется не медиагруппой."""
+    items = [
+        {"type": "photo", "file_id": "p1"},
+        {"type": "photo", "file_id": "p2"},
+        {"type": "document", "file_id": "d", "caption": "doc"},
+    ]
+    plan = compile_plan(registry.get("video-1.0").data)
+    rendered = render_prompt({**PROMPT, "multimedia": {"items": items}}, plan)
+    bot = RecordingBot()
+    await send_rendered(bot, 1, rendered)
+    assert [name for name, _, _ in bot.calls] == [
+        "send_message",
+        "send_media_group",
+        "send_document",
+    ]
+    assert len(bot.calls[1][1][1]) == 2
+    assert bot.calls[2][1] == (1, "d") and bot.calls[2][2]["caption"] == "doc"
+
+
+@pytest.mark.asyncio
+async def test_media_caption_escaped(registry):
+    """Тест: подпись пользователя экранируется, разметка в нее не попадает."""
+    items = [{"type": "document", "file_id": "d", "caption": "<b>&"}]
+    plan = compile_plan(registry.get("video-1.0").data)
+    rendered = render_prompt({**PROMPT, "multimedia": {"items": items}}, plan)
+    assert rendered.media[0].items[0].caption == "&lt;b&gt;&amp;"
+    assert visible(rendered.media[0].items[0].caption) == "<b>&"
+    bot = RecordingBot()
+    await send_rendered(bot, 1, rendered)
+    assert bot.calls[-1][2]["parse_mode"] == "HTML"
+
+
+def test_render_cache(renderer):
+    """Тест кеша: повторное отображение неизмененного промпта берется из кеша."""
+    first = renderer.render(1, PROMPT)
+    assert renderer.render(1, PROMPT) is first
+    assert renderer.stats == {"hits": 1, "misses": 1}
+
+    changed = {**PROMPT, "title": "Другое название"}
+    assert renderer.render(1, changed) is not first
+    assert renderer.render(2, PROMPT) is not first
+    assert renderer.stats["misses"] == 3
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from core.repositories import (
+    MAX_PAGE_SIZE,
+    PromptRepository,
+    _escape_like,
+    search_query,
+    thread_query,
+    user_feed_query,
+)
+
+
+def compile_sql(query) -> str:
+    """Компилирует запрос в SQL диалекта PostgreSQL."""
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_user_feed_query_is_keyset_paginated():
+    """Тест: лента выбирается по ключу, без OFFSET."""
+    sql = compile_sql(user_feed_query(1, 20, before=500))
+    assert "prompt_chat.user_id = " in sql
+    assert "prompt_chat.prompt_id < " in sql
+    assert "ORDER BY prompt_chat.prompt_id DESC" in sql
+    assert "OFFSET" not in sql
+    assert "prompt_id <" not in compile_sql(user_feed_query(1, 20))
+
+
+def test_thread_query_order():
+    """Тест запроса промптов темы группы."""
+    sql = compile_sql(thread_query(-100, 7, 10, after=3))
+    assert "prompt_group.message_thread_id = " in sql
+    assert "prompt_group.prompt_id > " in sql
+    assert "ORDER BY prompt_group.prompt_id" in sql
+
+
+@pytest.mark.asyncio
+async def test_user_feed_pages():
+    """Тест формирования страниц и курсора."""
+    rows = [SimpleNamespace(prompt_id=i) for i in (9, 8, 7)]
+    session = SimpleNamespace(scalars=AsyncMock(return_value=rows))
+    repository = PromptRepository(session)
+
+    page = await repository.user_feed(1, limit=2)
+    assert [row.prompt_id for row in page.items] == [9, 8]
+    assert page.next_cursor == 8
+
+    session.scalars.return_value = rows[:1]
+    page = await repository.user_feed(1, limit=2, before=8)
+    assert page.next_cursor is None
+
+    with pytest.raises(ValueError):
+        await repository.user_feed(1, limit=0)
+    await repository.user_feed(1, limit=10**6)
+    assert f"LIMIT {MAX_PAGE_SIZE + 1}" in str(
+        session.scalars.await_args.args[0].compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def test_search_query_filters():
+    """Тест: фильтры поиска используют генерируемые колонки, а не JSONB."""
+    sql = compile_sql(
+        search_query(
+            20,
+            before=100,
+            text="50%_off",
+            visual_style="anime",
+            min_duration=5,
+            max_duration=30,
+            contains={"main": {"target_audience": "дети"}},
+        )
+    )
+    assert "prompt_group.title ILIKE " in sql and "ESCAPE '\\'" in sql
+    assert "prompt_group.visual_style = " in sql
+    assert "prompt_group.general_duration >= " in sql
+    assert "prompt_group.general_duration <= " in sql
+    assert "prompt_group.message @> " in sql
+    assert "prompt_group.prompt_id < " in sql
+    assert "ORDER BY prompt_group.prompt_id DESC" in sql
+    assert "->>" not in sql.split("FROM")[1]
+
+
+def test_escape_like():
+    """Тест экранирования спецсимволов LIKE."""
+    assert _escape_like("50%_off\\") == "50\\%\\_off\\\\"
@@ -0,0 +1,202 @@
+import asyncio
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import (
+    EditMessageText,
+    GetChat,
+    GetMe,
+    SendChatAction,
+    SendMessage,
+)
+
+from services.bot.send_scheduler import (
+    BULK,
+    OutboundScheduler,
+    TokenBucket,
+    send_lane,
+)
+
+
+class FakeSession:
+    """Выполнение запросов: запоминает порядок и может ответить RetryAfter."""
+
+    def __init__(self, retry_after: dict | None = None):
+        self.sent = []
+        self.retry_after = dict(retry_after or {})
+
+    async def make_request(self, bot, method):
+        text = getattr(method, "text", None)
+        if self.retry_after.get(text):
+            self.retry_after[text] -= 1
+            raise TelegramRetryAfter(method, "Too Many Requests", retry_after=0)
+        self.sent.append((getattr(method, "chat_id", None), text))
+        return text
+
+
+def make_scheduler(**kwargs) -> OutboundScheduler:
+    options = dict(
+        global_rate=1000, chat_rate=1000, chat_burst=1, group_rate=60000, max_retries=2
+    )
+    options.update(kwargs)
+    return OutboundScheduler(**options)
+
+
+def test_token_bucket():
+    """Тест ведра токенов: серия до capacity, затем по rate в секунду."""
+    bucket = TokenBucket(rate=2, capacity=2, now=0)
+    for _ in range(2):
+        assert bucket.delay(0) == 0
+        bucket.consume(0)
+    assert bucket.delay(0) == pytest.approx(0.5)
+    assert bucket.delay(0.5) == 0
+    bucket.block(10)
+    assert bucket.delay(1) == pytest.approx(9)
+
+
+@pytest.mark.asyncio
+async def test_keeps_chat_order_and_rate():
+    """Тест: сообщения чата отправляются по порядку и не чаще chat_rate."""
+    scheduler = make_scheduler(chat_rate=50)
+    session = FakeSession()
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results = await asyncio.gather(
+        *(
+            scheduler(session.make_request, None, SendMessage(chat_id=1, text=str(i)))
+            for i in range(5)
+        )
+    )
+    elapsed = loop.time() - start
+    await scheduler.stop()
+    assert results == ["0", "1", "2", "3", "4"]
+    assert [text for _, text in session.sent] == results
+    assert elapsed >= 4 / 50 * 0.9
+    assert scheduler.snapshot()["queue_wait"]["interactive"]["count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_interactive_before_bulk():
+    """Тест: при общем ограничении ответы пользователям идут раньше рассылки."""
+    scheduler = make_scheduler(global_rate=20)
+    session = FakeSession()
+    scheduler.start()
+    # Общее ведро опустошается, дальнейшие запросы ждут токенов
+    scheduler._global.consume(asyncio.get_running_loop().time())
+    scheduler._global.tokens = 0
+
+    with send_lane(BULK):
+        bulk = [
+            asyncio.create_task(
+                scheduler(session.make_request, None, SendMessage(chat_id=-i, text="b"))
+            )
+            for i in range(1, 4)
+        ]
+    await asyncio.sleep(0)
+    reply = scheduler(session.make_request, None, SendMessage(chat_id=7, text="r"))
+    await asyncio.gather(reply, *bulk)
+    await scheduler.stop()
+    assert session.sent[0] == (7, "r")
+    assert scheduler.stats["sent"] == 4
+
+
+@pytest.mark.asyncio
+async def test_retry_after():
+    """Тест повтора запроса после ответа RetryAfter."""
+    scheduler = make_scheduler()
+    session = FakeSession(retry_after={"x": 1, "y": 5})
+    result = await scheduler(
+        session.make_request, None, SendMessage(chat_id=1, text="x")
+    )
+    assert result == "x"
+    with pytest.raises(TelegramRetryAfter):
+        await scheduler(session.make_request, None, SendMessage(chat_id=1, text="y"))
+    await scheduler.stop()
+    assert scheduler.stats["retry_after"] == 4
+    assert scheduler.stats["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_group_flood_wait_does_not_block_other_chats():
+    """Тест: RetryAfter группы не задерживает ответ в личный чат."""
+    scheduler = make_scheduler()
+    flood = asyncio.Event()
+
+    async def make_request(bot, method):
+        if method.chat_id == -100:
+            flood.set()
+            raise TelegramRetryAfter(method, "Too Many Requests", retry_after=30)
+        return method.text
+
+    group = asyncio.create_task(
+        scheduler(make_request, None, SendMessage(chat_id=-100, text="g"))
+    )
+    await flood.wait()
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    result = await scheduler(make_request, None, SendMessage(chat_id=1, text="p"))
+    assert result == "p"
+    assert loop.time() - start < 1
+    assert not group.done()
+    await scheduler.stop(timeout=0)
+    with pytest.raises(asyncio.CancelledError):
+        await group
+
+
+@pytest.mark.asyncio
+async def test_retry_after_without_chat_blocks_bot():
+    """Тест: RetryAfter на запрос без чата блокирует всего бота."""
+    scheduler = make_scheduler()
+    scheduler.start()
+
+    async def make_request(bot, method):
+        raise TelegramRetryAfter(method, "Too Many Requests", retry_after=5)
+
+    with pytest.raises(TelegramRetryAfter):
+        await scheduler(
+            make_request,
+            None,
+            EditMessageText(inline_message_id="i", text="x"),
+        )
+    loop = asyncio.get_running_loop()
+    assert scheduler._global.delay(loop.time()) > 4
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_edits_coalesced():
+    """Тест: из ожидающих изменений одного сообщения отправляется последнее."""
+    scheduler = make_scheduler(chat_rate=20)
+    session = FakeSession()
+    first = asyncio.create_task(
+        scheduler(session.make_request, None, SendMessage(chat_id=1, text="m"))
+    )
+    edits = [
+        asyncio.create_task(
+            scheduler(
+                session.make_request,
+                None,
+                EditMessageText(chat_id=1, message_id=5, text=f"e{i}"),
+            )
+        )
+        for i in range(3)
+    ]
+    results = await asyncio.gather(first, *edits)
+    await scheduler.stop()
+    assert results == ["m", "e2", "e2", "e2"]
+    assert session.sent == [(1, "m"), (1, "e2")]
+    assert scheduler.stats["coalesced"] == 2
+
+
+@pytest.mark.asyncio
+async def test_methods_without_chat_bypass_queue():
+    """Тест: запросы без chat_id и не отправляющие сообщений выполняются сразу."""
+    scheduler = make_scheduler()
+    session = FakeSession()
+    await scheduler(session.make_request, None, GetMe())
+    await scheduler(session.make_request, None, GetChat(chat_id=1))
+    await scheduler(
+        session.make_request, None, SendChatAction(chat_id=1, action="typing")
+    )
+    assert scheduler._task is None
+    assert [chat_id for chat_id, _ in session.sent] == [None, 1, 1]
@@ -0,0 +1,125 @@
+import gzip
+import os
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.web_app.static_files import CachedStaticFiles
+
+SCRIPT = b"console.log('hello');\n" * 100
+
+
+def touch_later(path, seconds=10):
+    """Сдвигает время изменения файла вперед."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10**9))
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    """Фикстура с файлом, его сжатыми копиями и файлом с хешем в имени."""
+    (tmp_path / "app.js").write_bytes(SCRIPT)
+    (tmp_path / "app.js.gz").write_bytes(gzip.compress(SCRIPT))
+    (tmp_path / "app.js.br").write_bytes(brotli.compress(SCRIPT))
+    (tmp_path / "app.0123456789ab.js").write_bytes(SCRIPT)
+    (tmp_path / "video.bin").write_bytes(bytes(range(256)) * 64)
+    return tmp_path
+
+
+@pytest.fixture
+def static_files(static_dir):
+    """Фикстура с раздачей статики, хранящей в памяти файлы до 4 КБ."""
+    return CachedStaticFiles(directory=str(static_dir), max_file_size=4096)
+
+
+@pytest.fixture
+def client(static_files):
+    """Фикстура с приложением, раздающим статику."""
+    app = FastAPI()
+    app.mount("/static", static_files)
+    return TestClient(app)
+
+
+def test_serves_precompressed_variant(client):
+    """Тест выбора заранее сжатой копии по Accept-Encoding."""
+    response = client.get("/static/app.js", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == SCRIPT  # httpx распаковывает br
+
+    response = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == SCRIPT  # httpx распаковывает gzip
+
+    response = client.get("/static/app.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.content == SCRIPT
+    assert response.headers["content-type"].startswith("text/javascript")
+
+
+def test_stale_precompressed_variant_ignored(client, static_dir):
+    """Тест: сжатая копия старше исходного файла не используется."""
+    touch_later(static_dir / "app.js")
+    response = client.get("/static/app.js", headers={"Accept-Encoding": "br"})
+    assert "content-encoding" not in response.headers
+    assert response.content == SCRIPT
+
+
+def test_cache_control(client):
+    """Тест: файлы с хешем в имени кешируются навсегда, прочие перепроверяются."""
+    response = client.get("/static/app.0123456789ab.js")
+    assert "immutable" in response.headers["cache-control"]
+    assert "vary" not in response.headers
+    response = client.get("/static/app.js")
+    assert response.headers["cache-control"] == "no-cache"
+
+
+def test_small_files_cached_in_memory(client, static_files, static_dir):
+    """Тест кеша небольших файлов в памяти и его сброса при изменении файла."""
+    headers = {"Accept-Encoding": "identity"}
+    first = client.get("/static/app.js", headers=headers)
+    client.get("/static/app.js", headers=headers)
+    assert static_files.stats["memory_misses"] == 1
+    assert static_files.stats["memory_hits"] == 1
+
+    response = client.get(
+        "/static/app.js", headers={**headers, "If-None-Match": first.headers["etag"]}
+    )
+    assert response.status_code == 304
+
+    (static_dir / "app.js").write_bytes(b"changed")
+    touch_later(static_dir / "app.js")
+    assert client.get("/static/app.js", headers=headers).content == b"changed"
+
+
+def test_large_files_and_ranges_from_disk(client, static_files):
+    """Тест отдачи больших файлов с диска и запросов Range."""
+    response = client.get("/static/video.bin")
+    assert response.status_code == 200
+    assert len(response.content) == 256 * 64
+
+    response = client.get("/static/video.bin", headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.content == bytes(range(10))
+
+    response = client.get("/static/app.js", headers={"Range": "bytes=0-6"})
+    assert response.status_code == 206
+    assert response.content == b"console"
+    assert static_files.stats["memory_misses"] == 0
+    assert static_files.stats["disk"] == 3
+
+
+def test_memory_cache_is_bounded(static_dir):
+    """Тест ограничения объема кеша в памяти."""
+    static_files = CachedStaticFiles(
+        directory=str(static_dir), max_cache_bytes=len(SCRIPT) + 100
+    )
+    app = FastAPI()
+    app.mount("/static", static_files)
+    client = TestClient(app)
+    headers = {"Accept-Encoding": "identity"}
+    client.get("/static/app.js", headers=headers)
+    client.get("/static/app.0123456789ab.js", headers=headers)
+    assert static_files.snapshot()["bytes"] <= len(SCRIPT) + 100
@@ -0,0 +1,139 @@
+import datetime
+import gzip
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+from core.transfer import (
+    BulkImporter,
+    export_ndjson,
+    gzip_stream,
+    parse_tables,
+    table_columns,
+)
+
+CREATED_AT = datetime.datetime(2025, 10, 1, 12, 30)
+
+
+class FakeStreamResult:
+    """Результат серверного курсора: строки выдаются пачками."""
+
+    def __init__(self, rows, size):
+        self.rows = rows
+        self.size = size
+
+    async def partitions(self):
+        for i in range(0, len(self.rows), self.size):
+            yield self.rows[i : i + self.size]
+
+
+class FakeConnection:
+    """Соединение SQLAlchemy, возвращающее заданные строки по таблицам."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def stream(self, query):
+        self.queries.append(query)
+        table = query.get_final_froms()[0].name
+        return FakeStreamResult(self.rows[table], query._execution_options["yield_per"])
+
+
+class FakeAsyncpgConnection:
+    """Соединение asyncpg, запоминающее COPY и запросы."""
+
+    def __init__(self):
+        self.copied = []
+        self.statements = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copied.append((table, list(records), columns))
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        if statement.startswith("INSERT"):
+            return f"INSERT 0 {len(self.copied[-1][1])}"
+        return "OK"
+
+
+def test_parse_tables():
+    """Тест: таблицы упорядочиваются для загрузки, неизвестные отклоняются."""
+    assert parse_tables(None) == ["users", "prompt_chat", "prompt_group"]
+    assert parse_tables("prompt_group, users") == ["users", "prompt_group"]
+    with pytest.raises(ValueError):
+        parse_tables("users,secrets")
+
+
+def test_generated_columns_not_transferred():
+    """Тест: генерируемые колонки не выгружаются."""
+    names = [column.name for column in table_columns("prompt_group")]
+    assert names == ["prompt_id", "chat_id", "message_thread_id", "message"]
+
+
+async def export_lines(rows, tables) -> list[bytes]:
+    connection = FakeConnection(rows)
+    chunks = gzip_stream(export_ndjson(connection, tables, batch_size=2))
+    body = b"".join([chunk async for chunk in chunks])
+    return gzip.decompress(body).splitlines(keepends=True)
+
+
+@pytest.mark.asyncio
+async def test_export_format():
+    """Тест формата выгрузки: заголовок таблицы и строки-массивы."""
+    rows = {"prompt_chat": [(i, 7, {"title": f"п{i}"}, None) for i in range(5)]}
+    lines = await export_lines(rows, ["prompt_chat"])
+    assert json.loads(lines[0]) == {
+        "table": "prompt_chat",
+        "columns": ["prompt_id", "user_id", "message", "prompt_group"],
+    }
+    assert [json.loads(line) for line in lines[1:]] == [
+        [i, 7, {"title": f"п{i}"}, None] for i in range(5)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_import_round_trip():
+    """Тест: выгрузка загружается пачками с приведением типов."""
+    user = (7, "cat", "Кот", None, "ru", False, True, None, {"step": 1})
+    rows = {
+        "users": [user + (CREATED_AT, CREATED_AT)],
+        "prompt_chat": [(i, 7, {"title": f"п{i}"}, None) for i in range(5)],
+    }
+    lines = await export_lines(rows, ["users", "prompt_chat"])
+
+    connection = FakeAsyncpgConnection()
+    progress = []
+    importer = BulkImporter(
+        connection, batch_size=2, on_progress=lambda s: progress.append(s.rows)
+    )
+    stats = await importer.run(lines)
+
+    assert stats["users"].rows == stats["users"].inserted == 1
+    assert stats["prompt_chat"].rows == 5
+    assert progress == [1, 2, 4, 5]
+    # Пачки по batch_size строк
+    assert [len(records) for _, records, _ in connection.copied] == [1, 2, 2, 1]
+
+    table, records, columns = connection.copied[0]
+    user_row = dict(zip(columns, records[0]))
+    assert table == "import_users"
+    assert user_row["created_at"] == CREATED_AT
+    assert user_row["fsm_data"] == '{"step":1}'
+    assert user_row["extra"] is None
+    assert any("setval" in s and "prompt_chat" in s for s in connection.statements)
+
+
+@pytest.mark.asyncio
+async def test_import_rejects_unknown_columns():
+    """Тест: загрузка файла с неизвестной колонкой прерывается."""
+    header = {"table": "users", "columns": ["user_id", "password"]}
+    with pytest.raises(ValueError):
+        await BulkImporter(FakeAsyncpgConnection()).run([json.dumps(header).encode()])
+    with pytest.raises(ValueError):
+        await BulkImporter(FakeAsyncpgConnection()).run([b"[1, 2]"])
@@ -0,0 +1,56 @@
+from aiogram import Dispatcher, Router
+
+from services.bot.update_filter import (
+    UpdateDeduplicator,
+    UpdateTypeFilter,
+    loads,
+    update_type,
+)
+
+
+def make_dispatcher():
+    """Создает диспетчер, обрабатывающий только сообщения."""
+    router = Router()
+
+    @router.message()
+    async def handler(message):
+        pass
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    return dp
+
+
+def test_update_type_peeks_top_level_key():
+    """Тест определения типа обновления по ключу верхнего уровня."""
+    assert update_type(loads(b'{"update_id": 1, "poll": {}}')) == "poll"
+    assert update_type({"update_id": 1}) is None
+
+
+def test_filter_short_circuits_unhandled_types():
+    """Тест отсева обновлений без обработчиков и подсчета отброшенных."""
+    update_filter = UpdateTypeFilter(make_dispatcher())
+
+    assert update_filter.accepts({"update_id": 1, "message": {}}) is True
+    assert update_filter.accepts({"update_id": 2, "edited_message": {}}) is False
+    assert update_filter.accepts({"update_id": 3}) is False
+
+    stats = update_filter.snapshot()
+    assert stats["allowed"] == ["message"]
+    assert stats["accepted"] == 1
+    assert stats["short_circuited_by_type"] == {"edited_message": 1, "unknown": 1}
+
+
+def test_deduplicator_sliding_window():
+    """Тест отсева повторных update_id в скользящем окне."""
+    dedup = UpdateDeduplicator(window=2)
+
+    assert dedup.check_and_add(1) is False
+    assert dedup.check_and_add(1) is True
+    assert dedup.check_and_add(2) is False
+    assert dedup.check_and_add(3) is False  # 1 вытесняется из окна
+    assert dedup.check_and_add(1) is False
+
+    dedup.discard(3)
+    assert dedup.check_and_add(3) is False
+    assert dedup.snapshot()["duplicates"] == 1
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from aiogram.types import Update
+
+from services.bot.update_queue import UpdateQueue, UpdateQueueFull, ordering_key
+
+
+def make_update(update_id, chat_id):
+    """Создает обновление с текстовым сообщением из указанного чата."""
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": chat_id, "is_bot": False, "first_name": "T"},
+                "text": "hi",
+            },
+        }
+    )
+
+
+class FakeDispatcher:
+    """Диспетчер, записывающий порядок обработки обновлений."""
+
+    def __init__(self, delay=0.0, gate=None):
+        self.handled = []
+        self.delay = delay
+        self.gate = gate
+
+    async def feed_update(self, bot, update):
+        if self.gate is not None:
+            await self.gate.wait()
+        # Первые обновления чата обрабатываются дольше последующих
+        await asyncio.sleep(self.delay / update.update_id)
+        self.handled.append((update.message.chat.id, update.update_id))
+
+
+def test_ordering_key_uses_chat():
+    """Тест выбора ключа упорядочивания по чату."""
+    assert ordering_key(make_update(1, 555)) == 555
+
+
+@pytest.mark.asyncio
+async def test_queue_keeps_per_chat_order():
+    """Тест последовательной обработки обновлений одного чата."""
+    dispatcher = FakeDispatcher(delay=0.01)
+    queue = UpdateQueue(dispatcher, get_bot=lambda: None, workers=4, maxsize=100, enqueue_timeout=1)
+    queue.start()
+    for update_id in range(1, 11):
+        await queue.enqueue(make_update(update_id, chat_id=update_id % 2))
+    await queue.stop()
+
+    for chat_id in (0, 1):
+        ids = [update_id for chat, update_id in dispatcher.handled if chat == chat_id]
+        assert ids == sorted(ids)
+    assert queue.stats["processed"] == 10
+    assert queue.snapshot()["queue_wait"]["count"] == 10
+
+
+@pytest.mark.asyncio
+async def test_queue_rejects_when_full():
+    """Тест отказа в приеме обновления при переполненной очереди."""
+    gate = asyncio.Event()
+    queue = UpdateQueue(
+        FakeDispatcher(gate=gate), get_bot=lambda: None, workers=1, maxsize=1, enqueue_timeout=0.01
+    )
+    queue.start()
+    await queue.enqueue(make_update(1, 1))
+    await asyncio.sleep(0)  # обработчик забирает первое обновление и ждет
+    await queue.enqueue(make_update(2, 1))
+
+    with pytest.raises(UpdateQueueFull):
+        await queue.enqueue(make_update(3, 1))
+    assert queue.stats["rejected"] == 1
+
+    gate.set()
+    await queue.stop()
+    assert queue.stats["processed"] == 2
@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DataError
+
+from core.users import UserProfile, UserWriteBehind, build_upsert
+
+
+class FakeSession:
+    """Сессия БД, запоминающая выполненные запросы."""
+
+    def __init__(self, executed, fail=False, bad_ids=()):
+        self.executed = executed
+        self.fail = fail
+        self.bad_ids = bad_ids
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        if self.fail:
+            raise RuntimeError("db is down")
+        params = stmt.compile(dialect=postgresql.dialect()).params
+        if any(
+            key.startswith("user_id") and value in self.bad_ids
+            for key, value in params.items()
+        ):
+            raise DataError(str(stmt), params, ValueError("bad row"))
+        self.executed.append(stmt)
+
+    async def commit(self):
+        pass
+
+
+def make_writer(executed, batch_size=100, fail=lambda: False, bad_ids=(), **kwargs):
+    """Создает очередь записи с фейковой фабрикой сессий."""
+    return UserWriteBehind(
+        lambda: FakeSession(executed, fail=fail(), bad_ids=bad_ids),
+        flush_interval=60,
+        batch_size=batch_size,
+        **kwargs,
+    )
+
+
+def test_build_upsert_is_single_on_conflict_statement():
+    """Тест построения пакетного INSERT ... ON CONFLICT DO UPDATE."""
+    stmt = build_upsert([UserProfile(1, "A"), UserProfile(2, "B")])
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.count("INSERT INTO users") == 1
+    assert "ON CONFLICT (user_id) DO UPDATE" in sql
+
+
+@pytest.mark.asyncio
+async def test_writer_coalesces_and_skips_unchanged():
+    """Тест схлопывания изменений и пропуска неизменных профилей."""
+    executed = []
+    writer = make_writer(executed)
+
+    writer.submit(UserProfile(1, "A"))
+    writer.submit(UserProfile(1, "A2"))
+    writer.submit(UserProfile(2, "B"))
+    await writer.flush()
+    assert len(executed) == 1
+    assert writer.stats["written"] == 2
+
+    writer.submit(UserProfile(1, "A2"))
+    await writer.flush()
+    assert len(executed) == 1
+    assert writer.stats["unchanged"] == 1
+
+
+@pytest.mark.asyncio
+async def test_writer_requeues_on_failure():
+    """Тест возврата профилей в очередь при ошибке записи."""
+    executed = []
+    failing = [True]
+    writer = make_writer(executed, fail=lambda: failing[0])
+
+    writer.submit(UserProfile(1, "A"))
+    await writer.flush()
+    assert executed == []
+
+    failing[0] = False
+    await writer.flush()
+    assert len(executed) == 1
+
+
+@pytest.mark.asyncio
+async def test_writer_drops_after_max_retries():
+    """Тест: профиль отбрасывается после max_retries неудачных записей."""
+    writer = make_writer([], fail=lambda: True, max_retries=2)
+
+    writer.submit(UserProfile(1, "A"))
+    await writer.flush()
+    assert writer.stats["dropped"] == 0
+    await writer.flush()
+    assert writer.stats["dropped"] == 1
+    await writer.flush()
+    assert writer.stats["flushes"] == 0
+
+
+def test_writer_limits_pending():
+    """Тест: сверх max_pending профили новых пользователей отбрасываются."""
+    writer = make_writer([], max_pending=2)
+    for user_id in (1, 2, 3):
+        writer.submit(UserProfile(user_id, "A"))
+    writer.submit(UserProfile(1, "A2"))
+    assert writer.stats["dropped"] == 1
+    assert len(writer._pending) == 2
+
+
+@pytest.mark.asyncio
+async def test_writer_drops_rejected_rows():
+    """Тест: пачка с некорректной строкой делится, отбрасывается только она."""
+    executed = []
+    writer = make_writer(executed, bad_ids={3})
+    for user_id in range(1, 9):
+        writer.submit(UserProfile(user_id, "A"))
+    await writer.flush()
+    assert writer.stats["written"] == 7
+    assert writer.stats["dropped"] == 1
+    assert not writer._pending
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_on_batch_size_and_stop():
+    """Тест досрочной записи по размеру пачки и записи остатка при остановке."""
+    executed = []
+    writer = make_writer(executed, batch_size=2)
+    writer.start()
+
+    writer.submit(UserProfile(1, "A"))
+    writer.submit(UserProfile(2, "B"))
+    for _ in range(10):
+        if executed:
+            break
+        await asyncio.sleep(0)
+    assert len(executed) == 1
+
+    writer.submit(UserProfile(3, "C"))
+    await writer.stop()
+    assert len(executed) == 2
+
+
+@pytest.mark.asyncio
+async def test_writer_ensure_written():
+    """Тест досрочной записи профиля, ожидающего записи."""
+    executed = []
+    writer = make_writer(executed)
+
+    await writer.ensure_written(1)
+    assert executed == []
+    writer.submit(UserProfile(1, "A"))
+    await writer.ensure_written(1)
+    assert len(executed) == 1
+    assert writer.stats["written"] == 1
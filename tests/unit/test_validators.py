@@ -0,0 +1,134 @@
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from services.api.validators import TemplateValidator, compile_rules
+from services.bot.render import compile_plan, render_prompt
+
+TEMPLATE_PATH = (
+    Path(__file__).resolve().parents[2]
+    / "services/web_app/static/templates/template-video-1.0.json"
+)
+
+PROMPT = {
+    "version": "video-1.0",
+    "title": "Кот на крыше",
+    "main": {
+        "general_duration": "10",
+        "visual_style": "anime",
+        "prompt": "Рыжий кот гуляет по крыше",
+        "target_audience": ["all"],
+    },
+    "scenes": {
+        "scene_1": {
+            "main": {"scene_duration": 10, "description_scene": "Кот идет"},
+            "text_overlay": {"content": "Кот", "text_style": {"color": "#ffffff"}},
+        },
+    },
+}
+
+
+@pytest.fixture(scope="module")
+def validator():
+    """Фикстура с валидатором шаблона video-1.0."""
+    with open(TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        return TemplateValidator(json.load(f))
+
+
+def test_compile_rules(validator):
+    """Тест плоской таблицы правил."""
+    rules = validator.rules
+    assert rules[()].required == {"version", "title", "main"}
+    assert "anime" in rules[("main", "visual_style")].options
+    assert rules[("scenes",)].item_key == "scene"
+    assert rules[("scenes", "scene", "main", "scene_duration")].minimum == 0
+    assert rules[("scenes", "scene", "main")].important == {"description_scene"}
+
+
+def test_compile_rules_limits():
+    """Тест ограничений, заданных в шаблоне."""
+    rules = compile_rules({"n": {"_type": "number", "_min": 1, "_max": 60}})
+    check = rules[("n",)].check
+    assert check("30") is None
+    assert check(0) == "must be at least 1"
+    assert check(61) == "must be at most 60"
+
+
+def test_valid_prompt(validator):
+    """Тест: промпт, собранный формой, проходит проверку."""
+    assert validator.validate(PROMPT) == []
+
+
+@pytest.mark.parametrize(
+    "path, value, message",
+    [
+        (("version",), "video-2.0", "must be 'video-1.0'"),
+        (("main", "visual_style"), "oil", "is not an allowed option"),
+        (("main", "general_duration"), "-5", "must be at least 0"),
+        (("main", "general_duration"), "nan", "must be a number"),
+        (("main", "target_audience"), ["all", "all"], "must not contain duplicates"),
+        (("main", "target_audience"), [{}], "contains an option that is not allowed"),
+        (("main", "prompt"), 42, "must be a string"),
+        (("main",), "текст", "must be an object"),
+    ],
+)
+def test_invalid_values(validator, path, value, message):
+    """Тест ошибок в значениях полей."""
+    prompt = copy.deepcopy(PROMPT)
+    node = prompt
+    for key in path[:-1]:
+        node = node[key]
+    node[path[-1]] = value
+    issues = validator.validate(prompt)
+    assert [(i.path, i.message) for i in issues] == [(".".join(path), message)]
+
+
+def test_structure_errors(validator):
+    """Тест ошибок структуры: лишние поля, элементы массива, обязательные поля."""
+    prompt = copy.deepcopy(PROMPT)
+    del prompt["title"]
+    prompt["extra"] = 1
+    prompt["scenes"]["scene_0"] = {}
+    prompt["scenes"]["scene_1"]["main"] = {"scene_duration": "5"}
+    paths = {issue.path: issue.message for issue in validator.validate(prompt)}
+    assert paths == {
+        "title": "is required",
+        "extra": "is not allowed",
+        "scenes.scene_0": "is not allowed",
+        "scenes.scene_1.main": "requires one of: description_scene",
+    }
+
+
+def test_validator_reused_for_prompts(validator):
+    """Тест: один скомпилированный валидатор проверяет разные промпты."""
+    bad = copy.deepcopy(PROMPT)
+    bad["scenes"]["scene_1"]["text_overlay"]["text_style"]["color"] = "white"
+    results = [validator.validate(prompt) for prompt in (PROMPT, bad, "prompt")]
+    assert results[0] == []
+    assert [i.path for i in results[1]] == [
+        "scenes.scene_1.text_overlay.text_style.color"
+    ]
+    assert results[2][0].message == "must be an object"
+
+
+def test_multimedia_accepted_and_rendered(validator):
+    """Тест: медиафайлы, которые принимает валидатор, отображает бот."""
+    with open(TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        plan = compile_plan(json.load(f))
+    prompt = copy.deepcopy(PROMPT)
+    prompt["multimedia"] = {
+        "media_group_id": "abc",
+        "items": [
+            {"message_id": 1, "type": "photo", "file_id": "p", "caption": "фото"},
+            {"message_id": 2, "type": "video", "file_id": "v"},
+        ],
+    }
+    assert validator.validate(prompt) == []
+    rendered = render_prompt(prompt, plan)
+    assert [item.file_id for item in rendered.media[0].items] == ["p", "v"]
+
+    prompt["multimedia"]["items"].append({"type": "sticker", "file_id": "s"})
+    issues = validator.validate(prompt)
+    assert [issue.path for issue in issues] == ["multimedia"]